@@ -0,0 +1,117 @@
+# config.py
+# Settings come from QUIZ_* environment variables, then from the file named by QUIZ_CONFIG_FILE
+# (KEY=VALUE lines, with or without the QUIZ_ prefix), then from the defaults below.
+import os
+
+
+def _read_config_file(path):
+    values = {}
+    if not path or not os.path.exists(path):
+        return values
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip().upper()
+            if key.startswith("QUIZ_"):
+                key = key[len("QUIZ_"):]
+            values[key] = value.strip().strip("\"'")
+    return values
+
+
+_file_values = _read_config_file(os.environ.get("QUIZ_CONFIG_FILE"))
+
+
+def get(name: str, default=None):
+    return os.environ.get(f"QUIZ_{name}", _file_values.get(name, default))
+
+
+def get_int(name: str, default=None):
+    value = get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def get_bool(name: str, default: bool = False) -> bool:
+    value = get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Database
+DATABASE_URL = get("DATABASE_URL", "sqlite:///./quizapp.db")
+# Driver used by the async endpoints; derived from DATABASE_URL (aiosqlite / asyncpg) when unset
+ASYNC_DATABASE_URL = get("ASYNC_DATABASE_URL")
+# Optional read-only pool for read-heavy endpoints; "same" opens the SQLite file read-only
+READ_DATABASE_URL = get("READ_DATABASE_URL")
+
+# Connection pool, split across uvicorn/gunicorn workers so all of them fit in DB_MAX_CONNECTIONS
+WEB_CONCURRENCY = get_int("WEB_CONCURRENCY", get_int("WORKERS", 1))
+DB_MAX_CONNECTIONS = get_int("DB_MAX_CONNECTIONS", 100)
+_per_worker = max(2, DB_MAX_CONNECTIONS // max(1, WEB_CONCURRENCY))
+DB_POOL_SIZE = get_int("DB_POOL_SIZE", max(1, _per_worker * 2 // 3))
+DB_MAX_OVERFLOW = get_int("DB_MAX_OVERFLOW", max(0, _per_worker - DB_POOL_SIZE))
+DB_POOL_TIMEOUT = get_int("DB_POOL_TIMEOUT", 30)
+DB_ECHO = get_bool("DB_ECHO")
+# SQLite takes one writer at a time, so async writers queue on a small pool instead of racing for the file lock
+SQLITE_ASYNC_WRITERS = get_int("SQLITE_ASYNC_WRITERS", 1)
+
+# SQLite pragmas applied on every new connection; set SQLITE_PRAGMAS=0 to keep SQLite defaults
+SQLITE_PRAGMAS = get_bool("SQLITE_PRAGMAS", True)
+SQLITE_JOURNAL_MODE = get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = get_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_CACHE_SIZE_KB = get_int("SQLITE_CACHE_SIZE_KB", 20000)
+SQLITE_MMAP_SIZE = get_int("SQLITE_MMAP_SIZE", 128 * 1024 * 1024)
+SQLITE_FOREIGN_KEYS = get_bool("SQLITE_FOREIGN_KEYS", False)
+
+# Passwords
+BCRYPT_ROUNDS = get_int("BCRYPT_ROUNDS", 12)
+# Processes used to hash passwords for bulk imports; defaults to one per core
+PASSWORD_HASH_WORKERS = get_int("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+# Login storms: bcrypt checks run on this many threads, and logins beyond LOGIN_MAX_PENDING get a 503
+LOGIN_VERIFY_WORKERS = get_int("LOGIN_VERIFY_WORKERS", os.cpu_count() or 1)
+LOGIN_MAX_PENDING = get_int("LOGIN_MAX_PENDING", LOGIN_VERIFY_WORKERS * 32)
+
+# Sessions
+# Signs session tokens; must be the same on every worker. A random key is used when unset.
+SECRET_KEY = get("SECRET_KEY")
+SESSION_TTL_MINUTES = get_int("SESSION_TTL_MINUTES", 12 * 60)
+# When off, requests without a token are still served (older clients); a token that is sent is always checked
+REQUIRE_AUTH = get_bool("REQUIRE_AUTH", False)
+
+# Leaderboards: each worker applies its own submissions to its cached boards at once; with several workers the
+# boards are also reloaded once they are this old, so other workers' submissions show up
+LEADERBOARD_TTL_SECONDS = get_int("LEADERBOARD_TTL_SECONDS", 0 if WEB_CONCURRENCY <= 1 else 10)
+
+# Conditional GETs: the ETag version counters are per process, so a worker that didn't see a write would keep
+# answering 304; they are only sent when there is a single worker
+HTTP_ETAGS = WEB_CONCURRENCY <= 1
+
+# Answer autosave: buffered answers are written every AUTOSAVE_FLUSH_MS, or sooner once AUTOSAVE_MAX_PENDING wait
+AUTOSAVE_FLUSH_MS = get_int("AUTOSAVE_FLUSH_MS", 2000)
+AUTOSAVE_MAX_PENDING = get_int("AUTOSAVE_MAX_PENDING", 5000)
+# The buffer is per process and a submission only sees its own worker's, so with several workers every
+# autosave is written before it is acknowledged
+AUTOSAVE_BUFFER = WEB_CONCURRENCY <= 1
+
+# Start and submit writes: with WRITE_QUEUE on, one thread applies them in shared transactions of up to
+# WRITE_BATCH_MAX requests instead of each request committing on its own
+WRITE_QUEUE = get_bool("WRITE_QUEUE", False)
+WRITE_BATCH_MAX = get_int("WRITE_BATCH_MAX", 64)
+
+# Quiz event streams: pending events per connection before a slow client is told to resync, connections per
+# worker, and the keep-alive interval that also notices dropped clients
+EVENT_QUEUE_SIZE = get_int("EVENT_QUEUE_SIZE", 16)
+EVENT_MAX_CONNECTIONS = get_int("EVENT_MAX_CONNECTIONS", 10000)
+EVENT_HEARTBEAT_SECONDS = get_int("EVENT_HEARTBEAT_SECONDS", 15)
+
+# Per-request SQL accounting behind /metrics and /admin/sql. A request that runs one statement shape
+# N_PLUS_ONE_THRESHOLD times is flagged; requests slower than SLOW_REQUEST_MS (0: never) are logged with their
+# statements; SQL_DEBUG_HEADER adds X-SQL-Stats and Server-Timing headers to every response
+METRICS = get_bool("METRICS", True)
+N_PLUS_ONE_THRESHOLD = get_int("N_PLUS_ONE_THRESHOLD", 5)
+SLOW_REQUEST_MS = get_int("SLOW_REQUEST_MS", 1000)
+SQL_DEBUG_HEADER = get_bool("SQL_DEBUG_HEADER", False)
@@ -1,8 +1,145 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
+from services.request_metrics import current_trace, RowCountingCursor
+import time
+import config
 
-DATABASE_URL = "sqlite:///./quizapp.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = config.DATABASE_URL
+
+
+def is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas(read_only: bool = False) -> dict:
+    pragmas = {
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -config.SQLITE_CACHE_SIZE_KB,
+        "temp_store": "MEMORY",
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "foreign_keys": "ON" if config.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+    if not read_only:
+        # journal_mode is stored in the file, so only the writer sets it
+        pragmas["journal_mode"] = config.SQLITE_JOURNAL_MODE
+        pragmas["synchronous"] = config.SQLITE_SYNCHRONOUS
+    return pragmas
+
+
+def read_only_sqlite_url(url) -> str:
+    # Same database file opened through SQLite's URI mode with mode=ro
+    database = make_url(url).database
+    return f"sqlite:///file:{database}?mode=ro&uri=true"
+
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url) -> str:
+    # Same database through an asyncio driver, unless ASYNC_DATABASE_URL names one explicitly
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}; set QUIZ_ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(url) -> dict:
+    options = {"echo": config.DB_ECHO, "pool_pre_ping": not is_sqlite(url)}
+    if is_sqlite(url) and "aiosqlite" not in str(url):
+        options["connect_args"] = {"check_same_thread": False}
+    if not is_sqlite(url) or make_url(url).database not in (None, "", ":memory:"):
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def apply_pragmas(sync_engine, url, read_only: bool = False):
+    if is_sqlite(url) and config.SQLITE_PRAGMAS:
+        pragmas = sqlite_pragmas(read_only)
+
+        @event.listens_for(sync_engine, "connect")
+        def apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+
+def instrument_statements(sync_engine):
+    # Adds every statement run for a request to its trace (services/request_metrics.py). SQLAlchemy has no
+    # fetch event, so rows are counted by handing the result a counting wrapper around the DBAPI cursor.
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        trace = current_trace()
+        if trace is None or context is None:
+            return
+        context._trace_started = time.perf_counter()
+        context.cursor = RowCountingCursor(cursor, trace)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_trace_started", None)
+        if started is not None:
+            context._trace_started = None
+            context.cursor._trace.add_statement(statement, time.perf_counter() - started)
+
+
+def build_engine(url, read_only: bool = False):
+    new_engine = create_engine(url, **engine_options(url))
+    apply_pragmas(new_engine, url, read_only)
+    if config.METRICS:
+        instrument_statements(new_engine)
+    return new_engine
+
+
+def build_async_engine(url, read_only: bool = False):
+    options = engine_options(url)
+    if is_sqlite(url) and not read_only and "pool_size" in options:
+        options.update(pool_size=config.SQLITE_ASYNC_WRITERS, max_overflow=0)
+    new_engine = create_async_engine(url, **options)
+    apply_pragmas(new_engine.sync_engine, url, read_only)
+    if config.METRICS:
+        instrument_statements(new_engine.sync_engine)
+    return new_engine
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# Read-heavy endpoints use ReadSessionLocal; it is the primary unless a read pool is configured
+if config.READ_DATABASE_URL:
+    read_url = read_only_sqlite_url(DATABASE_URL) if config.READ_DATABASE_URL == "same" else config.READ_DATABASE_URL
+    read_engine = build_engine(read_url, read_only=True)
+else:
+    read_url = None
+    read_engine = engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
+
+# Async engines for the student endpoints; they share the file and pragmas with the sync ones.
+# On SQLite the writer pool is kept to SQLITE_ASYNC_WRITERS, so reads always get their own pool.
+async_engine = build_async_engine(config.ASYNC_DATABASE_URL or async_url(DATABASE_URL))
+if read_url:
+    async_read_engine = build_async_engine(async_url(read_url), read_only=True)
+elif is_sqlite(DATABASE_URL):
+    async_read_engine = build_async_engine(config.ASYNC_DATABASE_URL or async_url(DATABASE_URL), read_only=True)
+else:
+    async_read_engine = async_engine
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,7 +1,21 @@
 # init_db.py
 from database import Base, engine
+from migrations import run_migrations
 import models
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-print("✅ Database initialized and tables created.")
+
+def main():
+    # Create tables, then bring older databases up to the current schema
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+
+    print("✅ Database initialized and tables created.")
+    for version, name, note in applied:
+        print(f"Applied migration {version}: {name}")
+        if note:
+            print(f"  {note}")
+
+
+# Guarded because password hashing workers are spawned processes that re-import the main module
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,43 @@
 # main.py
 from fastapi import FastAPI
-from routers import quiz,teacher
+from routers import quiz,teacher,admin,metrics
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from database import SessionLocal, engine
+from migrations import pending_migrations
+from services.quiz_status import close_expired_quizzes
+from services.scheduler import scheduler
+from services.passwords import shutdown_hash_pool
+from services.autosave import answer_buffer
+from services.write_queue import write_queue
+from services.request_metrics import RequestMetricsMiddleware
+import config
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migrations are applied by `python init_db.py`, not here: several workers booting at once would race
+    # through them. Serving an older schema fails in confusing ways, so refuse to start instead.
+    pending = pending_migrations(engine)
+    if pending:
+        steps = ", ".join(f"{version} ({name})" for version, name in pending)
+        raise RuntimeError(f"Database schema is behind, pending migrations: {steps}. Run `python init_db.py` first.")
 
-app = FastAPI()
+    # Quizzes that ended while the server was down are closed once at boot
+    db = SessionLocal()
+    try:
+        close_expired_quizzes(db)
+    finally:
+        db.close()
+    scheduler.start()
+    yield
+    scheduler.stop()
+    write_queue.stop()
+    answer_buffer.stop()
+    shutdown_hash_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,8 +45,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-SQL-Stats", "Server-Timing"],
 )
 
+if config.METRICS:
+    # Outermost, so a request's latency covers everything the app does for it
+    app.add_middleware(RequestMetricsMiddleware)
+
 
 app.include_router(quiz.router)
-app.include_router(teacher.router)
\ No newline at end of file
+app.include_router(teacher.router)
+app.include_router(teacher.login_router)
+app.include_router(admin.router)
+if config.METRICS:
+    app.include_router(metrics.router)
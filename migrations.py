@@ -0,0 +1,167 @@
+# migrations.py
+# Versioned schema changes for databases created before the current models.
+# create_all only creates missing tables, so anything that alters an existing table goes here.
+# Each step runs in its own transaction and is recorded in schema_migrations; steps must be safe on a fresh
+# database too, where create_all has already built the current schema.
+from datetime import datetime, timezone
+from sqlalchemy import inspect, select, update, delete, func, text, bindparam
+from sqlalchemy.orm import Session
+from models import User, Question, AssignedQuiz, QuizQuestion, StudentQuiz, StudentAnswer, Option, StudentQuizQuestionOrder, SchemaMigration
+from services.question_order import drop_derivable_order_rows
+from services.score_stats import rebuild_missing_quiz_stats
+from services.passwords import is_hashed, hash_passwords
+from services.search import create_search_table, rebuild_search_index
+
+
+def add_order_seed_column(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("student_quizzes")}
+    if "order_seed" not in columns:
+        conn.execute(text("ALTER TABLE student_quizzes ADD COLUMN order_seed INTEGER"))
+
+
+def drop_fixed_order_rows(conn):
+    dropped = drop_derivable_order_rows(Session(bind=conn))
+    if dropped:
+        return f"Removed {dropped} question order rows now derived from the quiz order."
+
+
+def backfill_score_stats(conn):
+    rebuilt = rebuild_missing_quiz_stats(Session(bind=conn))
+    if rebuilt:
+        return f"Built score statistics for {rebuilt} quizzes."
+
+
+def _drop_duplicates(conn, model, *columns):
+    # Keeps the oldest row of each group
+    keep = select(func.min(model.id)).group_by(*columns)
+    return conn.execute(delete(model).where(model.id.not_in(keep))).rowcount
+
+
+def _has_duplicates(conn, model, *columns):
+    groups = select(*columns).group_by(*columns).having(func.count() > 1)
+    return conn.execute(groups.limit(1)).first() is not None
+
+
+def add_lookup_indexes(conn):
+    notes = []
+    # Repeated assignments and repeated quiz questions carry no information of their own
+    removed = _drop_duplicates(conn, AssignedQuiz, AssignedQuiz.quiz_id, AssignedQuiz.student_id)
+    removed += _drop_duplicates(conn, QuizQuestion, QuizQuestion.quiz_id, QuizQuestion.question_id)
+    if removed:
+        notes.append(f"Removed {removed} duplicate assignment rows.")
+
+    for model in (AssignedQuiz, QuizQuestion, Option, StudentQuizQuestionOrder):
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+    # The answers index as this step shipped it; step 9 replaces it with the unique one the model now declares
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_student_answers_student_quiz_id ON student_answers (student_quiz_id)"))
+
+    # Duplicate attempts hold answers, so they are left for a person to resolve; the index is built without
+    # the unique constraint until then and this step can be re-run by deleting its schema_migrations row
+    for index in StudentQuiz.__table__.indexes:
+        if index.unique and _has_duplicates(conn, StudentQuiz, *index.columns):
+            columns = ", ".join(c.name for c in index.columns)
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index.name} ON student_quizzes ({columns})"))
+            notes.append(f"student_quizzes has duplicate attempts; {index.name} was created without UNIQUE.")
+        else:
+            index.create(conn, checkfirst=True)
+    return " ".join(notes) or None
+
+
+def hash_plaintext_passwords(conn):
+    users = conn.execute(select(User.id, User.password)).all()
+    plaintext = [(user_id, password) for user_id, password in users if not is_hashed(password)]
+    if not plaintext:
+        return None
+    hashed = hash_passwords([password or "" for _, password in plaintext])
+    conn.execute(
+        update(User.__table__).where(User.__table__.c.id == bindparam("user_id")).values(password=bindparam("hashed")),
+        [{"user_id": user_id, "hashed": h} for (user_id, _), h in zip(plaintext, hashed)]
+    )
+    return f"Hashed {len(plaintext)} plaintext passwords."
+
+
+def add_listing_indexes(conn):
+    # Keyset pages of the teacher listings filter on these and read the primary key range within them
+    for model in (User, Question):
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def build_search_index(conn):
+    if conn.dialect.name != "sqlite":
+        return None
+    create_search_table(conn)
+    indexed = rebuild_search_index(Session(bind=conn))
+    if indexed:
+        return f"Indexed {indexed} questions for search."
+
+
+def add_cohort_indexes(conn):
+    # Result exports by batch or semester go from the students to the quizzes they attempted
+    for model in (User, StudentQuiz):
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def unique_answers(conn):
+    # Autosave and grading upsert on (student_quiz_id, question_id); the composite index also serves the
+    # per-attempt lookups the old student_quiz_id index did
+    removed = _drop_duplicates(conn, StudentAnswer, StudentAnswer.student_quiz_id, StudentAnswer.question_id)
+    for index in StudentAnswer.__table__.indexes:
+        index.create(conn, checkfirst=True)
+    conn.execute(text("DROP INDEX IF EXISTS ix_student_answers_student_quiz_id"))
+    if removed:
+        return f"Removed {removed} duplicate answer rows."
+
+
+def add_content_version_column(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("quizzes")}
+    if "content_version" not in columns:
+        conn.execute(text("ALTER TABLE quizzes ADD COLUMN content_version INTEGER NOT NULL DEFAULT 0"))
+
+
+MIGRATIONS = [
+    (1, "student_quizzes.order_seed", add_order_seed_column),
+    (2, "drop fixed-order question order rows", drop_fixed_order_rows),
+    (3, "backfill quiz score statistics", backfill_score_stats),
+    (4, "lookup indexes for the quiz endpoints", add_lookup_indexes),
+    (5, "hash plaintext passwords", hash_plaintext_passwords),
+    (6, "indexes for the teacher listings", add_listing_indexes),
+    (7, "full-text search index over questions", build_search_index),
+    (8, "indexes for batch and semester result exports", add_cohort_indexes),
+    (9, "one answer per question per attempt", unique_answers),
+    (10, "quizzes.content_version", add_content_version_column),
+]
+
+
+def applied_versions(conn):
+    return set(conn.execute(select(SchemaMigration.version)).scalars())
+
+
+def pending_migrations(engine):
+    # (version, name) of every step the database hasn't had yet; all of them if it was never initialized
+    if not inspect(engine).has_table(SchemaMigration.__tablename__):
+        return [(version, name) for version, name, _ in MIGRATIONS]
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [(version, name) for version, name, _ in MIGRATIONS if version not in done]
+
+
+def run_migrations(engine):
+    # Returns (version, name, note) for every step applied by this call
+    SchemaMigration.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            note = step(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(
+                version=version, name=name, applied_at=datetime.now(timezone.utc).isoformat()
+            ))
+        applied.append((version, name, note))
+    return applied
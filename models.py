@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, Enum as SqlEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, Float, Index, Enum as SqlEnum
 from sqlalchemy.orm import relationship
 from database import Base
 import enum
@@ -18,6 +18,11 @@ class User(Base):
     course = Column(String, nullable=True)
     batch = Column(String, nullable=True)
     semester = Column(String, nullable=True)
+    __table_args__ = (
+        Index("ix_users_role", "role"),
+        Index("ix_users_batch", "batch"),
+        Index("ix_users_semester", "semester"),
+    )
 
 class Category(Base):
     __tablename__ = "categories"
@@ -46,6 +51,7 @@ class Question(Base):
     subcategory_id = Column(Integer, ForeignKey("subcategories.id"))
     subcategory = relationship("Subcategory", back_populates="questions")
     options = relationship("Option", back_populates="question")
+    __table_args__ = (Index("ix_questions_subcategory_id", "subcategory_id"),)
 
 class Option(Base):
     __tablename__ = "options"
@@ -55,6 +61,8 @@ class Option(Base):
     question_id = Column(Integer, ForeignKey("questions.id"))
     question = relationship("Question", back_populates="options")
 
+    __table_args__ = (Index("ix_options_question_id_is_correct", "question_id", "is_correct"),)
+
 class Quiz(Base):
     __tablename__ = "quizzes"
     id = Column(Integer, primary_key=True, index=True)
@@ -68,6 +76,8 @@ class Quiz(Base):
     is_active = Column(Boolean, default=True)
     status = Column(SqlEnum(QuizStatus), default=QuizStatus.ACTIVE)
     random_order = Column(Boolean, default=False)
+    # Bumped with every change to the quiz's questions, so each worker can tell its cached key and paper are stale
+    content_version = Column(Integer, nullable=False, default=0, server_default="0")
     questions = relationship("QuizQuestion", back_populates="quiz")
 
 class QuizQuestion(Base):
@@ -79,12 +89,19 @@ class QuizQuestion(Base):
     quiz = relationship("Quiz", back_populates="questions")
     question = relationship("Question")
 
+    __table_args__ = (Index("ix_quiz_questions_quiz_id_question_id", "quiz_id", "question_id", unique=True),)
+
 class AssignedQuiz(Base):
     __tablename__ = "assigned_quizzes"
     id = Column(Integer, primary_key=True, index=True)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"))
     student_id = Column(Integer, ForeignKey("users.id"))
 
+    __table_args__ = (
+        Index("ix_assigned_quizzes_quiz_id_student_id", "quiz_id", "student_id", unique=True),
+        Index("ix_assigned_quizzes_student_id", "student_id"),
+    )
+
 class StudentQuiz(Base):
     __tablename__ = "student_quizzes"
     id = Column(Integer, primary_key=True, index=True)
@@ -92,10 +109,16 @@ class StudentQuiz(Base):
     quiz_id = Column(Integer, ForeignKey("quizzes.id"))
     started_at = Column(String, nullable=False)
     submitted_at = Column(String, nullable=True)
-    total_score = Column(Integer, default=0)
+    total_score = Column(Float, default=0)
+    order_seed = Column(Integer, nullable=True)  # shuffle seed for random_order quizzes, NULL for fixed order
     answers = relationship("StudentAnswer", back_populates="attempt")
     question_order = relationship("StudentQuizQuestionOrder", back_populates="student_quiz")
 
+    __table_args__ = (
+        Index("ix_student_quizzes_quiz_id_student_id", "quiz_id", "student_id", unique=True),
+        Index("ix_student_quizzes_student_id_quiz_id", "student_id", "quiz_id"),
+    )
+
 class StudentAnswer(Base):
     __tablename__ = "student_answers"
     id = Column(Integer, primary_key=True, index=True)
@@ -106,6 +129,11 @@ class StudentAnswer(Base):
     marks_awarded = Column(Integer, default=0)
     attempt = relationship("StudentQuiz", back_populates="answers")
 
+    # One answer per question per attempt; autosave and grading upsert on it
+    __table_args__ = (
+        Index("ix_student_answers_student_quiz_id_question_id", "student_quiz_id", "question_id", unique=True),
+    )
+
 class StudentQuizQuestionOrder(Base):
     __tablename__ = "student_quiz_question_order"
     id = Column(Integer, primary_key=True, index=True)
@@ -115,3 +143,23 @@ class StudentQuizQuestionOrder(Base):
 
     student_quiz = relationship("StudentQuiz", back_populates="question_order")
     question = relationship("Question")
+
+    __table_args__ = (Index("ix_student_quiz_question_order_student_quiz_id_position", "student_quiz_id", "position"),)
+
+class QuizScoreStats(Base):
+    __tablename__ = "quiz_score_stats"
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+
+class QuizScoreBucket(Base):
+    __tablename__ = "quiz_score_buckets"
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), primary_key=True)
+    score = Column(Float, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(String, nullable=False)
@@ -0,0 +1,40 @@
+# routers/admin.py
+from fastapi import APIRouter, Depends
+from services.invalidation import cache_stats as quiz_cache_stats
+from services.scheduler import scheduler
+from services.auth import login_gate, require_teacher
+from services.autosave import answer_buffer
+from services.write_queue import write_queue
+from services.events import quiz_events
+from services.request_metrics import request_metrics
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_teacher)])
+
+@router.get("/cache_stats")
+def cache_stats():
+    return quiz_cache_stats()
+
+@router.get("/scheduler")
+def scheduler_queue():
+    return {"running": scheduler.running, "jobs": scheduler.jobs()}
+
+@router.get("/login_gate")
+def login_gate_stats():
+    return login_gate.stats()
+
+@router.get("/autosave")
+def autosave_stats():
+    return answer_buffer.stats()
+
+@router.get("/write_queue")
+def write_queue_stats():
+    return write_queue.stats()
+
+@router.get("/events")
+def event_stats():
+    return quiz_events.stats()
+
+@router.get("/sql")
+def sql_stats():
+    # Per-route statement counts and timings, with statements repeated often enough to look like N+1
+    return request_metrics.stats()
@@ -0,0 +1,12 @@
+# routers/metrics.py
+# Prometheus scrape endpoint. Left outside the teacher-only admin routes because scrapers can't log in;
+# QUIZ_METRICS=0 turns the accounting and this route off.
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.request_metrics import request_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,182 +1,261 @@
 # routers/quiz.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import SessionLocal
-from models import User, Quiz, QuizQuestion, Question, Option, StudentQuiz, StudentAnswer, AssignedQuiz, QuizStatus, StudentQuizQuestionOrder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from database import SessionLocal, ReadSessionLocal, AsyncSessionLocal, AsyncReadSessionLocal, get_async_read_db
+from models import User, Quiz, Question, Option, StudentQuiz, StudentAnswer, AssignedQuiz, QuizStatus
 from datetime import datetime, timezone
 from schemas.quiz_schemas import LoginData
+from services.grading import get_answer_key, grade_answers
+from services.papers import get_paper, assemble_paper
+from services.question_order import new_order_seed, attempt_question_order
+from services.leaderboard import get_leaderboard, get_leaderboards, record_score
+from services.quiz_status import effective_status, utc_now_iso
+from services.assignments import is_assigned
+from services.score_stats import read_quiz_stats
+from services.auth import login_gate, issue_token, current_session, current_stream_session, resolve_student
+from services.http_cache import check_conditional, resource_versions, REVALIDATE, SHORT_LIVED
+from services.autosave import answer_buffer
+from services.attempts import create_attempt, record_submission
+from services.write_queue import write_queue
+from services.events import quiz_events
 import json
-import random
 
 router = APIRouter()
 
+async def get_attempt_db():
+    # With the write queue on, starting and submitting only read in the request; their writes are queued
+    factory = AsyncReadSessionLocal if write_queue.enabled else AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+async def apply_write(db: AsyncSession, write, *args):
+    # write(session, *args), committed with other requests' on the write queue or on its own here
+    if write_queue.enabled:
+        return await write_queue.submit(write, *args)
+    try:
+        result = await db.run_sync(write, *args)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return result
+
+def paper_validators(request: Request, response: Response, quiz_id: int, student_id: Optional[int] = None,
+                     session: Optional[dict] = Depends(current_session)) -> dict:
+    # The paper's order is fixed per attempt, so it changes only with the quiz or its questions.
+    # Revalidated every time, so deactivating a quiz takes effect at once.
+    resolve_student(session, student_id)
+    return check_conditional(request, response, [("quiz", quiz_id), "questions"], REVALIDATE)
+
+def summary_validators(request: Request, response: Response, quiz_id: int, student_id: Optional[int] = None,
+                       session: Optional[dict] = Depends(current_session)) -> dict:
+    # The class statistics in a summary move with every submission to the quiz
+    resolve_student(session, student_id)
+    return check_conditional(request, response, [("quiz", quiz_id), "questions", ("results", quiz_id)], SHORT_LIVED)
+
 class AnswerSubmission(BaseModel):
     quiz_id: int
-    student_id: int
-    answers: Dict[int, str]  # question_id: answer (str or JSON string)
+    student_id: Optional[int] = None  # taken from the session token when left out
+    # question_id: answer (str or JSON string); only answers not already autosaved need to be sent
+    answers: Dict[int, str] = {}
 
-@router.post("/submit_quiz")
-def submit_quiz(data: AnswerSubmission):
-    db: Session = SessionLocal()
+class AutosaveAnswers(BaseModel):
+    answers: Dict[int, str]  # changed answers since the last autosave
 
-    attempt = db.query(StudentQuiz).filter_by(student_id=data.student_id, quiz_id=data.quiz_id).first()
+@router.post("/submit_quiz")
+async def submit_quiz(data: AnswerSubmission, db: AsyncSession = Depends(get_attempt_db),
+                      session: Optional[dict] = Depends(current_session)):
+    student_id = resolve_student(session, data.student_id)
+    attempt = (await db.execute(
+        select(StudentQuiz).filter_by(student_id=student_id, quiz_id=data.quiz_id)
+    )).scalars().first()
     if not attempt:
         raise HTTPException(status_code=400, detail="Quiz not started")
 
     if attempt.submitted_at:
         raise HTTPException(status_code=400, detail="Quiz already submitted")
 
-    now = datetime.now(timezone.utc).isoformat()
-    attempt.submitted_at = now
-
-    quiz = db.query(Quiz).filter_by(id=data.quiz_id).first()
-    ordered_entries = db.query(StudentQuizQuestionOrder).filter_by(student_quiz_id=attempt.id).all()
-
-    raw_score = 0
-    max_raw_score = 0
-
-    for entry in ordered_entries:
-        q = db.query(Question).filter_by(id=entry.question_id).first()
-        qq = db.query(QuizQuestion).filter_by(quiz_id=data.quiz_id, question_id=q.id).first()
-        given = data.answers.get(q.id)
-
-        if given is None:
-            continue
-
-        correct = q.correct_answer
-        is_correct = False
-        marks = qq.mark if qq and qq.mark is not None else 1
-        max_raw_score += marks
-
-        if q.question_type == "FILL_BLANK":
-            correct_vals = json.loads(correct or "[]")
-            is_correct = given.strip().lower() in [x.lower() for x in correct_vals]
-        elif q.question_type == "TRUE_FALSE":
-            is_correct = given.strip().lower() == (correct or "").strip().lower()
-        elif q.question_type == "MULTI_SELECT":
-            try:
-                given_set = set(json.loads(given))
-            except:
-                given_set = set()
-            correct_set = set(o.text for o in db.query(Option).filter_by(question_id=q.id, is_correct=True))
-            is_correct = given_set == correct_set
-        elif q.question_type == "MCQ":
-            correct_option = db.query(Option).filter_by(question_id=q.id, is_correct=True).first()
-            is_correct = (given == correct_option.text if correct_option else False)
-
-        awarded = marks if is_correct else 0
-        raw_score += awarded
-
-        db.add(StudentAnswer(
-            student_quiz_id=attempt.id,
-            question_id=q.id,
-            given_answer=given,
-            is_correct=is_correct,
-            marks_awarded=awarded
-        ))
-
-    scaled_score = round((raw_score / max_raw_score) * quiz.total_marks, 2) if max_raw_score > 0 else 0
-    attempt.total_score = scaled_score
-
-    db.commit()
-    db.close()
+    quiz = await db.get(Quiz, data.quiz_id)
+    answer_key = await db.run_sync(get_answer_key, data.quiz_id)
+    # Stored autosaves, then any still buffered, then what came with the submission. The buffer is emptied
+    # first: take() waits out a flush in progress, so its answers are stored by the time they are read.
+    attempt_id = attempt.id  # a failed write rolls the session back and expires the attempt
+    pending = await run_in_threadpool(answer_buffer.take, attempt_id)
+    try:
+        stored = {row.question_id: (row.given_answer, row.is_correct, row.marks_awarded) for row in (await db.execute(
+            select(StudentAnswer.question_id, StudentAnswer.given_answer, StudentAnswer.is_correct,
+                   StudentAnswer.marks_awarded).filter_by(student_quiz_id=attempt.id)
+        )).all()}
+        answers = {qid: given for qid, (given, _, _) in stored.items()}
+        answers.update(pending)
+        answers.update(data.answers)
+        answer_rows, raw_score, max_raw_score = grade_answers(answer_key, answers)
+        # Autosaves were graded as they were stored; only answers that are new or graded differently are written
+        changed = [row for row in answer_rows if stored.get(row["question_id"]) !=
+                   (row["given_answer"], row["is_correct"], row["marks_awarded"])]
+        scaled_score = round((raw_score / max_raw_score) * quiz.total_marks, 2) if max_raw_score > 0 else 0
+
+        now = datetime.now(timezone.utc).isoformat()
+        if not await apply_write(db, record_submission, attempt.id, data.quiz_id, now, changed,
+                                 attempt.total_score, scaled_score):
+            # A concurrent submission of the same attempt got there first
+            raise HTTPException(status_code=400, detail="Quiz already submitted")
+    except Exception:
+        # The taken answers were never stored; back into the buffer so a retry or the next flush keeps them
+        answer_buffer.put_back(attempt_id, data.quiz_id, pending)
+        raise
+    record_score(data.quiz_id, student_id, scaled_score)
+    resource_versions.bump(("results", data.quiz_id))
 
     return {
         "message": "Quiz submitted!",
         "score": scaled_score
     }
 
-@router.get("/list/{student_id}")
-def list_quizzes(student_id: int):
-    db: Session = SessionLocal()
-    now = datetime.utcnow().isoformat()
+@router.post("/quiz/{quiz_id}/autosave")
+@router.post("/quiz/{quiz_id}/autosave/{student_id}")
+async def autosave_answers(quiz_id: int, data: AutosaveAnswers, student_id: Optional[int] = None,
+                           db: AsyncSession = Depends(get_async_read_db),
+                           session: Optional[dict] = Depends(current_session)):
+    # Answers are buffered and written in batches, so autosaves only read here; with several workers the buffer
+    # is off and the answers are stored before this returns
+    student_id = resolve_student(session, student_id)
+    quiz = await db.get(Quiz, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if effective_status(quiz.status, quiz.quiz_end_time, utc_now_iso()) == QuizStatus.COMPLETED:
+        raise HTTPException(status_code=403, detail="Quiz is already marked as completed.")
 
-    assigned_ids = db.query(AssignedQuiz.quiz_id).filter_by(student_id=student_id).subquery()
-    quizzes = db.query(Quiz).filter(Quiz.id.in_(assigned_ids), Quiz.is_active == True).all()
+    attempt = (await db.execute(
+        select(StudentQuiz.id, StudentQuiz.submitted_at).filter_by(quiz_id=quiz_id, student_id=student_id)
+    )).first()
+    if not attempt:
+        raise HTTPException(status_code=400, detail="Quiz not started")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=400, detail="Quiz already submitted")
 
-    active, upcoming, completed = [], [], []
+    answer_key = await db.run_sync(get_answer_key, quiz_id)
+    unknown = sorted(qid for qid in data.answers if qid not in answer_key)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Questions not in this quiz: {unknown}")
+    if answer_buffer.buffered:
+        answer_buffer.add(attempt.id, quiz_id, data.answers)
+    else:
+        await run_in_threadpool(answer_buffer.add, attempt.id, quiz_id, data.answers)
+    return {"message": "Answers saved", "saved": len(data.answers)}
+
+@router.get("/list")
+@router.get("/list/{student_id}")
+async def list_quizzes(student_id: Optional[int] = None, db: AsyncSession = Depends(get_async_read_db),
+                       session: Optional[dict] = Depends(current_session)):
+    student_id = resolve_student(session, student_id)
+    now = utc_now_iso()
+
+    # One joined read for every assigned quiz and this student's attempt on it
+    assigned_ids = select(AssignedQuiz.quiz_id).where(AssignedQuiz.student_id == student_id)
+    rows = (await db.execute(
+        select(Quiz.id, Quiz.title, Quiz.start_time, Quiz.quiz_end_time, Quiz.duration_minutes,
+               Quiz.total_marks, Quiz.status, StudentQuiz.id, StudentQuiz.total_score)
+        .outerjoin(StudentQuiz, (StudentQuiz.quiz_id == Quiz.id) & (StudentQuiz.student_id == student_id))
+        .where(Quiz.id.in_(assigned_ids), Quiz.is_active == True)
+        .order_by(Quiz.id, StudentQuiz.id)
+    )).all()
+
+    quizzes = {}
+    for row in rows:
+        quizzes.setdefault(row[0], row)
+
+    ranked_ids = [
+        quiz_id for quiz_id, row in quizzes.items()
+        if row[7] is not None and effective_status(row[6], row[3], now) == QuizStatus.COMPLETED
+    ]
+    boards = await db.run_sync(get_leaderboards, ranked_ids) if ranked_ids else {}
 
-    for quiz in quizzes:
-        # ✅ Auto-complete if past end time and still ACTIVE
-        if quiz.quiz_end_time and quiz.status == QuizStatus.ACTIVE:
-            if quiz.quiz_end_time < now:
-                quiz.status = QuizStatus.COMPLETED
-                db.commit()
+    active, upcoming, completed = [], [], []
 
-        attempted = db.query(StudentQuiz).filter_by(student_id=student_id, quiz_id=quiz.id).first()
+    for quiz_id, title, start_time, quiz_end_time, duration_minutes, total_marks, status, attempt_id, total_score in quizzes.values():
+        status = effective_status(status, quiz_end_time, now)
+        attempted = attempt_id is not None
         item = {
-            "quiz_id": quiz.id,
-            "title": quiz.title,
-            "start_time": quiz.start_time,
-            "duration_minutes": quiz.duration_minutes,
-            "total_marks": quiz.total_marks,
-            "attempted": attempted is not None,
-            "score": attempted.total_score if attempted else None,
-            "status": quiz.status
+            "quiz_id": quiz_id,
+            "title": title,
+            "start_time": start_time,
+            "duration_minutes": duration_minutes,
+            "total_marks": total_marks,
+            "attempted": attempted,
+            "score": total_score if attempted else None,
+            "status": status
         }
 
         if attempted:
-            if quiz.status == QuizStatus.COMPLETED:
-                scores = db.query(StudentQuiz).filter_by(quiz_id=quiz.id).order_by(StudentQuiz.total_score.desc()).all()
-                rank = next((i+1 for i, s in enumerate(scores) if s.student_id == student_id), None)
-                item["position"] = rank
+            if status == QuizStatus.COMPLETED:
+                item["position"] = boards[quiz_id].rank(student_id)
             completed.append(item)
-        elif quiz.start_time > now:
+        elif start_time and start_time > now:
             upcoming.append(item)
         else:
-            if quiz.status == QuizStatus.COMPLETED:
+            if status == QuizStatus.COMPLETED:
                 completed.append(item)
             else:
                 active.append(item)
 
-    db.close()
     return {
         "active": active,
         "upcoming": upcoming,
         "completed": completed
     }
 
+@router.get("/events")
+@router.get("/events/{student_id}")
+async def quiz_event_stream(student_id: Optional[int] = None, session: Optional[dict] = Depends(current_stream_session)):
+    # Server-sent events for the student's quizzes, in place of polling /list: quiz_opened, quiz_activated,
+    # quiz_deactivated, quiz_completed (results and positions are out), quiz_reopened, quiz_assigned, and
+    # resync when the client fell behind and should reload /list
+    student_id = resolve_student(session, student_id)
+    if quiz_events.full:
+        raise HTTPException(status_code=503, detail="Too many event streams", headers={"Retry-After": "30"})
+    return StreamingResponse(quiz_events.stream(student_id), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/quiz/{quiz_id}/questions")
 @router.get("/quiz/{quiz_id}/questions/{student_id}")
-def get_ordered_questions(quiz_id: int, student_id: int):
-    db: Session = SessionLocal()
-
-    quiz = db.query(Quiz).filter_by(id=quiz_id, is_active=True).first()
+async def get_ordered_questions(quiz_id: int, student_id: Optional[int] = None,
+                                session: Optional[dict] = Depends(current_session),
+                                validators: dict = Depends(paper_validators),
+                                db: AsyncSession = Depends(get_async_read_db)):
+    student_id = resolve_student(session, student_id)
+    quiz = (await db.execute(select(Quiz).filter_by(id=quiz_id, is_active=True))).scalars().first()
     if not quiz:
-        db.close()
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    attempt = db.query(StudentQuiz).filter_by(quiz_id=quiz_id, student_id=student_id).first()
+    attempt = (await db.execute(select(StudentQuiz).filter_by(quiz_id=quiz_id, student_id=student_id))).scalars().first()
     if not attempt:
-        db.close()
         raise HTTPException(status_code=400, detail="Quiz not started")
 
-    question_order = db.query(StudentQuizQuestionOrder).filter_by(student_quiz_id=attempt.id).order_by(StudentQuizQuestionOrder.position).all()
-
-    questions_data = []
-    for entry in question_order:
-        q = db.query(Question).filter_by(id=entry.question_id).first()
-        opts = db.query(Option).filter_by(question_id=q.id).all() if q.question_type in ["MCQ", "MULTI_SELECT", "TRUE_FALSE"] else []
-        questions_data.append({
-            "question_id": q.id,
-            "question_text": q.question_text,
-            "question_type": q.question_type,
-            "options": [{"text": o.text} for o in opts]
-        })
+    fragments = await db.run_sync(get_paper, quiz_id)
+    question_ids = await db.run_sync(attempt_question_order, attempt, quiz, list(fragments))
 
-    db.close()
-    return {
+    header = {
         "quiz_id": quiz_id,
         "title": quiz.title,
         "duration_minutes": quiz.duration_minutes,
-        "total_marks": quiz.total_marks,
-        "questions": questions_data
+        "total_marks": quiz.total_marks
     }
+    return Response(content=assemble_paper(header, fragments, question_ids), media_type="application/json",
+                    headers=validators)
 
+@router.get("/quiz/{quiz_id}/summary")
 @router.get("/quiz/{quiz_id}/summary/{student_id}")
-def get_quiz_summary(quiz_id: int, student_id: int):
+def get_quiz_summary(quiz_id: int, student_id: Optional[int] = None, session: Optional[dict] = Depends(current_session),
+                     validators: dict = Depends(summary_validators)):
+    student_id = resolve_student(session, student_id)
     db: Session = SessionLocal()
     quiz = db.query(Quiz).filter_by(id=quiz_id).first()
     if not quiz:
@@ -186,10 +265,7 @@ def get_quiz_summary(quiz_id: int, student_id: int):
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
 
-    total_attempts = db.query(StudentQuiz).filter_by(quiz_id=quiz_id).count()
-    scores = [s.total_score for s in db.query(StudentQuiz).filter_by(quiz_id=quiz_id).all()]
-    average = sum(scores) / len(scores) if scores else 0
-    median = sorted(scores)[len(scores)//2] if scores else 0
+    stats = read_quiz_stats(db, quiz_id)
 
     answers = (
         db.query(StudentAnswer, Question)
@@ -198,13 +274,23 @@ def get_quiz_summary(quiz_id: int, student_id: int):
         .all()
     )
 
+    # Correct options for every answered choice question in one query, not one per answer
+    choice_ids = {q.id for _, q in answers if q.question_type in ["MCQ", "MULTI_SELECT"]}
+    correct_options = {}
+    if choice_ids:
+        for qid, text in db.execute(
+            select(Option.question_id, Option.text)
+            .where(Option.question_id.in_(choice_ids), Option.is_correct == True)
+            .order_by(Option.id)
+        ):
+            correct_options.setdefault(qid, []).append(text)
+
     answer_list = []
 
     for a, q in answers:
         correct = None
         if q.question_type in ["MCQ", "MULTI_SELECT"]:
-            opts = db.query(Option).filter_by(question_id=q.id, is_correct=True).all()
-            correct = [o.text for o in opts]
+            correct = correct_options.get(q.id, [])
             if q.question_type == "MCQ" and correct:
                 correct = correct[0]
         elif q.question_type == "TRUE_FALSE":
@@ -226,61 +312,83 @@ def get_quiz_summary(quiz_id: int, student_id: int):
         "quiz_title": quiz.title,
         "total_marks": quiz.total_marks,
         "your_score": attempt.total_score,
-        "students_attended": total_attempts,
-        "average_marks": round(average, 2),
-        "median_marks": median,
+        "students_attended": stats["attempts"],
+        "average_marks": round(stats["average"], 2),
+        "median_marks": stats["median"],
         "answers": answer_list
     }
 
-@router.post("/login")
-def login(data: LoginData):
-    db: Session = SessionLocal()
-    user = db.query(User).filter_by(email=data.email).first()
+@router.get("/quiz/{quiz_id}/leaderboard")
+def get_quiz_leaderboard(quiz_id: int, limit: int = Query(10, ge=1, le=100), student_id: Optional[int] = None,
+                         session: Optional[dict] = Depends(current_session)):
+    student_id = resolve_student(session, student_id, required=False)
+    db: Session = ReadSessionLocal()
+    quiz = db.query(Quiz).filter_by(id=quiz_id).first()
+    if not quiz:
+        db.close()
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    board = get_leaderboard(db, quiz_id)
+    top = board.top(limit)
+    names = dict(db.query(User.id, User.name).filter(User.id.in_([t["student_id"] for t in top])).all())
     db.close()
 
-    if not user or user.password != data.password:
+    for entry in top:
+        entry["name"] = names.get(entry["student_id"])
+
+    response = {
+        "quiz_id": quiz_id,
+        "title": quiz.title,
+        "total_marks": quiz.total_marks,
+        "students_attended": len(board),
+        "top": top
+    }
+    if student_id is not None:
+        response["you"] = {
+            "student_id": student_id,
+            "rank": board.rank(student_id),
+            "percentile": board.percentile(student_id)
+        }
+    return response
+
+@router.post("/login")
+async def login(data: LoginData, db: AsyncSession = Depends(get_async_read_db)):
+    user = (await db.execute(
+        select(User.id, User.name, User.email, User.role, User.password).filter_by(email=data.email)
+    )).first()
+
+    if not user or not await login_gate.verify(data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    return {"id": user.id, "name": user.name, "email": user.email}
+    return {"id": user.id, "name": user.name, "email": user.email, "token": issue_token(user.id, user.role)}
 
+@router.post("/start_quiz/{quiz_id}")
 @router.post("/start_quiz/{quiz_id}/{student_id}")
-def start_quiz(quiz_id: int, student_id: int):
-    db: Session = SessionLocal()
+async def start_quiz(quiz_id: int, student_id: Optional[int] = None, db: AsyncSession = Depends(get_attempt_db),
+                     session: Optional[dict] = Depends(current_session)):
+    student_id = resolve_student(session, student_id)
+    quiz = await db.get(Quiz, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
 
-    quiz = db.query(Quiz).filter_by(id=quiz_id).first()
-    if quiz.status == QuizStatus.COMPLETED:
-        db.close()
+    if effective_status(quiz.status, quiz.quiz_end_time, utc_now_iso()) == QuizStatus.COMPLETED:
         raise HTTPException(status_code=403, detail="Quiz is already marked as completed.")
 
-    existing = db.query(StudentQuiz).filter_by(student_id=student_id, quiz_id=quiz_id).first()
+    if not await db.run_sync(is_assigned, quiz_id, student_id):
+        raise HTTPException(status_code=403, detail="Quiz is not assigned to this student.")
+
+    existing = (await db.execute(select(StudentQuiz.id).filter_by(student_id=student_id, quiz_id=quiz_id))).first()
     if existing:
-        db.close()
         return {"message": "Quiz already started"}
 
     now = datetime.now(timezone.utc).isoformat()
-    student_quiz = StudentQuiz(
-        student_id=student_id,
-        quiz_id=quiz_id,
-        started_at=now,
-        submitted_at=None,
-        total_score=0
-    )
-    db.add(student_quiz)
-    db.commit()
-    db.refresh(student_quiz)
-
-    quiz_questions = db.query(QuizQuestion).filter_by(quiz_id=quiz_id).all()
-    question_ids = [qq.question_id for qq in quiz_questions]
-    if quiz.random_order:
-        random.shuffle(question_ids)
-
-    for pos, qid in enumerate(question_ids):
-        db.add(StudentQuizQuestionOrder(
-            student_quiz_id=student_quiz.id,
-            question_id=qid,
-            position=pos
-        ))
-
-    db.commit()
-    db.close()
+    try:
+        await apply_write(db, create_attempt, quiz_id, student_id, now, new_order_seed(quiz.random_order))
+    except IntegrityError:
+        # A concurrent start for the same student won the unique (quiz_id, student_id) index
+        return {"message": "Quiz already started"}
+    record_score(quiz_id, student_id, 0)
+    # The teacher's quiz list shows whether a quiz has been attempted; the summary's class statistics count
+    # every started attempt
+    resource_versions.bump("quizzes", ("results", quiz_id))
     return {"message": "Quiz started"}
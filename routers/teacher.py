@@ -1,17 +1,39 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, Path, Body, UploadFile, File
-from fastapi.responses import PlainTextResponse
+from fastapi import APIRouter, Depends, Query, HTTPException, Path, Body, UploadFile, File, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from database import SessionLocal
-from models import Question, Option, Category, Subcategory, Quiz, QuizStatus, QuizQuestion, User, AssignedQuiz, StudentQuiz
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SessionLocal, ReadSessionLocal, get_async_read_db
+from models import Question, Option, Category, Subcategory, Quiz, QuizStatus, QuizQuestion, User, AssignedQuiz, StudentQuiz, QuizScoreStats, QuizScoreBucket
 from schemas.teacher_schemas import QuestionCreateSchema, QuizCreateSchema, QuestionUpdateSchema, UserCreateSchema, CategoryCreateSchema
+from services.invalidation import invalidate_quiz, invalidate_question, mark_quiz_changed, mark_question_changed
+from services.score_stats import read_quiz_stats
+from services.item_analysis import get_item_analysis
+from services.quiz_status import effective_status, utc_now_iso
+from services.assignments import assigned_students_cache
+from services.scheduler import scheduler
+from services.events import quiz_events, publish_quiz_event
+from services.aiken import import_aiken, read_lines
+from services.passwords import hash_password
+from services.auth import login_gate, issue_token, require_teacher
+from services.user_import import import_users
+from services.jobs import start_job, get_job
+from services.pagination import keyset_page, encode_cursor, decode_cursor, DEFAULT_LIMIT, MAX_LIMIT
+from services.search import index_questions, search_questions
+from services.exports import FORMATS as EXPORT_FORMATS, question_query, has_questions, stream_export, gzip_stream
+from services.result_exports import RESULT_FORMATS, select_quizzes
+from services.http_cache import conditional, resource_versions, REVALIDATE
 from pydantic import BaseModel
 from typing import List, Optional
-from sqlalchemy import text
-from datetime import datetime
-import csv
-import codecs
+from sqlalchemy import text, select, insert
+import shutil
+import tempfile
 
-router = APIRouter(prefix="/teacher", tags=["Teacher"])
+# Everything under /teacher needs a teacher's token, except login, which issues one
+router = APIRouter(prefix="/teacher", tags=["Teacher"], dependencies=[Depends(require_teacher)])
+login_router = APIRouter(prefix="/teacher", tags=["Teacher"])
+
+# User listings never carry the password hash
+USER_LIST_COLUMNS = (User.id, User.name, User.email, User.role, User.college, User.course, User.batch, User.semester)
 
 def get_db():
     db = SessionLocal()
@@ -20,6 +42,20 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _quiz_list_resources(request: Request):
+    # A quiz past its end time lists as COMPLETED; only the scheduler's close job bumps the version then
+    return ["quizzes"] if scheduler.running else None
+
+categories_validators = conditional(lambda request: ["categories"], REVALIDATE)
+quiz_list_validators = conditional(_quiz_list_resources, REVALIDATE)
+
 @router.post("/add_question")
 def add_question(question_data: QuestionCreateSchema, db: Session = Depends(get_db)):
     new_question = Question(
@@ -44,12 +80,13 @@ def add_question(question_data: QuestionCreateSchema, db: Session = Depends(get_
                 question_id=new_question.id
             )
             db.add(option)
-        db.commit()
+    index_questions(db, [new_question.id])
+    db.commit()
 
     return {"message": "Question added", "question_id": new_question.id}
 
 @router.get("/categories")
-def get_categories_with_subcategories(db: Session = Depends(get_db)):
+def get_categories_with_subcategories(validators: dict = Depends(categories_validators), db: Session = Depends(get_read_db)):
     categories = db.query(Category).all()
     result = []
     for cat in categories:
@@ -62,22 +99,40 @@ def get_categories_with_subcategories(db: Session = Depends(get_db)):
 
 
 @router.get("/subcategories/{category_id}")
-def get_subcategories(category_id: int, db: Session = Depends(get_db)):
+def get_subcategories(category_id: int, db: Session = Depends(get_read_db)):
     return db.query(Subcategory).filter(Subcategory.category_id == category_id).all()
 
 @router.get("/questions")
 def get_all_questions(
     subcategory_id: int = Query(None),
     category_id: int = Query(None),
-    db: Session = Depends(get_db)
+    question_type: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Question)
+    stmt = select(Question.id, Question.question_text, Question.question_type, Question.subcategory_id)
     if subcategory_id:
-        query = query.filter(Question.subcategory_id == subcategory_id)
+        stmt = stmt.where(Question.subcategory_id == subcategory_id)
     elif category_id:
-        query = query.join(Subcategory).filter(Subcategory.category_id == category_id)
-    questions = query.all()
-    return [{"id": q.id, "question_text": q.question_text} for q in questions]
+        stmt = stmt.join(Subcategory, Subcategory.id == Question.subcategory_id).where(Subcategory.category_id == category_id)
+    if question_type:
+        stmt = stmt.where(Question.question_type == question_type)
+    return keyset_page(db, stmt, Question.id, cursor, limit)
+
+@router.get("/questions/search")
+def search_bank(
+    q: str = Query(..., min_length=1),
+    question_type: Optional[str] = Query(None),
+    subcategory_id: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db)
+):
+    # Ranked results page by position: the cursor is the offset of the next page
+    offset = decode_cursor(cursor)
+    items, more = search_questions(db, q, question_type, subcategory_id, offset, limit)
+    return {"items": items, "next_cursor": encode_cursor(offset + limit) if more else None}
 
 @router.post("/create_quiz")
 def create_quiz(data: QuizCreateSchema, db: Session = Depends(get_db)):
@@ -96,29 +151,36 @@ def create_quiz(data: QuizCreateSchema, db: Session = Depends(get_db)):
     db.add(quiz)
     db.commit()
     db.refresh(quiz)
+    scheduler.schedule_quiz(quiz)
+    resource_versions.bump("quizzes")
     return {"id": quiz.id, "title": quiz.title}
 
 @router.post("/assign_questions")
 def assign_questions(data: dict, db: Session = Depends(get_db)):
     quiz_id = data["quiz_id"]
     question_ids = data["question_ids"]
-    for qid in question_ids:
+    already = set(db.execute(select(QuizQuestion.question_id).where(QuizQuestion.quiz_id == quiz_id)).scalars())
+    for qid in dict.fromkeys(q for q in question_ids if q not in already):
         db.add(QuizQuestion(quiz_id=quiz_id, question_id=qid))
+    mark_quiz_changed(db, quiz_id)
     db.commit()
+    invalidate_quiz(quiz_id)
     return {"message": "Questions assigned to quiz successfully."}
 
 @router.get("/students")
 def get_students(
     semester: Optional[int] = Query(None),
     batch: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(User).filter(User.role == "student")
+    stmt = select(*USER_LIST_COLUMNS).where(User.role == "student")
     if semester is not None:
-        query = query.filter(User.semester == semester)
+        stmt = stmt.where(User.semester == semester)
     if batch is not None:
-        query = query.filter(User.batch == batch)
-    return query.all()
+        stmt = stmt.where(User.batch == batch)
+    return keyset_page(db, stmt, User.id, cursor, limit)
 
 
 
@@ -127,35 +189,43 @@ def assign_students(quiz_id: int = Path(...), data: dict = None, db: Session = D
     student_ids = data.get("student_ids", [])
     if not student_ids:
         raise HTTPException(status_code=400, detail="No students selected.")
-    for sid in student_ids:
-        db.execute(text("INSERT OR IGNORE INTO assigned_quizzes (quiz_id, student_id) VALUES (:quiz_id, :student_id)"), {"quiz_id": quiz_id, "student_id": sid})
+    already = set(db.execute(select(AssignedQuiz.student_id).where(AssignedQuiz.quiz_id == quiz_id)).scalars())
+    new_ids = list(dict.fromkeys(sid for sid in student_ids if sid not in already))
+    if new_ids:
+        db.execute(insert(AssignedQuiz), [{"quiz_id": quiz_id, "student_id": sid} for sid in new_ids])
     db.commit()
+    assigned_students_cache.invalidate_quiz(quiz_id)
+    if new_ids:
+        quiz_events.publish(new_ids, "quiz_assigned", {"quiz_id": quiz_id})
     return {"message": f"{len(student_ids)} students assigned to quiz {quiz_id}."}
 
 @router.get("/quizzes")
-def get_quizzes(include_creator: bool = False, db: Session = Depends(get_db)):
-    quizzes = db.query(Quiz).all()
-    response = []
-    for quiz in quizzes:
-        creator_name = None
-        if include_creator:
-            creator = db.query(User).filter(User.id == quiz.created_by).first()
-            creator_name = creator.name if creator else None
-
-        attempted = db.query(StudentQuiz).filter_by(quiz_id=quiz.id).first() is not None
-
-        response.append({
-            "id": quiz.id,
-            "title": quiz.title,
-            "total_marks": quiz.total_marks,
-            "duration_minutes": quiz.duration_minutes,
-            "created_by": quiz.created_by,
-            "created_by_name": creator_name,
-            "is_active": quiz.is_active,
-            "status": quiz.status.value if hasattr(quiz.status, 'value') else quiz.status,
-            "attempted": attempted  # ✅ Add this field
-        })
-    return response
+def get_quizzes(
+    created_by: Optional[int] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    validators: dict = Depends(quiz_list_validators),
+    db: Session = Depends(get_read_db)
+):
+    # Creator name and "attempted" come from the same statement: an outer join to users and an EXISTS probe
+    # on the (quiz_id, student_id) index, instead of two queries per quiz
+    attempted = select(StudentQuiz.id).where(StudentQuiz.quiz_id == Quiz.id).exists()
+    stmt = (
+        select(Quiz.id, Quiz.title, Quiz.total_marks, Quiz.duration_minutes, Quiz.created_by,
+               User.name.label("created_by_name"), Quiz.is_active, Quiz.status, Quiz.quiz_end_time,
+               attempted.label("attempted"))
+        .outerjoin(User, User.id == Quiz.created_by)
+    )
+    if created_by is not None:
+        stmt = stmt.where(Quiz.created_by == created_by)
+    if is_active is not None:
+        stmt = stmt.where(Quiz.is_active == is_active)
+    page = keyset_page(db, stmt, Quiz.id, cursor, limit)
+    now = utc_now_iso()
+    for item in page["items"]:
+        item["status"] = effective_status(item["status"], item.pop("quiz_end_time"), now).value
+    return page
 
 
 @router.post("/toggle_quiz_status/{quiz_id}")
@@ -165,6 +235,11 @@ def toggle_quiz_status(quiz_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Quiz not found")
     quiz.status = QuizStatus.COMPLETED if quiz.status == QuizStatus.ACTIVE else QuizStatus.ACTIVE
     db.commit()
+    scheduler.schedule_quiz(quiz)
+    resource_versions.bump("quizzes")
+    if quiz.is_active:
+        event = "quiz_completed" if quiz.status == QuizStatus.COMPLETED else "quiz_reopened"
+        publish_quiz_event(db, quiz_id, event, status=quiz.status.value)
     return {"message": "Quiz status toggled", "new_status": quiz.status.value}
 
 @router.post("/toggle_quiz_active/{quiz_id}")
@@ -174,87 +249,61 @@ def toggle_quiz_active(quiz_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Quiz not found")
     quiz.is_active = not quiz.is_active
     db.commit()
+    scheduler.schedule_quiz(quiz)
+    resource_versions.bump("quizzes", ("quiz", quiz_id))
+    publish_quiz_event(db, quiz_id, "quiz_activated" if quiz.is_active else "quiz_deactivated",
+                       status=quiz.status.value)
     return {"message": "Quiz active state toggled", "is_active": quiz.is_active}
 
 @router.post("/bulk_upload_questions")
-def bulk_upload_questions(subcategory_id: int = Query(...), created_by: int = Query(...), file: UploadFile = File(...), db: Session = Depends(get_db)):
-    content = file.file.read().decode("utf-8")
-    questions_added, errors = 0, []
-    blocks = content.strip().split("\n\n")
-    for block in blocks:
-        lines = block.strip().split("\n")
-        if len(lines) < 3:
-            errors.append(f"Invalid format: {block}")
-            continue
-        question_text, options, correct_letter = lines[0], [], None
-        for line in lines[1:]:
-            if line.strip().startswith("ANSWER:"):
-                correct_letter = line.split("ANSWER:")[1].strip()
-            else:
-                parts = line.strip().split(")", 1)
-                if len(parts) == 2:
-                    options.append((parts[0].strip(), parts[1].strip()))
-        if correct_letter is None or len(options) < 2:
-            errors.append(f"Missing ANSWER or too few options: {block}")
-            continue
-        correct_text = next((text for label, text in options if label.upper() == correct_letter.upper()), None)
-        if not correct_text:
-            errors.append(f"Correct answer label '{correct_letter}' not found in: {question_text}")
-            continue
-        q = Question(question_text=question_text, question_type="MCQ", correct_answer=correct_text, subcategory_id=subcategory_id, created_by=created_by, created_at=datetime.utcnow().isoformat(), is_active=True)
-        db.add(q)
-        db.commit()
-        db.refresh(q)
-        for _, text in options:
-            db.add(Option(text=text, is_correct=(text == correct_text), question_id=q.id))
-        db.commit()
-        questions_added += 1
-    return {"uploaded": questions_added, "errors": errors}
+def bulk_upload_questions(
+    subcategory_id: int = Query(...),
+    created_by: int = Query(...),
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False),
+    savepoints: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    # dry_run validates the whole file without writing; savepoints keeps good batches if one fails to insert
+    return import_aiken(db, read_lines(file.file), subcategory_id, created_by, dry_run=dry_run, savepoints=savepoints)
+
+def _export(fmt: str, subcategory_id: Optional[int], category_id: Optional[int], compress: bool, db: Session):
+    media_type, extension, mcq_only, *_ = EXPORT_FORMATS[fmt]
+    stmt = question_query(subcategory_id, category_id, ["MCQ"] if mcq_only else None)
+    if not has_questions(db, stmt):
+        kind = "MCQ questions" if mcq_only else "questions"
+        return PlainTextResponse(f"No {kind} found for given filters.", status_code=404)
+    body = stream_export(ReadSessionLocal, fmt, stmt)
+    headers = {}
+    if compress:
+        body, media_type = gzip_stream(body), "application/gzip"
+        headers["Content-Disposition"] = f'attachment; filename="questions.{extension}.gz"'
+    elif fmt in ("moodle", "csv"):
+        headers["Content-Disposition"] = f'attachment; filename="questions.{extension}"'
+    return StreamingResponse(body, media_type=media_type, headers=headers)
 
 @router.get("/export/aiken", response_class=PlainTextResponse)
-def export_aiken(subcategory_id: Optional[int] = Query(None), category_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
-    query = db.query(Question).filter(Question.question_type == "MCQ")
-    if subcategory_id:
-        query = query.filter(Question.subcategory_id == subcategory_id)
-    elif category_id:
-        query = query.join(Subcategory).filter(Subcategory.category_id == category_id)
-    questions = query.all()
-    if not questions:
-        return PlainTextResponse("No MCQ questions found for given filters.", status_code=404)
-    lines, option_letters = [], ['A', 'B', 'C', 'D']
-    for q in questions:
-        lines.append(q.question_text.strip())
-        options = sorted(q.options, key=lambda o: o.id)[:4]
-        correct = next((option_letters[i] for i, o in enumerate(options) if o.is_correct), None)
-        for i, o in enumerate(options):
-            lines.append(f"{option_letters[i]}. {o.text.strip()}")
-        if correct:
-            lines.append(f"ANSWER: {correct}\n")
-    return "\n".join(lines)
+def export_aiken(subcategory_id: Optional[int] = Query(None), category_id: Optional[int] = Query(None), gzip: bool = Query(False), db: Session = Depends(get_read_db)):
+    return _export("aiken", subcategory_id, category_id, gzip, db)
 
 @router.get("/export/gift", response_class=PlainTextResponse)
-def export_gift(category_id: Optional[int] = Query(None), subcategory_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
-    query = db.query(Question).filter(Question.question_type == "MCQ")
-    if subcategory_id:
-        query = query.filter(Question.subcategory_id == subcategory_id)
-    elif category_id:
-        query = query.join(Subcategory).filter(Subcategory.category_id == category_id)
-    def escape(text): return text.replace("{", "\\{").replace("}", "\\}").replace("=", "\\=").replace("~", "\\~")
-    lines = []
-    for q in query.all():
-        lines.append(f"::Q{q.id}:: {escape(q.question_text.strip())} {{")
-        for o in q.options:
-            symbol = "=" if o.is_correct else "~"
-            lines.append(f"{symbol}{escape(o.text.strip())}")
-        lines.append("}\n")
-    return "\n".join(lines)
+def export_gift(category_id: Optional[int] = Query(None), subcategory_id: Optional[int] = Query(None), gzip: bool = Query(False), db: Session = Depends(get_read_db)):
+    return _export("gift", subcategory_id, category_id, gzip, db)
+
+@router.get("/export/moodle")
+def export_moodle(category_id: Optional[int] = Query(None), subcategory_id: Optional[int] = Query(None), gzip: bool = Query(False), db: Session = Depends(get_read_db)):
+    return _export("moodle", subcategory_id, category_id, gzip, db)
+
+@router.get("/export/csv")
+def export_csv(category_id: Optional[int] = Query(None), subcategory_id: Optional[int] = Query(None), gzip: bool = Query(False), db: Session = Depends(get_read_db)):
+    return _export("csv", subcategory_id, category_id, gzip, db)
 
 @router.post("/add_user")
 def add_user(user: UserCreateSchema, db: Session = Depends(get_db)):
     if db.query(User).filter(User.email == user.email).first():
         raise HTTPException(status_code=400, detail="Email already exists")
     new_user = User(
-        name=user.name, email=user.email, password=user.password, role=user.role,
+        name=user.name, email=user.email, password=hash_password(user.password), role=user.role,
         college=user.college, batch=user.batch, semester=user.semester, course=user.course
     )
     db.add(new_user)
@@ -263,38 +312,45 @@ def add_user(user: UserCreateSchema, db: Session = Depends(get_db)):
     return {"message": "User added successfully", "user_id": new_user.id}
 
 @router.post("/bulk_upload_users")
-def bulk_upload_users(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    reader = csv.DictReader(codecs.iterdecode(file.file, 'utf-8'))
-    created, failed = 0, 0
-    for row in reader:
-        try:
-            user = User(
-                name=row["name"],
-                email=row["email"],
-                password=row["password"],  # 🔒 Consider hashing
-                role=row["role"],
-                college=row.get("college"),
-                batch=row.get("batch"),
-                semester=row.get("semester"),
-                course=row.get("course")  # ✅ NEW FIELD
-            )
-            db.add(user)
-            created += 1
-        except Exception as e:
-            print(f"Failed to add {row.get('email', '[no email]')}: {e}")
-            failed += 1
-    db.commit()
-    return {"created": created, "failed": failed}
+def bulk_upload_users(file: UploadFile = File(...), background: bool = Query(False), db: Session = Depends(get_db)):
+    if not background:
+        return import_users(db, file.file)
+
+    # The upload is closed once this request returns, so the job works from its own copy
+    copy = tempfile.TemporaryFile()
+    shutil.copyfileobj(file.file, copy)
+    total_bytes = copy.tell()
+    copy.seek(0)
+    job = start_job("bulk_upload_users", _run_user_import, copy, total_bytes)
+    return {"job_id": job.id, "status_url": f"/teacher/jobs/{job.id}"}
+
+def _run_user_import(job, upload, total_bytes):
+    db = SessionLocal()
+    try:
+        return import_users(db, upload, progress=job.update, total_bytes=total_bytes)
+    finally:
+        db.close()
+        upload.close()
 
+@router.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.snapshot()
 
-@router.post("/login")
-def login(data: dict, db: Session = Depends(get_db)):
+
+@login_router.post("/login")
+async def login(data: dict, db: AsyncSession = Depends(get_async_read_db)):
     email = data.get("email")
     password = data.get("password")
-    user = db.query(User).filter(User.email == email).first()
-    if not user or user.password != password:
+    user = (await db.execute(
+        select(User.id, User.name, User.email, User.role, User.password).where(User.email == email)
+    )).first()
+    if not user or not await login_gate.verify(password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    return {"id": user.id, "name": user.name, "email": user.email, "role": user.role}
+    return {"id": user.id, "name": user.name, "email": user.email, "role": user.role,
+            "token": issue_token(user.id, user.role)}
 
 # CRUD for category
 @router.post("/category")
@@ -306,6 +362,7 @@ def create_category(data: CategoryCreateSchema, db: Session = Depends(get_db)):
     db.add(cat)
     db.commit()
     db.refresh(cat)
+    resource_versions.bump("categories")
     return cat
 
 @router.put("/category/{id}")
@@ -315,6 +372,7 @@ def update_category(id: int, name: str = Body(...), db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Not found")
     cat.name = name
     db.commit()
+    resource_versions.bump("categories")
     return {"message": "Updated"}
 
 @router.delete("/category/{id}")
@@ -324,6 +382,7 @@ def delete_category(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Not found")
     db.delete(cat)
     db.commit()
+    resource_versions.bump("categories")
     return {"message": "Deleted"}
 
 @router.post("/subcategory")
@@ -332,6 +391,7 @@ def create_subcategory(name: str = Body(...), category_id: int = Body(...), db:
     db.add(sub)
     db.commit()
     db.refresh(sub)
+    resource_versions.bump("categories")
     return sub
 
 @router.put("/subcategory/{id}")
@@ -341,6 +401,7 @@ def update_subcategory(id: int, name: str = Body(...), db: Session = Depends(get
         raise HTTPException(status_code=404, detail="Not found")
     sub.name = name
     db.commit()
+    resource_versions.bump("categories")
     return {"message": "Updated"}
 
 @router.delete("/subcategory/{id}")
@@ -350,6 +411,7 @@ def delete_subcategory(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Not found")
     db.delete(sub)
     db.commit()
+    resource_versions.bump("categories")
     return {"message": "Deleted"}
 
 @router.get("/quiz_report/{quiz_id}")
@@ -367,41 +429,73 @@ def quiz_report(quiz_id: int, db: Session = Depends(get_db)):
         WHERE sq.quiz_id = :quiz_id
     """), {"quiz_id": quiz_id}).fetchall()
 
-    scores = [r.total_score for r in results if r.total_score is not None]
+    stats = read_quiz_stats(db, quiz_id)
     summary = {
         "quiz_id": quiz.id,
         "title": quiz.title,
         "faculty": creator.name if creator else "N/A",
         "start_time": quiz.start_time,
         "total_marks": quiz.total_marks,
-        "students_attempted": len(scores),
-        "maximum": max(scores) if scores else 0,
-        "minimum": min(scores) if scores else 0,
-        "average": round(sum(scores) / len(scores), 2) if scores else 0,
-        "median": sorted(scores)[len(scores)//2] if scores else 0
+        "students_attempted": stats["attempts"],
+        "maximum": stats["maximum"],
+        "minimum": stats["minimum"],
+        "average": round(stats["average"], 2),
+        "median": stats["median"],
+        "percentiles": stats["percentiles"]
     }
 
     student_marks = [{"id": r.id, "name": r.name, "mark": r.total_score} for r in results]
     return {"summary": summary, "results": student_marks}
 
+@router.get("/item_analysis/{quiz_id}")
+def item_analysis(quiz_id: int, db: Session = Depends(get_read_db)):
+    if db.get(Quiz, quiz_id) is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return get_item_analysis(db, quiz_id)
+
+@router.get("/results/export")
+def export_results(
+    quiz_id: Optional[List[int]] = Query(None),
+    batch: Optional[str] = Query(None),
+    semester: Optional[str] = Query(None),
+    fmt: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    answers: bool = Query(False),
+    gzip: bool = Query(False),
+    db: Session = Depends(get_read_db)
+):
+    # Marks for the given quizzes, or for every quiz the batch / semester attempted; answers=true adds each
+    # student's answer and correctness per question. Streams, so it suits cohorts of any size.
+    if not quiz_id and batch is None and semester is None:
+        raise HTTPException(status_code=400, detail="Give quiz_id, batch or semester")
+    if not select_quizzes(db, quiz_id, batch, semester):
+        raise HTTPException(status_code=404, detail="No quizzes found for given filters")
+    media_type, extension, stream = RESULT_FORMATS[fmt]
+    body = stream(ReadSessionLocal, quiz_id, batch, semester, answers)
+    filename = f"results.{extension}"
+    if gzip and fmt == "csv":
+        body, media_type, filename = gzip_stream(body), "application/gzip", filename + ".gz"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
 @router.get("/users")
 def get_users(
     role: Optional[str] = Query(None),
     batch: Optional[int] = Query(None),
     semester: Optional[int] = Query(None),
     college: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(User)
+    stmt = select(*USER_LIST_COLUMNS)
     if role:
-        query = query.filter(User.role == role)
+        stmt = stmt.where(User.role == role)
     if batch:
-        query = query.filter(User.batch == batch)
+        stmt = stmt.where(User.batch == batch)
     if semester:
-        query = query.filter(User.semester == semester)
+        stmt = stmt.where(User.semester == semester)
     if college:
-        query = query.filter(User.college == college)
-    return query.all()
+        stmt = stmt.where(User.college == college)
+    return keyset_page(db, stmt, User.id, cursor, limit)
 
 @router.put("/update_user/{user_id}")
 def update_user(user_id: int, data: dict, db: Session = Depends(get_db)):
@@ -410,9 +504,15 @@ def update_user(user_id: int, data: dict, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
 
     for key, value in data.items():
+        if key == "password":
+            if not isinstance(value, str) or not value:
+                raise HTTPException(status_code=400, detail="Password must be a non-empty string")
+            value = hash_password(value)
         if hasattr(user, key):
             setattr(user, key, value)
     db.commit()
+    # The quiz list shows creators' names
+    resource_versions.bump("quizzes")
     return {"message": "User updated successfully"}
 
 @router.delete("/delete_quiz/{quiz_id}")
@@ -428,11 +528,17 @@ def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
     # Delete assigned students
     db.query(AssignedQuiz).filter_by(quiz_id=quiz_id).delete()
 
+    # Delete the score statistics a report on the unattempted quiz may have stored
+    db.query(QuizScoreBucket).filter_by(quiz_id=quiz_id).delete()
+    db.query(QuizScoreStats).filter_by(quiz_id=quiz_id).delete()
+
     # Delete the quiz itself
     quiz = db.query(Quiz).filter_by(id=quiz_id).first()
     if quiz:
         db.delete(quiz)
         db.commit()
+        invalidate_quiz(quiz_id)
+        resource_versions.bump("quizzes")
         return {"message": "Quiz deleted successfully."}
     else:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -463,11 +569,14 @@ def update_question(
             option.text = opt_data.text
             option.is_correct = opt_data.is_correct
 
+    index_questions(db, [question_id])
+    mark_question_changed(db, question_id)
     db.commit()
+    invalidate_question(question_id)
     return {"message": "Question updated successfully"}
 
 @router.get("/get_question/{question_id}")
-def get_question(question_id: int, db: Session = Depends(get_db)):
+def get_question(question_id: int, db: Session = Depends(get_read_db)):
     question = db.query(Question).filter(Question.id == question_id).first()
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
@@ -0,0 +1,134 @@
+# services/aiken.py
+# Streaming Aiken import: the upload is read line by line and questions are inserted in batches,
+# so memory stays flat and a whole bank goes in as one transaction.
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from models import Question, Option
+from services.search import index_questions
+from datetime import datetime
+from typing import Iterable, Iterator, List, NamedTuple, Union
+import io
+import re
+
+BATCH_SIZE = 1000
+
+OPTION_LINE = re.compile(r"^(?:([A-Za-z0-9]+)\)|([A-Za-z])\.)\s*(.*)$")
+
+
+class AikenQuestion(NamedTuple):
+    line: int  # line number of the question text, 1-based
+    text: str
+    options: List[str]
+    correct: int  # index into options
+
+
+class AikenError(NamedTuple):
+    line: int
+    message: str
+
+    def __str__(self):
+        return f"Line {self.line}: {self.message}"
+
+
+def read_lines(binary_file) -> Iterator[str]:
+    # Universal newlines and an optional BOM, decoded incrementally
+    wrapper = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline=None)
+    try:
+        yield from wrapper
+    finally:
+        wrapper.detach()  # leave the upload open for its owner
+
+
+def _parse_block(first_line: int, lines: List[str]) -> Union[AikenQuestion, AikenError]:
+    if len(lines) < 3:
+        return AikenError(first_line, f"Invalid format: {' / '.join(lines)}")
+    question_text, labels, options, correct_label = lines[0], [], [], None
+    for line in lines[1:]:
+        if line.startswith("ANSWER:"):
+            correct_label = line[len("ANSWER:"):].strip()
+            continue
+        match = OPTION_LINE.match(line)
+        if match:
+            labels.append((match.group(1) or match.group(2)).upper())
+            options.append(match.group(3).strip())
+    if correct_label is None or len(options) < 2:
+        return AikenError(first_line, f"Missing ANSWER or too few options: {question_text}")
+    if correct_label.upper() not in labels:
+        return AikenError(first_line, f"Correct answer label '{correct_label}' not found in: {question_text}")
+    return AikenQuestion(first_line, question_text, options, labels.index(correct_label.upper()))
+
+
+def parse_aiken(lines: Iterable[str]) -> Iterator[Union[AikenQuestion, AikenError]]:
+    # Blocks are separated by blank lines; yields one question or error per block
+    block, first_line = [], 0
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if line:
+            if not block:
+                first_line = number
+            block.append(line)
+        elif block:
+            yield _parse_block(first_line, block)
+            block = []
+    if block:
+        yield _parse_block(first_line, block)
+
+
+def _insert_batch(db: Session, batch: List[AikenQuestion], subcategory_id: int, created_by: int, created_at: str):
+    question_ids = db.execute(
+        insert(Question).returning(Question.id, sort_by_parameter_order=True),
+        [
+            {"question_text": q.text, "question_type": "MCQ", "correct_answer": q.options[q.correct],
+             "subcategory_id": subcategory_id, "created_by": created_by, "created_at": created_at, "is_active": True}
+            for q in batch
+        ]
+    ).scalars().all()
+    db.execute(insert(Option), [
+        {"text": text, "is_correct": i == q.correct, "question_id": question_id}
+        for q, question_id in zip(batch, question_ids)
+        for i, text in enumerate(q.options)
+    ])
+    index_questions(db, question_ids)
+
+
+def import_aiken(db: Session, lines: Iterable[str], subcategory_id: int, created_by: int,
+                 dry_run: bool = False, savepoints: bool = False, batch_size: int = BATCH_SIZE) -> dict:
+    # One transaction for the whole file. With savepoints a batch that fails to insert is rolled back and
+    # reported on its own; without, the first database error aborts the import. Nothing is written on dry_run.
+    created_at = datetime.utcnow().isoformat()
+    uploaded, errors, batch = 0, [], []
+
+    def flush():
+        nonlocal uploaded
+        if dry_run:
+            uploaded += len(batch)
+        elif savepoints:
+            try:
+                with db.begin_nested():
+                    _insert_batch(db, batch, subcategory_id, created_by, created_at)
+                uploaded += len(batch)
+            except SQLAlchemyError as e:
+                errors.append(AikenError(batch[0].line, f"Batch of {len(batch)} questions not saved: {e.__class__.__name__}"))
+        else:
+            _insert_batch(db, batch, subcategory_id, created_by, created_at)
+            uploaded += len(batch)
+        batch.clear()
+
+    try:
+        for item in parse_aiken(lines):
+            if isinstance(item, AikenError):
+                errors.append(item)
+                continue
+            batch.append(item)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        if not dry_run:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"uploaded": uploaded, "errors": [str(e) for e in errors], "dry_run": dry_run}
@@ -0,0 +1,26 @@
+# services/assignments.py
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import AssignedQuiz
+from services.quiz_cache import QuizCache
+from typing import FrozenSet
+
+ASSIGNMENT_CACHE_SIZE = 512
+
+assigned_students_cache = QuizCache("assigned_students", maxsize=ASSIGNMENT_CACHE_SIZE)
+
+
+def get_assigned_students(db: Session, quiz_id: int) -> FrozenSet[int]:
+    def load():
+        student_ids = db.execute(
+            select(AssignedQuiz.student_id).where(AssignedQuiz.quiz_id == quiz_id)
+        ).scalars().all()
+        return frozenset(student_ids), ()
+    return assigned_students_cache.get(quiz_id, load)
+
+
+def is_assigned(db: Session, quiz_id: int, student_id: int) -> bool:
+    # Read straight from the table: the cached set is per process and other workers' assignments don't reach it
+    return db.execute(
+        select(AssignedQuiz.id).where(AssignedQuiz.quiz_id == quiz_id, AssignedQuiz.student_id == student_id).limit(1)
+    ).first() is not None
@@ -0,0 +1,34 @@
+# services/attempts.py
+# The writes behind starting and submitting a quiz, as plain functions of a session, so they run the same in
+# a request's own transaction or batched on the write queue
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from models import StudentQuiz
+from services.grading import save_graded_answers
+from services.score_stats import record_attempt_started, record_attempt_graded
+from typing import Optional
+
+
+def create_attempt(db: Session, quiz_id: int, student_id: int, started_at: str, order_seed: Optional[int]) -> int:
+    attempt = StudentQuiz(student_id=student_id, quiz_id=quiz_id, started_at=started_at, submitted_at=None,
+                          total_score=0, order_seed=order_seed)
+    db.add(attempt)
+    # A concurrent start for the same student fails here, on the unique (quiz_id, student_id) index
+    db.flush()
+    record_attempt_started(db, quiz_id)
+    return attempt.id
+
+
+def record_submission(db: Session, attempt_id: int, quiz_id: int, submitted_at: str, answer_rows: list,
+                      old_score: Optional[float], score: float) -> bool:
+    # False when the attempt was submitted in the meantime; nothing is written then
+    result = db.execute(
+        update(StudentQuiz)
+        .where(StudentQuiz.id == attempt_id, StudentQuiz.submitted_at.is_(None))
+        .values(submitted_at=submitted_at, total_score=score)
+    )
+    if not result.rowcount:
+        return False
+    save_graded_answers(db, attempt_id, answer_rows)
+    record_attempt_graded(db, quiz_id, old_score, score)
+    return True
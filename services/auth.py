@@ -0,0 +1,120 @@
+# services/auth.py
+# Session tokens (HS256 JWTs) are issued at login and checked in memory on every later request, with no
+# database lookup. Password checks for the login endpoints run on a bounded thread pool (bcrypt releases
+# the GIL) behind admission control, so a login storm queues a fixed amount of work and sheds the rest.
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Depends, HTTPException, Query
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from services.passwords import verify_password
+from threading import Lock
+from typing import Optional
+import asyncio
+import logging
+import secrets
+import time
+import jwt
+import config
+
+ALGORITHM = "HS256"
+
+logger = logging.getLogger(__name__)
+
+if config.SECRET_KEY:
+    _secret_key = config.SECRET_KEY
+else:
+    _secret_key = secrets.token_urlsafe(32)
+    logger.warning("QUIZ_SECRET_KEY is not set; session tokens won't survive a restart or work across workers")
+
+
+def issue_token(user_id: int, role: str) -> str:
+    now = int(time.time())
+    claims = {"sub": str(user_id), "role": role, "iat": now, "exp": now + config.SESSION_TTL_MINUTES * 60}
+    return jwt.encode(claims, _secret_key, algorithm=ALGORITHM)
+
+
+def decode_token(token: str) -> dict:
+    try:
+        claims = jwt.decode(token, _secret_key, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Session expired", headers={"WWW-Authenticate": "Bearer"})
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid session token", headers={"WWW-Authenticate": "Bearer"})
+    return {"user_id": int(claims["sub"]), "role": claims.get("role")}
+
+
+class LoginGate:
+    # Admission control in front of the verification pool: at most max_pending checks running or queued
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login-verify")
+        self._lock = Lock()
+        self._pending = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    async def verify(self, plain: str, stored: Optional[str]) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Too many logins in progress, try again shortly",
+                                    headers={"Retry-After": "1"})
+            self._pending += 1
+            self.admitted += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, verify_password, plain, stored)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "max_pending": self.max_pending, "pending": self._pending,
+                    "admitted": self.admitted, "rejected": self.rejected}
+
+
+login_gate = LoginGate(config.LOGIN_VERIFY_WORKERS, config.LOGIN_MAX_PENDING)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+async def current_session(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> Optional[dict]:
+    # None only when no token was sent and QUIZ_REQUIRE_AUTH is off
+    if credentials is None:
+        if config.REQUIRE_AUTH:
+            raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        return None
+    return decode_token(credentials.credentials)
+
+
+async def current_stream_session(token: Optional[str] = Query(None),
+                                 credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> Optional[dict]:
+    # EventSource can't send headers, so event streams also take the token as ?token=
+    if token is not None:
+        return decode_token(token)
+    return await current_session(credentials)
+
+
+async def require_teacher(session: Optional[dict] = Depends(current_session)) -> Optional[dict]:
+    if session is not None and session["role"] != "teacher":
+        raise HTTPException(status_code=403, detail="Teachers only")
+    return session
+
+
+def check_student(session: Optional[dict], student_id: Optional[int]):
+    # Students may only act as themselves; teachers may look at any student
+    if session is None or student_id is None or session["role"] == "teacher":
+        return
+    if session["user_id"] != student_id:
+        raise HTTPException(status_code=403, detail="Token does not belong to this student")
+
+
+def resolve_student(session: Optional[dict], student_id: Optional[int], required: bool = True) -> Optional[int]:
+    # student_id from the request, or from a student's token when the client leaves it out
+    check_student(session, student_id)
+    if student_id is None and session is not None and session["role"] != "teacher":
+        student_id = session["user_id"]
+    if student_id is None and required:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return student_id
@@ -0,0 +1,186 @@
+# services/autosave.py
+# Write-behind buffer for answers saved while a quiz is in progress. An autosave only records the latest
+# answer per (attempt, question) in memory; a background thread grades everything waiting against the cached
+# answer keys and writes it in one upsert transaction every AUTOSAVE_FLUSH_MS, or sooner once
+# AUTOSAVE_MAX_PENDING answers are waiting. Submission takes what is still buffered for its attempt and then
+# only has to write answers whose stored grade is missing or out of date.
+# The buffer lives in one process, so it is only used with a single worker (config.AUTOSAVE_BUFFER); with more,
+# a submission could be handled by a worker that never saw the attempt's autosaves, and each autosave is graded
+# and written before the request returns instead.
+from sqlalchemy import text
+from database import SessionLocal
+from services.grading import get_answer_key
+from services.http_cache import resource_versions
+from threading import Thread, Lock, Event
+from typing import Dict
+import config
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# The EXISTS guard drops answers for an attempt that was submitted in the meantime
+UPSERT_ANSWER = text("""
+    INSERT INTO student_answers (student_quiz_id, question_id, given_answer, is_correct, marks_awarded)
+    SELECT :attempt_id, :question_id, :given_answer, :is_correct, :marks_awarded
+    WHERE EXISTS (SELECT 1 FROM student_quizzes WHERE id = :attempt_id AND submitted_at IS NULL)
+    ON CONFLICT (student_quiz_id, question_id) DO UPDATE SET
+        given_answer = excluded.given_answer, is_correct = excluded.is_correct, marks_awarded = excluded.marks_awarded
+""")
+
+
+class AnswerBuffer:
+    # Latest answer per (attempt, question), written in batches by one background thread
+
+    def __init__(self, session_factory=SessionLocal, flush_ms: int = config.AUTOSAVE_FLUSH_MS,
+                 max_pending: int = config.AUTOSAVE_MAX_PENDING, buffered: bool = config.AUTOSAVE_BUFFER):
+        self.session_factory = session_factory
+        self.buffered = buffered
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+        self._pending: Dict[int, Dict[int, str]] = {}  # attempt_id -> {question_id: answer}
+        self._quiz_of: Dict[int, int] = {}  # attempt_id -> quiz_id, for the answer key
+        self._count = 0
+        self._lock = Lock()
+        # One flush at a time; take() waits on it so a flush already holding an attempt's answers lands first
+        self._flush_lock = Lock()
+        self._wake = Event()
+        self._thread = None
+        self._stopping = False
+        self.flushes = 0
+        self.written = 0
+        self.failures = 0
+        self.last_flush_ms = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = Thread(target=self._run, name="answer-autosave", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # Writes out whatever is still buffered
+        with self._lock:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=10)
+        self.flush()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def add(self, attempt_id: int, quiz_id: int, answers: Dict[int, str]):
+        # Unbuffered, this writes the answers itself, so call it from a worker thread
+        if not self.buffered:
+            self.flushes += 1
+            self.written += self._write({attempt_id: answers}, {attempt_id: quiz_id})
+            return
+        with self._lock:
+            self._quiz_of[attempt_id] = quiz_id
+            saved = self._pending.setdefault(attempt_id, {})
+            before = len(saved)
+            saved.update(answers)
+            self._count += len(saved) - before
+            full = self._count >= self.max_pending
+        # The flusher starts with the first autosave, so scripts and tests without the app lifespan work too
+        if not self.running:
+            self.start()
+        if full:
+            self._wake.set()
+
+    def take(self, attempt_id: int) -> Dict[int, str]:
+        # Removes and returns the attempt's buffered answers, which are then the caller's to store
+        with self._flush_lock:
+            with self._lock:
+                answers = self._pending.pop(attempt_id, {})
+                self._quiz_of.pop(attempt_id, None)
+                self._count -= len(answers)
+        return answers
+
+    def put_back(self, attempt_id: int, quiz_id: int, answers: Dict[int, str]):
+        # Returns answers from take() whose submission failed, so they are stored by a later flush or submit
+        if answers:
+            self._restore({attempt_id: answers}, {attempt_id: quiz_id})
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending, self._count = self._pending, {}, 0
+                quiz_of, self._quiz_of = self._quiz_of, {}
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                written = self._write(batch, quiz_of)
+            except Exception:
+                self._restore(batch, quiz_of)
+                raise
+            self.flushes += 1
+            self.written += written
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            return written
+
+    def _write(self, batch: Dict[int, Dict[int, str]], quiz_of: Dict[int, int]) -> int:
+        db = self.session_factory()
+        try:
+            rows = self._graded_rows(db, batch, quiz_of)
+            db.execute(UPSERT_ANSWER, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.failures += 1
+            raise
+        finally:
+            db.close()
+        # The summary shows stored answers
+        resource_versions.bump(*(("results", quiz_id) for quiz_id in set(quiz_of.values())))
+        return len(rows)
+
+    @staticmethod
+    def _graded_rows(db, batch: Dict[int, Dict[int, str]], quiz_of: Dict[int, int]) -> list:
+        # Submission regrades in memory, so a key edited since only costs a rewrite of the rows it changed
+        keys = {quiz_id: get_answer_key(db, quiz_id) for quiz_id in set(quiz_of.values())}
+        rows = []
+        for attempt_id, answers in batch.items():
+            key = keys[quiz_of[attempt_id]]
+            for qid, answer in answers.items():
+                grader = key.get(qid)
+                is_correct = grader.is_correct(answer) if grader else None
+                rows.append({"attempt_id": attempt_id, "question_id": qid, "given_answer": answer,
+                             "is_correct": is_correct, "marks_awarded": grader.mark if is_correct else 0})
+        return rows
+
+    def _restore(self, batch: Dict[int, Dict[int, str]], quiz_of: Dict[int, int]):
+        # A failed flush puts its answers back, under any newer ones that arrived meanwhile
+        with self._lock:
+            for attempt_id, answers in batch.items():
+                self._quiz_of.setdefault(attempt_id, quiz_of[attempt_id])
+                saved = self._pending.setdefault(attempt_id, {})
+                for qid, answer in answers.items():
+                    if qid not in saved:
+                        saved[qid] = answer
+                        self._count += 1
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Autosave flush failed; answers stay buffered for the next one")
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending, attempts = self._count, len(self._pending)
+        return {"buffered": self.buffered, "running": self.running, "pending": pending, "attempts": attempts, "flushes": self.flushes,
+                "written": self.written, "failures": self.failures, "last_flush_ms": self.last_flush_ms,
+                "flush_ms": int(self.flush_interval * 1000), "max_pending": self.max_pending}
+
+
+answer_buffer = AnswerBuffer()
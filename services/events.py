@@ -0,0 +1,145 @@
+# services/events.py
+# Server-sent events for quiz state, so student clients can hold one GET /events stream instead of polling
+# /list. Teacher actions and the scheduler publish here and each event goes to the connected students the quiz
+# is assigned to. Every connection has its own bounded queue: a client that falls EVENT_QUEUE_SIZE events
+# behind loses its backlog and gets a "resync" event instead, telling it to reload /list, so a stalled reader
+# holds a fixed amount of memory and never slows the others down.
+from sqlalchemy.orm import Session
+from services.assignments import get_assigned_students
+from threading import Lock
+from typing import Dict, Iterable, Optional, Set
+import asyncio
+import config
+import json
+
+RETRY_MS = 5000  # how long EventSource waits before reconnecting
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+RESYNC = format_event("resync", {})
+KEEPALIVE = ": keepalive\n\n"
+
+
+class Subscription:
+    # One open stream: its student and a bounded queue of formatted events, owned by the stream's loop
+
+    def __init__(self, student_id: int, loop: asyncio.AbstractEventLoop, size: int):
+        self.student_id = student_id
+        self.loop = loop
+        self.queue = asyncio.Queue(size)
+        self.resyncs = 0
+
+    def put(self, message: str):
+        # Runs on the subscription's loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.resyncs += 1
+
+
+def _deliver(targets: list, message: str):
+    for subscription in targets:
+        subscription.put(message)
+
+
+class EventHub:
+    # student_id -> open subscriptions; publish() may be called from any thread
+
+    def __init__(self, queue_size: int = config.EVENT_QUEUE_SIZE, max_connections: int = config.EVENT_MAX_CONNECTIONS,
+                 heartbeat_seconds: int = config.EVENT_HEARTBEAT_SECONDS):
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.heartbeat = heartbeat_seconds
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._count = 0
+        self._lock = Lock()
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+
+    @property
+    def connections(self) -> int:
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.max_connections
+
+    def subscribe(self, student_id: int) -> Optional[Subscription]:
+        # None once max_connections streams are open
+        subscription = Subscription(student_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if self._count >= self.max_connections:
+                return None
+            self._subscribers.setdefault(student_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.student_id)
+            if not subscriptions or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.student_id]
+            self._count -= 1
+            self.resyncs += subscription.resyncs
+
+    def publish(self, student_ids: Iterable[int], event: str, data: dict) -> int:
+        # Queues the event on every open stream of these students; returns how many streams it went to
+        message = format_event(event, data)
+        by_loop: Dict[asyncio.AbstractEventLoop, list] = {}
+        with self._lock:
+            for student_id in student_ids:
+                for subscription in self._subscribers.get(student_id, ()):
+                    by_loop.setdefault(subscription.loop, []).append(subscription)
+        # One wake-up per event loop, however many of its streams the event goes to
+        delivered = 0
+        for loop, targets in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, targets, message)
+                delivered += len(targets)
+            except RuntimeError:
+                pass  # that loop has closed
+        self.published += 1
+        self.delivered += delivered
+        return delivered
+
+    async def stream(self, student_id: int):
+        # Body of an event stream; unsubscribes when the client goes away
+        subscription = self.subscribe(student_id)
+        if subscription is None:
+            return
+        try:
+            yield f"retry: {RETRY_MS}\n" + format_event("ready", {"student_id": student_id})
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            students = len(self._subscribers)
+        return {"connections": self._count, "students": students, "max_connections": self.max_connections,
+                "queue_size": self.queue_size, "published": self.published, "delivered": self.delivered,
+                "resyncs": self.resyncs}
+
+
+quiz_events = EventHub()
+
+
+def publish_quiz_event(db: Session, quiz_id: int, event: str, **data) -> int:
+    # Sends a quiz's state change to its assigned students; the assignment lookup is skipped while no one listens
+    if not quiz_events.connections:
+        return 0
+    return quiz_events.publish(get_assigned_students(db, quiz_id), event, {"quiz_id": quiz_id, **data})
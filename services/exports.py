@@ -0,0 +1,184 @@
+# services/exports.py
+# Question-bank exports written as a stream. Questions are read yield_per at a time with their options
+# loaded by one selectin query per batch, and each batch is rendered and sent before the next is read,
+# so memory stays flat however large the bank is.
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from models import Question, Subcategory
+from typing import Callable, Iterator, List, Optional
+from xml.sax.saxutils import escape as xml_escape
+import csv
+import io
+import json
+import logging
+import string
+import zlib
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+OPTION_LETTERS = string.ascii_uppercase
+
+
+def question_query(subcategory_id: Optional[int] = None, category_id: Optional[int] = None,
+                   question_types: Optional[List[str]] = None):
+    stmt = select(Question)
+    if question_types:
+        stmt = stmt.where(Question.question_type.in_(question_types))
+    if subcategory_id:
+        stmt = stmt.where(Question.subcategory_id == subcategory_id)
+    elif category_id:
+        stmt = stmt.join(Subcategory, Subcategory.id == Question.subcategory_id).where(Subcategory.category_id == category_id)
+    return stmt
+
+
+def has_questions(db: Session, stmt) -> bool:
+    return db.execute(stmt.with_only_columns(Question.id).limit(1)).first() is not None
+
+
+def _sorted_options(question: Question):
+    return sorted(question.options, key=lambda o: o.id)
+
+
+def _accepted_answers(question: Question) -> List[str]:
+    try:
+        values = json.loads(question.correct_answer or "[]")
+    except ValueError:
+        values = [question.correct_answer]
+    return [str(v) for v in (values if isinstance(values, list) else [values])]
+
+
+def render_aiken(question: Question) -> str:
+    options = _sorted_options(question)
+    if len(options) > len(OPTION_LETTERS):
+        # Aiken labels options A-Z and has no way to write more; leave the question out rather than end the stream
+        logger.warning("Aiken export skipped question %s: %d options, at most %d fit",
+                       question.id, len(options), len(OPTION_LETTERS))
+        return ""
+    lines = [question.question_text.strip()]
+    correct = next((OPTION_LETTERS[i] for i, o in enumerate(options) if o.is_correct), None)
+    lines.extend(f"{OPTION_LETTERS[i]}. {o.text.strip()}" for i, o in enumerate(options))
+    if correct:
+        lines.append(f"ANSWER: {correct}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _gift_escape(text: str) -> str:
+    return text.replace("{", "\\{").replace("}", "\\}").replace("=", "\\=").replace("~", "\\~")
+
+
+def render_gift(question: Question) -> str:
+    lines = [f"::Q{question.id}:: {_gift_escape(question.question_text.strip())} {{"]
+    for o in _sorted_options(question):
+        lines.append(f"{'=' if o.is_correct else '~'}{_gift_escape(o.text.strip())}")
+    lines.append("}")
+    return "\n".join(lines) + "\n\n"
+
+
+MOODLE_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n'
+MOODLE_FOOTER = "</quiz>\n"
+
+
+def _moodle_answer(fraction, text: str) -> str:
+    return f'    <answer fraction="{fraction}" format="plain_text"><text>{xml_escape(text)}</text></answer>\n'
+
+
+def render_moodle(question: Question) -> str:
+    # multichoice for MCQ / MULTI_SELECT, truefalse, and shortanswer for fill-in-the-blank
+    options = _sorted_options(question)
+    answers = []
+    if question.question_type in ("MCQ", "MULTI_SELECT"):
+        qtype = "multichoice"
+        correct_count = sum(1 for o in options if o.is_correct) or 1
+        share = 100 if question.question_type == "MCQ" else round(100 / correct_count, 5)
+        answers = [_moodle_answer(share if o.is_correct else 0, o.text.strip()) for o in options]
+    elif question.question_type == "TRUE_FALSE":
+        qtype = "truefalse"
+        truth = (question.correct_answer or "").strip().lower() == "true"
+        answers = [_moodle_answer(100 if truth else 0, "true"), _moodle_answer(0 if truth else 100, "false")]
+    else:
+        qtype = "shortanswer"
+        answers = [_moodle_answer(100, a) for a in _accepted_answers(question)]
+
+    parts = [
+        f'  <question type="{qtype}">\n',
+        f"    <name><text>Q{question.id}</text></name>\n",
+        f'    <questiontext format="plain_text"><text>{xml_escape(question.question_text.strip())}</text></questiontext>\n',
+    ]
+    if question.feedback:
+        parts.append(f"    <generalfeedback><text>{xml_escape(question.feedback)}</text></generalfeedback>\n")
+    if qtype == "multichoice":
+        parts.append(f"    <single>{'true' if question.question_type == 'MCQ' else 'false'}</single>\n")
+        parts.append("    <shuffleanswers>true</shuffleanswers>\n")
+    parts.extend(answers)
+    parts.append("  </question>\n")
+    return "".join(parts)
+
+
+CSV_COLUMNS = ["id", "subcategory_id", "question_type", "question_text", "options", "correct", "feedback", "is_active"]
+
+
+def csv_row(question: Question) -> list:
+    # options and correct are JSON lists: option texts, and the correct options or accepted answers
+    options = _sorted_options(question)
+    if question.question_type in ("MCQ", "MULTI_SELECT"):
+        correct = [o.text for o in options if o.is_correct]
+    else:
+        correct = _accepted_answers(question)
+    return [question.id, question.subcategory_id, question.question_type, question.question_text,
+            json.dumps([o.text for o in options], ensure_ascii=False), json.dumps(correct, ensure_ascii=False),
+            question.feedback or "", int(bool(question.is_active))]
+
+
+def _render_csv_batch(questions, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    writer.writerows(csv_row(q) for q in questions)
+    return buffer.getvalue()
+
+
+FORMATS = {
+    # name: (media type, file extension, MCQ only, header, footer, per-question renderer)
+    "aiken": ("text/plain; charset=utf-8", "txt", True, "", "", render_aiken),
+    "gift": ("text/plain; charset=utf-8", "gift", True, "", "", render_gift),
+    "moodle": ("application/xml", "xml", False, MOODLE_HEADER, MOODLE_FOOTER, render_moodle),
+    "csv": ("text/csv; charset=utf-8", "csv", False, None, "", None),
+}
+
+
+def stream_export(session_factory: Callable[[], Session], fmt: str, stmt, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    # Opens its own session: the response body is produced after the request's dependencies have closed
+    _, _, _, header, footer, render = FORMATS[fmt]
+    db = session_factory()
+    try:
+        if header:
+            yield header.encode("utf-8")
+        result = db.execute(
+            stmt.options(selectinload(Question.options)).order_by(Question.id).execution_options(yield_per=batch_size)
+        ).scalars()
+        first = True
+        for batch in result.partitions():
+            if fmt == "csv":
+                chunk = _render_csv_batch(batch, header=first)
+            else:
+                chunk = "".join(render(q) for q in batch)
+            first = False
+            yield chunk.encode("utf-8")
+        if fmt == "csv" and first:
+            yield _render_csv_batch([], header=True).encode("utf-8")
+        if footer:
+            yield footer.encode("utf-8")
+    finally:
+        db.close()
+
+
+def gzip_stream(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,123 @@
+# services/grading.py
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import Question, QuizQuestion, Option, StudentAnswer
+from services.quiz_cache import QuizCache, content_version
+from typing import Dict
+import json
+
+ANSWER_KEY_CACHE_SIZE = 256
+
+answer_key_cache = QuizCache("answer_keys", maxsize=ANSWER_KEY_CACHE_SIZE)
+
+
+class QuestionGrader:
+    # Correct answers for one question, normalized once so grading is a set lookup
+    __slots__ = ("question_id", "question_type", "mark", "accepted", "correct_options", "mcq_answer")
+
+    def __init__(self, question_id: int, question_type: str, mark: int, correct_answer, correct_options: list):
+        self.question_id = question_id
+        self.question_type = question_type
+        self.mark = mark
+        self.accepted = frozenset()
+        self.correct_options = frozenset(correct_options)
+        self.mcq_answer = correct_options[0] if correct_options else None
+
+        if question_type == "FILL_BLANK":
+            try:
+                correct_vals = json.loads(correct_answer or "[]")
+            except ValueError:
+                correct_vals = []
+            self.accepted = frozenset(x.lower() for x in correct_vals)
+        elif question_type == "TRUE_FALSE":
+            self.accepted = frozenset([(correct_answer or "").strip().lower()])
+
+    def is_correct(self, given: str) -> bool:
+        if self.question_type in ("FILL_BLANK", "TRUE_FALSE"):
+            return given.strip().lower() in self.accepted
+        if self.question_type == "MULTI_SELECT":
+            try:
+                given_set = set(json.loads(given))
+            except (ValueError, TypeError):
+                given_set = set()
+            return given_set == self.correct_options
+        if self.question_type == "MCQ":
+            return self.mcq_answer is not None and given == self.mcq_answer
+        return False
+
+
+def compile_answer_key(db: Session, quiz_id: int) -> Dict[int, QuestionGrader]:
+    # Whole key for the quiz in two queries: questions with their marks, then correct options
+    rows = db.execute(
+        select(QuizQuestion.question_id, QuizQuestion.mark, Question.question_type, Question.correct_answer)
+        .join(Question, Question.id == QuizQuestion.question_id)
+        .where(QuizQuestion.quiz_id == quiz_id)
+        .order_by(QuizQuestion.id)
+    ).all()
+
+    correct_options = {}
+    options = db.execute(
+        select(Option.question_id, Option.text)
+        .join(QuizQuestion, QuizQuestion.question_id == Option.question_id)
+        .where(QuizQuestion.quiz_id == quiz_id, Option.is_correct == True)
+        .order_by(Option.id)
+    ).all()
+    for qid, text in options:
+        texts = correct_options.setdefault(qid, [])
+        if text not in texts:
+            texts.append(text)
+
+    key = {}
+    for qid, mark, question_type, correct_answer in rows:
+        if qid not in key:
+            key[qid] = QuestionGrader(qid, question_type, mark if mark is not None else 1,
+                                      correct_answer, correct_options.get(qid, []))
+    return key
+
+
+def get_answer_key(db: Session, quiz_id: int) -> Dict[int, QuestionGrader]:
+    # Checked against the quiz's content version: a key edited through another worker must not grade here
+    def load():
+        key = compile_answer_key(db, quiz_id)
+        return key, key.keys()
+    return answer_key_cache.get(quiz_id, load, content_version(db, quiz_id))
+
+
+def grade_answers(key: Dict[int, QuestionGrader], answers: Dict[int, str]):
+    # Grades in memory; unanswered questions don't count towards the maximum, as before
+    answer_rows = []
+    raw_score = 0
+    max_raw_score = 0
+
+    for qid, grader in key.items():
+        given = answers.get(qid)
+        if given is None:
+            continue
+
+        max_raw_score += grader.mark
+        is_correct = grader.is_correct(given)
+        awarded = grader.mark if is_correct else 0
+        raw_score += awarded
+
+        answer_rows.append({
+            "question_id": qid,
+            "given_answer": given,
+            "is_correct": is_correct,
+            "marks_awarded": awarded
+        })
+
+    return answer_rows, raw_score, max_raw_score
+
+
+def save_graded_answers(db: Session, attempt_id: int, answer_rows: list):
+    # Single executemany upsert instead of one ORM add per answer; autosaved rows are graded in place
+    if answer_rows:
+        upsert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = upsert(StudentAnswer)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StudentAnswer.student_quiz_id, StudentAnswer.question_id],
+            set_={"given_answer": stmt.excluded.given_answer, "is_correct": stmt.excluded.is_correct,
+                  "marks_awarded": stmt.excluded.marks_awarded}
+        )
+        db.execute(stmt, [dict(row, student_quiz_id=attempt_id) for row in answer_rows])
@@ -0,0 +1,81 @@
+# services/http_cache.py
+# Conditional GETs for read-heavy endpoints. Each cacheable resource has a version counter that the writes
+# changing it bump; a response's ETag is built from the counters it depends on, so a request whose
+# If-None-Match still matches is answered 304 before its handler touches the database. Counters live in
+# this process; a per-process epoch in every tag keeps a restart from matching old ones. Another worker's
+# writes never reach them, so with several workers (config.HTTP_ETAGS off) no validators are sent and every
+# request is answered in full.
+from fastapi import Request, Response, HTTPException
+from email.utils import formatdate
+from threading import Lock
+from typing import Callable, Hashable, Optional, Sequence
+import secrets
+import time
+import config
+
+# Cache-Control policies: clients revalidate every time (a 304 is cheap), or may reuse for a short while
+REVALIDATE = "private, no-cache"
+SHORT_LIVED = "private, max-age=60"
+
+
+class ResourceVersions:
+    # Thread-safe version counter and last-change time per resource key
+
+    def __init__(self, enabled: bool = config.HTTP_ETAGS):
+        self.enabled = enabled
+        self.epoch = secrets.token_hex(4)
+        self.started = time.time()
+        self._versions = {}
+        self._lock = Lock()
+
+    def bump(self, *keys: Hashable):
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                version, _ = self._versions.get(key, (0, None))
+                self._versions[key] = (version + 1, now)
+
+    def validators(self, keys: Sequence[Hashable]) -> tuple:
+        # (ETag, Last-Modified) for a response built from these resources
+        with self._lock:
+            entries = [self._versions.get(key, (0, self.started)) for key in keys]
+        tag = ".".join(str(version) for version, _ in entries)
+        modified = max((changed for _, changed in entries), default=self.started)
+        return f'W/"{self.epoch}-{tag}"', formatdate(modified, usegmt=True)
+
+
+resource_versions = ResourceVersions()
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if if_none_match.strip() == "*":
+        return True
+    tags = (t.strip() for t in if_none_match.split(","))
+    return etag.removeprefix("W/") in (t.removeprefix("W/") for t in tags)
+
+
+def check_conditional(request: Request, response: Response, resources: Sequence[Hashable], cache_control: str) -> dict:
+    # Raises 304 when the client's If-None-Match still matches; otherwise sets the validators on the response.
+    # If-Modified-Since is not honoured: Last-Modified has one-second resolution and two writes can share it.
+    if not resource_versions.enabled:
+        response.headers["Cache-Control"] = cache_control
+        return {"Cache-Control": cache_control}
+    etag, last_modified = resource_versions.validators(resources)
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return headers
+
+
+def conditional(keys: Callable[[Request], Optional[Sequence[Hashable]]], cache_control: str):
+    # Dependency for a cacheable GET: keys(request) names the resources the response is built from, or
+    # None when this request can't be validated. Declare it before the route's database session.
+    def check(request: Request, response: Response) -> dict:
+        resources = keys(request)
+        if resources is None:
+            return {}
+        return check_conditional(request, response, resources, cache_control)
+    return check
@@ -0,0 +1,41 @@
+# services/invalidation.py
+from sqlalchemy import update, select
+from sqlalchemy.orm import Session
+from models import Quiz, QuizQuestion
+from services.grading import answer_key_cache
+from services.papers import paper_cache
+from services.leaderboard import leaderboard_cache
+from services.assignments import assigned_students_cache
+from services.item_analysis import item_analysis_cache
+from services.http_cache import resource_versions
+
+QUIZ_CACHES = [answer_key_cache, paper_cache, leaderboard_cache, assigned_students_cache, item_analysis_cache]
+
+
+def mark_quiz_changed(db: Session, quiz_id: int):
+    # Call in the transaction that changes the quiz's question list; the other workers' caches check the version
+    db.execute(update(Quiz).where(Quiz.id == quiz_id).values(content_version=Quiz.content_version + 1))
+
+
+def mark_question_changed(db: Session, question_id: int):
+    # Call in the transaction that changes a question, for every quiz that contains it
+    quiz_ids = select(QuizQuestion.quiz_id).where(QuizQuestion.question_id == question_id)
+    db.execute(update(Quiz).where(Quiz.id.in_(quiz_ids)).values(content_version=Quiz.content_version + 1))
+
+
+def invalidate_quiz(quiz_id: int):
+    # Call after the quiz's question list changes or the quiz is deleted
+    for cache in QUIZ_CACHES:
+        cache.invalidate_quiz(quiz_id)
+    resource_versions.bump(("quiz", quiz_id))
+
+
+def invalidate_question(question_id: int):
+    # Call after a question's text, type, answer or options change
+    for cache in QUIZ_CACHES:
+        cache.invalidate_question(question_id)
+    resource_versions.bump("questions")
+
+
+def cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in QUIZ_CACHES}
@@ -0,0 +1,258 @@
+# services/item_analysis.py
+# Classical item analysis for a quiz's submitted attempts. Correct answers are held in a dense
+# attempts x questions 0/1 matrix and every statistic is a column-wise NumPy operation on it. Option
+# frequencies come from a grouped query over the wrong answers; right answers all chose the key, so their
+# share is the matrix column sum. The matrix and counts are cached per quiz and extended with just the new
+# attempts when further submissions arrive, so a refresh reads only what changed.
+from sqlalchemy import select, func, cast, String
+from sqlalchemy.orm import Session
+from models import Question, QuizQuestion, Option, StudentQuiz, StudentAnswer
+from services.quiz_cache import QuizCache
+from threading import Lock
+from typing import Dict, Optional
+import json
+import numpy as np
+
+ITEM_ANALYSIS_CACHE_SIZE = 64
+
+# Attempts read per round-trip when extending a cached matrix
+ATTEMPT_CHUNK = 2000
+
+# Share of attempts in each of the upper and lower groups for the discrimination index (Kelley's 27%)
+GROUP_FRACTION = 0.27
+
+CHOICE_TYPES = ("MCQ", "MULTI_SELECT", "TRUE_FALSE")
+
+item_analysis_cache = QuizCache("item_analysis", maxsize=ITEM_ANALYSIS_CACHE_SIZE)
+
+
+def _submitted(quiz_id: int):
+    return (StudentQuiz.quiz_id == quiz_id) & (StudentQuiz.submitted_at.is_not(None))
+
+
+def submission_count(db: Session, quiz_id: int) -> int:
+    return db.execute(select(func.count()).select_from(StudentQuiz).where(_submitted(quiz_id))).scalar_one()
+
+
+def submitted_attempt_ids(db: Session, quiz_id: int) -> np.ndarray:
+    return np.fromiter(
+        db.execute(select(StudentQuiz.id).where(_submitted(quiz_id)).order_by(StudentQuiz.id)).scalars(),
+        dtype=np.int64
+    )
+
+
+def item_statistics(matrix: np.ndarray) -> dict:
+    # Difficulty, upper-lower discrimination and corrected point-biserial per column, and Cronbach's alpha
+    n, k = matrix.shape
+    matrix = matrix.astype(np.float64)
+    totals = matrix.sum(axis=1)
+    difficulty = matrix.mean(axis=0) if n else np.full(k, np.nan)
+
+    group = max(1, int(round(GROUP_FRACTION * n)))
+    ranked = np.argsort(totals, kind="stable")
+    if n >= 2:
+        discrimination = matrix[ranked[-group:]].mean(axis=0) - matrix[ranked[:group]].mean(axis=0)
+    else:
+        discrimination = np.full(k, np.nan)
+
+    # Correlate each item with the total of the other items, so an item is not correlated with itself
+    rest = totals[:, None] - matrix
+    item_dev = matrix - difficulty
+    rest_dev = rest - rest.mean(axis=0) if n else rest
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = (item_dev * rest_dev).mean(axis=0)
+        point_biserial = covariance / np.sqrt((item_dev ** 2).mean(axis=0) * (rest_dev ** 2).mean(axis=0))
+
+        alpha = np.nan
+        if k > 1 and n > 1:
+            total_variance = totals.var(ddof=1)
+            if total_variance > 0:
+                alpha = k / (k - 1) * (1 - matrix.var(axis=0, ddof=1).sum() / total_variance)
+
+    return {"difficulty": difficulty, "discrimination": discrimination, "point_biserial": point_biserial,
+            "cronbach_alpha": alpha, "mean_correct": totals.mean() if n else np.nan,
+            "sd_correct": totals.std(ddof=1) if n > 1 else np.nan}
+
+
+def _id_list(db: Session, column):
+    # Comma-separated ids aggregated in the database
+    if db.get_bind().dialect.name == "postgresql":
+        return func.string_agg(cast(column, String), ",")
+    return func.group_concat(column)
+
+
+def _number(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+
+def _picks(question_type: str, given: Optional[str]) -> list:
+    # Option texts an answer chose, in the form they are counted under
+    if question_type == "MULTI_SELECT":
+        try:
+            chosen = json.loads(given)
+        except (ValueError, TypeError):
+            return []
+        return list(dict.fromkeys(chosen)) if isinstance(chosen, list) else []
+    if question_type == "TRUE_FALSE":
+        return [(given or "").strip().lower()]
+    return [given]
+
+
+def _key_picks(question_type: str, correct_answer: Optional[str], options: list) -> list:
+    # What a correct answer chose, as grading decides it: the first correct option for MCQ, every correct
+    # option for MULTI_SELECT, the stored answer for TRUE_FALSE
+    correct = list(dict.fromkeys(text for _, text, is_correct in options if is_correct))
+    if question_type == "MCQ":
+        return correct[:1]
+    if question_type == "MULTI_SELECT":
+        return correct
+    if question_type == "TRUE_FALSE":
+        return [(correct_answer or "").strip().lower()]
+    return []
+
+
+class QuizResponses:
+    # The submitted attempts of one quiz as a 0/1 correctness matrix plus per-option answer counts
+
+    def __init__(self, quiz_id: int, questions: list, options: Dict[int, list]):
+        self.quiz_id = quiz_id
+        self.questions = questions  # (question_id, question_text, question_type, correct_answer) in quiz order
+        self.options = options      # question_id -> [(option_id, text, is_correct)]
+        self.question_ids = np.array([q[0] for q in questions], dtype=np.int64)
+        self._column_order = np.argsort(self.question_ids)
+        self._sorted_qids = self.question_ids[self._column_order]
+        self.attempt_ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, len(questions)), dtype=np.uint8)
+        self.answered = {q[0]: 0 for q in questions}
+        self.chosen = {q[0]: {} for q in questions}
+        self.key_picks = [_key_picks(q[2], q[3], options.get(q[0], [])) for q in questions]
+        self._report = None
+        self.lock = Lock()
+
+    def _columns(self, question_ids: np.ndarray):
+        # Matrix columns for the given question ids, and a mask of those still on the quiz
+        if not len(self._sorted_qids):
+            return np.zeros(0, dtype=np.int64), np.zeros(len(question_ids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self._sorted_qids, question_ids), len(self._sorted_qids) - 1)
+        known = self._sorted_qids[pos] == question_ids
+        return self._column_order[pos[known]], known
+
+    def add_attempts(self, db: Session, attempt_ids: np.ndarray):
+        attempt_ids = np.setdiff1d(attempt_ids, self.attempt_ids)
+        if not len(attempt_ids):
+            return
+        block = np.zeros((len(attempt_ids), len(self.questions)), dtype=np.uint8)
+        types = {q[0]: q[2] for q in self.questions}
+        choice_ids = [qid for qid, question_type in types.items() if question_type in CHOICE_TYPES]
+
+        for start in range(0, len(attempt_ids), ATTEMPT_CHUNK):
+            chunk = attempt_ids[start:start + ATTEMPT_CHUNK].tolist()
+            # One row per attempt listing the questions it got right, rather than a row per answer
+            correct = db.execute(
+                select(StudentAnswer.student_quiz_id, _id_list(db, StudentAnswer.question_id))
+                .where(StudentAnswer.student_quiz_id.in_(chunk), StudentAnswer.is_correct == True)
+                .group_by(StudentAnswer.student_quiz_id)
+            ).all()
+            if correct:
+                qids = np.array(",".join(str(r[1]) for r in correct).split(","), dtype=np.int64)
+                lengths = np.fromiter((str(r[1]).count(",") + 1 for r in correct), dtype=np.int64, count=len(correct))
+                rows = np.repeat(np.searchsorted(attempt_ids, [r[0] for r in correct]), lengths)
+                columns, known = self._columns(qids)
+                block[rows[known], columns] = 1
+
+            if choice_ids:
+                for qid, given, count in db.execute(
+                    select(StudentAnswer.question_id, StudentAnswer.given_answer, func.count())
+                    .where(StudentAnswer.student_quiz_id.in_(chunk), StudentAnswer.is_correct == False)
+                    .group_by(StudentAnswer.question_id, StudentAnswer.given_answer)
+                ):
+                    if types.get(qid) not in CHOICE_TYPES:
+                        continue
+                    self.answered[qid] += count
+                    counts = self.chosen[qid]
+                    for pick in _picks(types[qid], given):
+                        counts[pick] = counts.get(pick, 0) + count
+
+        right = block.sum(axis=0, dtype=np.int64)
+        for j, (qid, _, question_type, _) in enumerate(self.questions):
+            if question_type in CHOICE_TYPES and right[j]:
+                self.answered[qid] += int(right[j])
+                counts = self.chosen[qid]
+                for pick in self.key_picks[j]:
+                    counts[pick] = counts.get(pick, 0) + int(right[j])
+
+        # Rows stay in attempt id order, so results don't depend on the order submissions were read in
+        attempt_ids = np.concatenate([self.attempt_ids, attempt_ids])
+        order = np.argsort(attempt_ids, kind="stable")
+        self.attempt_ids = attempt_ids[order]
+        self.matrix = np.concatenate([self.matrix, block])[order]
+        self._report = None
+
+    def report(self) -> dict:
+        if self._report is not None:
+            return self._report
+        stats = item_statistics(self.matrix)
+        attempts = len(self.attempt_ids)
+        items = []
+        for j, (qid, question_text, question_type, _) in enumerate(self.questions):
+            tf = question_type == "TRUE_FALSE"
+            counts = self.chosen[qid]
+            item_options = []
+            for option_id, text, is_correct in self.options.get(qid, []):
+                chosen = counts.get(text.strip().lower() if tf else text, 0)
+                item_options.append({"option_id": option_id, "text": text, "is_correct": bool(is_correct),
+                                     "chosen": chosen, "share": round(chosen / attempts, 4) if attempts else None})
+            items.append({
+                "question_id": qid,
+                "question_text": question_text,
+                "question_type": question_type,
+                "difficulty": _number(stats["difficulty"][j]),
+                "discrimination": _number(stats["discrimination"][j]),
+                "point_biserial": _number(stats["point_biserial"][j]),
+                "answered": self.answered[qid] if question_type in CHOICE_TYPES else None,
+                "options": item_options
+            })
+        self._report = {
+            "quiz_id": self.quiz_id,
+            "attempts": attempts,
+            "questions": len(self.questions),
+            "cronbach_alpha": _number(stats["cronbach_alpha"]),
+            "mean_correct": _number(stats["mean_correct"]),
+            "sd_correct": _number(stats["sd_correct"]),
+            "items": items
+        }
+        return self._report
+
+
+def load_responses(db: Session, quiz_id: int) -> QuizResponses:
+    questions = [tuple(row) for row in db.execute(
+        select(QuizQuestion.question_id, Question.question_text, Question.question_type, Question.correct_answer)
+        .join(Question, Question.id == QuizQuestion.question_id)
+        .where(QuizQuestion.quiz_id == quiz_id)
+        .order_by(QuizQuestion.id)
+    )]
+    options = {}
+    for qid, option_id, text, is_correct in db.execute(
+        select(Option.question_id, Option.id, Option.text, Option.is_correct)
+        .join(QuizQuestion, QuizQuestion.question_id == Option.question_id)
+        .where(QuizQuestion.quiz_id == quiz_id)
+        .order_by(Option.id)
+    ):
+        options.setdefault(qid, []).append((option_id, text, is_correct))
+    responses = QuizResponses(quiz_id, questions, options)
+    responses.add_attempts(db, submitted_attempt_ids(db, quiz_id))
+    return responses
+
+
+def get_item_analysis(db: Session, quiz_id: int) -> dict:
+    def load():
+        responses = load_responses(db, quiz_id)
+        return responses, [q[0] for q in responses.questions]
+
+    responses = item_analysis_cache.get(quiz_id, load)
+    with responses.lock:
+        # A submission count that has moved means attempts to add; only those are read
+        if submission_count(db, quiz_id) != len(responses.attempt_ids):
+            responses.add_attempts(db, submitted_attempt_ids(db, quiz_id))
+        return responses.report()
@@ -0,0 +1,78 @@
+# services/jobs.py
+# Long-running teacher operations run on a background thread and report progress through a Job,
+# which GET /teacher/jobs/{job_id} reads. Only the most recent JOB_HISTORY jobs are kept.
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock, Thread
+from typing import Callable, Optional
+import logging
+import uuid
+
+JOB_HISTORY = 100
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "running"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at = None
+        self._lock = Lock()
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+    def _finish(self, status: str, result=None, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now(timezone.utc).isoformat()
+
+
+_jobs = OrderedDict()
+_jobs_lock = Lock()
+
+
+def start_job(kind: str, target: Callable, *args) -> Job:
+    # target(job, *args) runs on its own thread; its return value becomes job.result
+    job = Job(kind)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > JOB_HISTORY:
+            _jobs.popitem(last=False)
+
+    def run():
+        try:
+            job._finish("done", result=target(job, *args))
+        except Exception as e:
+            logger.exception("%s job %s failed", kind, job.id)
+            job._finish("failed", error=str(e))
+
+    Thread(target=run, name=f"job-{kind}", daemon=True).start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
@@ -0,0 +1,93 @@
+# services/leaderboard.py
+from bisect import bisect_left, bisect_right, insort
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import StudentQuiz
+from services.quiz_cache import QuizCache
+from threading import Lock
+from typing import Dict, List, Optional
+import config
+
+LEADERBOARD_CACHE_SIZE = 512
+
+
+class QuizLeaderboard:
+    # Scores kept sorted as (-score, student_id) so rank and top-N are bisects and slices
+
+    def __init__(self, scores: Dict[int, float]):
+        self._scores = dict(scores)
+        self._ordered = sorted((-score, student_id) for student_id, score in self._scores.items())
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._ordered)
+
+    def record(self, student_id: int, score: float):
+        with self._lock:
+            old = self._scores.get(student_id)
+            if old is not None:
+                index = bisect_left(self._ordered, (-old, student_id))
+                del self._ordered[index]
+            self._scores[student_id] = score
+            insort(self._ordered, (-score, student_id))
+
+    def _rank_of_score(self, score: float) -> int:
+        # Competition ranking: tied students share the best position
+        return bisect_left(self._ordered, (-score,)) + 1
+
+    def rank(self, student_id: int) -> Optional[int]:
+        with self._lock:
+            score = self._scores.get(student_id)
+            return self._rank_of_score(score) if score is not None else None
+
+    def percentile(self, student_id: int) -> Optional[float]:
+        # Share of the cohort scoring below the student, counting ties as half
+        with self._lock:
+            score = self._scores.get(student_id)
+            if score is None:
+                return None
+            n = len(self._ordered)
+            higher = bisect_left(self._ordered, (-score,))
+            tied = bisect_right(self._ordered, (-score, float("inf"))) - higher
+            below = n - higher - tied
+            return round(100 * (below + tied / 2) / n, 2)
+
+    def top(self, n: int) -> List[dict]:
+        with self._lock:
+            return [
+                {"student_id": student_id, "score": -neg_score, "rank": self._rank_of_score(-neg_score)}
+                for neg_score, student_id in self._ordered[:n]
+            ]
+
+
+leaderboard_cache = QuizCache("leaderboards", maxsize=LEADERBOARD_CACHE_SIZE, ttl=config.LEADERBOARD_TTL_SECONDS)
+
+
+def _load_leaderboards(db: Session, quiz_ids: List[int]) -> Dict[int, tuple]:
+    scores = {quiz_id: {} for quiz_id in quiz_ids}
+    rows = db.execute(
+        select(StudentQuiz.quiz_id, StudentQuiz.student_id, StudentQuiz.total_score)
+        .where(StudentQuiz.quiz_id.in_(quiz_ids))
+    ).all()
+    for quiz_id, student_id, score in rows:
+        scores[quiz_id][student_id] = score or 0
+    return {quiz_id: (QuizLeaderboard(board), ()) for quiz_id, board in scores.items()}
+
+
+def get_leaderboard(db: Session, quiz_id: int) -> QuizLeaderboard:
+    return leaderboard_cache.get(quiz_id, lambda: _load_leaderboards(db, [quiz_id])[quiz_id])
+
+
+def get_leaderboards(db: Session, quiz_ids: List[int]) -> Dict[int, QuizLeaderboard]:
+    # Boards that aren't cached yet are loaded together in one query
+    return leaderboard_cache.get_many(quiz_ids, lambda missing: _load_leaderboards(db, missing))
+
+
+def record_score(quiz_id: int, student_id: int, score: float):
+    # Call after the attempt's score is committed
+    board = leaderboard_cache.peek(quiz_id)
+    if board is not None:
+        board.record(student_id, score)
+    else:
+        # Discard any board being loaded concurrently from an older snapshot
+        leaderboard_cache.invalidate_quiz(quiz_id)
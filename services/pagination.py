@@ -0,0 +1,33 @@
+# services/pagination.py
+# Keyset pagination for the teacher listings. Pages are ordered by the table's integer primary key and the
+# cursor carries the last key of the previous page, so every page is an index range read of `limit` rows,
+# however deep into the listing it is, and rows added meanwhile never shift a page.
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+import base64
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(last_key: int) -> str:
+    return base64.urlsafe_b64encode(str(last_key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    # No cursor is the first page; keys start at 1, so "after 0" still reads the primary key as a range
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(db: Session, stmt, key, cursor: Optional[str], limit: int) -> dict:
+    # stmt selects plain columns (key among them); returns {"items": [row dicts], "next_cursor": str | None}
+    rows = db.execute(stmt.where(key > decode_cursor(cursor)).order_by(key).limit(limit + 1)).mappings().all()
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(items[-1][key.key]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
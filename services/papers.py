@@ -0,0 +1,64 @@
+# services/papers.py
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Question, QuizQuestion, Option
+from services.quiz_cache import QuizCache, content_version
+from typing import Dict, List
+import json
+
+PAPER_CACHE_SIZE = 256
+OPTION_TYPES = ("MCQ", "MULTI_SELECT", "TRUE_FALSE")
+
+paper_cache = QuizCache("papers", maxsize=PAPER_CACHE_SIZE)
+
+
+def encode(obj) -> bytes:
+    # Same compact encoding FastAPI's JSONResponse produces
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_paper(db: Session, quiz_id: int) -> Dict[int, bytes]:
+    # Student-facing JSON fragment per question, without answers, keyed in quiz order
+    questions = db.execute(
+        select(Question.id, Question.question_text, Question.question_type)
+        .join(QuizQuestion, QuizQuestion.question_id == Question.id)
+        .where(QuizQuestion.quiz_id == quiz_id)
+        .order_by(QuizQuestion.id)
+    ).all()
+
+    options = {}
+    rows = db.execute(
+        select(Option.id, Option.question_id, Option.text)
+        .join(QuizQuestion, QuizQuestion.question_id == Option.question_id)
+        .join(Question, Question.id == Option.question_id)
+        .where(QuizQuestion.quiz_id == quiz_id, Question.question_type.in_(OPTION_TYPES))
+        .order_by(Option.id)
+        .distinct()
+    ).all()
+    for _, qid, text in rows:
+        options.setdefault(qid, []).append({"text": text})
+
+    fragments = {}
+    for qid, question_text, question_type in questions:
+        if qid not in fragments:
+            fragments[qid] = encode({
+                "question_id": qid,
+                "question_text": question_text,
+                "question_type": question_type,
+                "options": options.get(qid, [])
+            })
+    return fragments
+
+
+def get_paper(db: Session, quiz_id: int) -> Dict[int, bytes]:
+    def load():
+        fragments = render_paper(db, quiz_id)
+        return fragments, fragments.keys()
+    return paper_cache.get(quiz_id, load, content_version(db, quiz_id))
+
+
+def assemble_paper(header: dict, fragments: Dict[int, bytes], question_ids: List[int]) -> bytes:
+    # Splices the cached fragments into the response in the student's order
+    head = encode(dict(header, questions=[]))[:-2]
+    body = b",".join(fragments[qid] for qid in question_ids if qid in fragments)
+    return head + body + b"]}"
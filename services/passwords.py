@@ -0,0 +1,63 @@
+# services/passwords.py
+# bcrypt hashing. Single passwords are hashed inline; bulk imports spread the work over a process pool,
+# since each hash is deliberately CPU-bound.
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import List, Optional
+import multiprocessing
+import hmac
+import bcrypt
+import config
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+POOL_THRESHOLD = 8  # below this many passwords the pool isn't worth the round trip
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def hash_password(plain: str) -> str:
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(config.BCRYPT_ROUNDS)).decode("ascii")
+
+
+def is_hashed(stored: Optional[str]) -> bool:
+    return bool(stored) and stored.startswith(BCRYPT_PREFIXES)
+
+
+def verify_password(plain: str, stored: Optional[str]) -> bool:
+    if not stored or plain is None:
+        return False
+    if is_hashed(stored):
+        try:
+            return bcrypt.checkpw(plain.encode("utf-8"), stored.encode("ascii"))
+        except ValueError:
+            # A plaintext password that merely starts like a hash (or isn't ASCII) can't be checked as one
+            return False
+    # Accounts created before hashing keep working until they are migrated
+    return hmac.compare_digest(plain.encode("utf-8"), stored.encode("utf-8"))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has running threads (scheduler, thread pool)
+            _pool = ProcessPoolExecutor(
+                max_workers=config.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    if len(passwords) < POOL_THRESHOLD or config.PASSWORD_HASH_WORKERS <= 1:
+        return [hash_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (config.PASSWORD_HASH_WORKERS * 4))
+    return list(_get_pool().map(hash_password, passwords, chunksize=chunksize))
+
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
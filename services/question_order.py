@@ -0,0 +1,48 @@
+# services/question_order.py
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from models import Quiz, StudentQuiz, StudentQuizQuestionOrder
+from typing import List, Optional
+import random
+
+SEED_BITS = 31  # fits a signed 32-bit INTEGER on every backend
+
+
+def new_order_seed(random_order: bool) -> Optional[int]:
+    # Fixed-order quizzes store nothing; random ones keep a seed on the attempt
+    return random.getrandbits(SEED_BITS) if random_order else None
+
+
+def derive_order(question_ids: List[int], seed: Optional[int]) -> List[int]:
+    # question_ids must be in quiz order (QuizQuestion.id); the same seed always yields the same permutation
+    ordered = list(question_ids)
+    if seed is not None:
+        random.Random(seed).shuffle(ordered)
+    return ordered
+
+
+def attempt_question_order(db: Session, attempt: StudentQuiz, quiz: Quiz, question_ids: List[int]) -> List[int]:
+    if attempt.order_seed is None and quiz.random_order:
+        # Attempts started before seeds existed keep their stored order rows
+        legacy = db.execute(
+            select(StudentQuizQuestionOrder.question_id)
+            .where(StudentQuizQuestionOrder.student_quiz_id == attempt.id)
+            .order_by(StudentQuizQuestionOrder.position)
+        ).scalars().all()
+        if legacy:
+            return legacy
+    return derive_order(question_ids, attempt.order_seed)
+
+
+def drop_derivable_order_rows(db: Session) -> int:
+    # Rows for fixed-order quizzes carry no information; random-order legacy rows are kept and still read
+    fixed_attempts = (
+        select(StudentQuiz.id)
+        .join(Quiz, Quiz.id == StudentQuiz.quiz_id)
+        .where((Quiz.random_order == False) | (Quiz.random_order.is_(None)))
+    )
+    result = db.execute(
+        delete(StudentQuizQuestionOrder).where(StudentQuizQuestionOrder.student_quiz_id.in_(fixed_attempts))
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,144 @@
+# services/quiz_cache.py
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Quiz
+from threading import Lock
+from typing import Callable, Iterable, Optional
+import time
+
+
+def content_version(db: Session, quiz_id: int) -> Optional[int]:
+    # The quiz's persisted content version, None once it is deleted
+    return db.execute(select(Quiz.content_version).where(Quiz.id == quiz_id)).scalar()
+
+
+class QuizCache:
+    # Thread-safe LRU of per-quiz entries, invalidated by quiz or by any question the quiz contains. Those
+    # invalidations only reach this process; an entry stored with a version is also reloaded once a caller
+    # passes a different one, which is how other workers' edits are noticed. With ttl, entries are also
+    # reloaded once they are that many seconds old.
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+        self._entries = OrderedDict()
+        self._quizzes_by_question = {}
+        self._generation = 0
+        self._lock = Lock()
+
+    def get(self, quiz_id: int, loader: Callable, version=None):
+        # loader() returns (value, question_ids); it runs outside the lock. Read version before calling.
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is not None and entry[2] == version and self._fresh(entry):
+                self._entries.move_to_end(quiz_id)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._forget(quiz_id)
+                self.stale += 1
+            self.misses += 1
+            generation = self._generation
+
+        value, question_ids = loader()
+
+        with self._lock:
+            # Drop the result if something was invalidated while it was being built
+            if generation == self._generation:
+                self._store(quiz_id, value, question_ids, version)
+        return value
+
+    def get_many(self, quiz_ids: Iterable[int], loader: Callable) -> dict:
+        # loader(missing_ids) returns {quiz_id: (value, question_ids)} for the misses, in one round-trip
+        found, missing = {}, []
+        with self._lock:
+            for quiz_id in quiz_ids:
+                entry = self._entries.get(quiz_id)
+                if entry is not None and self._fresh(entry):
+                    self._entries.move_to_end(quiz_id)
+                    self.hits += 1
+                    found[quiz_id] = entry[0]
+                elif quiz_id not in missing:
+                    if entry is not None:
+                        self._forget(quiz_id)
+                        self.stale += 1
+                    self.misses += 1
+                    missing.append(quiz_id)
+            generation = self._generation
+
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                for quiz_id, (value, question_ids) in loaded.items():
+                    found[quiz_id] = value
+                    if generation == self._generation:
+                        self._store(quiz_id, value, question_ids)
+        return found
+
+    def peek(self, quiz_id: int):
+        # Cached value or None, without loading or touching the counters
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            return entry[0] if entry and self._fresh(entry) else None
+
+    def _store(self, quiz_id: int, value, question_ids: Iterable[int], version=None):
+        if quiz_id in self._entries:
+            self._forget(quiz_id)
+        question_ids = frozenset(question_ids)
+        self._entries[quiz_id] = (value, question_ids, version, time.monotonic())
+        for qid in question_ids:
+            self._quizzes_by_question.setdefault(qid, set()).add(quiz_id)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._forget(oldest)
+            self.evictions += 1
+
+    def _fresh(self, entry: tuple) -> bool:
+        return self.ttl is None or time.monotonic() - entry[3] < self.ttl
+
+    def _forget(self, quiz_id: int):
+        _, question_ids, _, _ = self._entries.pop(quiz_id)
+        for qid in question_ids:
+            quizzes = self._quizzes_by_question.get(qid)
+            if quizzes:
+                quizzes.discard(quiz_id)
+                if not quizzes:
+                    del self._quizzes_by_question[qid]
+
+    def invalidate_quiz(self, quiz_id: int):
+        with self._lock:
+            self._generation += 1
+            if quiz_id in self._entries:
+                self._forget(quiz_id)
+
+    def invalidate_question(self, question_id: int):
+        with self._lock:
+            self._generation += 1
+            for quiz_id in list(self._quizzes_by_question.get(question_id, ())):
+                self._forget(quiz_id)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._quizzes_by_question.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale": self.stale,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
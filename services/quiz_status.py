@@ -0,0 +1,34 @@
+# services/quiz_status.py
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from models import Quiz, QuizStatus
+from services.http_cache import resource_versions
+from datetime import datetime
+from typing import List
+
+
+def utc_now_iso() -> str:
+    # Quiz times are ISO strings compared lexically, as elsewhere in the app
+    return datetime.utcnow().isoformat()
+
+
+def effective_status(status: QuizStatus, quiz_end_time, now: str) -> QuizStatus:
+    # A quiz past its end time reads as COMPLETED even before the stored status is closed
+    if status == QuizStatus.ACTIVE and quiz_end_time and quiz_end_time < now:
+        return QuizStatus.COMPLETED
+    return status
+
+
+def close_expired_quizzes(db: Session, now: str = None) -> List[int]:
+    # One bulk UPDATE replaces the per-quiz commits that used to happen on the dashboard read path.
+    # Returns the ids it closed, for the scheduler to announce.
+    closed = db.execute(
+        update(Quiz)
+        .where(Quiz.status == QuizStatus.ACTIVE, Quiz.quiz_end_time.is_not(None), Quiz.quiz_end_time < (now or utc_now_iso()))
+        .values(status=QuizStatus.COMPLETED)
+        .returning(Quiz.id)
+    ).scalars().all()
+    db.commit()
+    if closed:
+        resource_versions.bump("quizzes")
+    return closed
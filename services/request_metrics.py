@@ -0,0 +1,297 @@
+# services/request_metrics.py
+# Per-request SQL accounting. The middleware opens a trace for every HTTP request and keeps it in a context
+# variable, which follows the request into the threadpool and the async driver's greenlets; the statement hooks
+# that database.py installs on every engine add each statement's time, rows fetched and fingerprint to it.
+# Finished traces are folded into per-route totals: Prometheus text on /metrics, suspected N+1 patterns on
+# /admin/sql. QUIZ_SQL_DEBUG_HEADER puts a request's own numbers in its response headers, and requests slower
+# than QUIZ_SLOW_REQUEST_MS are logged with the statements they ran. Statements run on background threads (the
+# scheduler, autosave flushes, the write queue) belong to no request and are not counted.
+from collections import Counter
+from functools import lru_cache
+from threading import Lock
+from typing import Optional
+import contextvars
+import logging
+import re
+import time
+import config
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+MAX_KEPT_STATEMENTS = 200  # per request, for the slow-request log
+MAX_FINGERPRINTS_PER_ROUTE = 20
+
+_trace = contextvars.ContextVar("request_trace", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\?|\$\d+|%\(\w+\)s|%s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    # The statement with literals and parameters as ?, and expanded IN lists folded to one entry
+    shape = _SPACE.sub(" ", statement).strip()
+    shape = _PARAM.sub("?", _NUMBER.sub("?", _STRING.sub("?", shape)))
+    return _LIST.sub("(?...)", shape)
+
+
+class RequestTrace:
+    # What one request ran; filled in by the engine hooks
+
+    __slots__ = ("statements", "sql_seconds", "rows", "shapes", "kept", "streaming")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.shapes = Counter()
+        self.kept = []
+        self.streaming = False
+
+    def add_statement(self, statement: str, seconds: float):
+        self.statements += 1
+        self.sql_seconds += seconds
+        self.shapes[fingerprint(statement)] += 1
+        if len(self.kept) < MAX_KEPT_STATEMENTS:
+            self.kept.append((seconds, statement))
+
+    def add_fetch(self, rows: int, seconds: float):
+        # SQLite steps through a result as it is fetched, so fetching is SQL time too
+        self.rows += rows
+        self.sql_seconds += seconds
+
+    def repeated(self, threshold: int = config.N_PLUS_ONE_THRESHOLD) -> dict:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _trace.get()
+
+
+class RowCountingCursor:
+    # Stands in for the DBAPI cursor a result reads from, counting and timing its fetches
+
+    __slots__ = ("_cursor", "_trace")
+
+    def __init__(self, cursor, trace: RequestTrace):
+        self._cursor = cursor
+        self._trace = trace
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._trace.add_fetch(row is not None, time.perf_counter() - started)
+        return row
+
+    def fetchmany(self, *args):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args)
+        self._trace.add_fetch(len(rows), time.perf_counter() - started)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._trace.add_fetch(len(rows), time.perf_counter() - started)
+        return rows
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class _RouteTotals:
+    __slots__ = ("statuses", "duration", "statements", "sql_seconds", "rows", "n_plus_one", "suspects", "slow")
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.statements = _Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.n_plus_one = 0
+        self.suspects = {}  # fingerprint -> [requests, most repeats in one request]
+        self.slow = 0
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class RequestMetrics:
+    # Totals per (method, route template); the template keeps the label set bounded
+
+    def __init__(self, slow_ms: int = config.SLOW_REQUEST_MS):
+        self.slow_seconds = slow_ms / 1000 if slow_ms > 0 else None
+        self._routes = {}
+        self._lock = Lock()
+
+    def finish(self, scope: dict, trace: RequestTrace, status: int, seconds: float):
+        route = scope.get("route")
+        key = (scope["method"], getattr(route, "path", None) or "unmatched")
+        repeated = trace.repeated()
+        slow = self.slow_seconds is not None and seconds >= self.slow_seconds and not trace.streaming
+        with self._lock:
+            totals = self._routes.get(key)
+            if totals is None:
+                totals = self._routes[key] = _RouteTotals()
+            totals.statuses[status] += 1
+            if not trace.streaming:
+                # An event stream's duration is how long the client stayed, not how long it took
+                totals.duration.observe(seconds)
+            totals.statements.observe(trace.statements)
+            totals.sql_seconds += trace.sql_seconds
+            totals.rows += trace.rows
+            if repeated:
+                totals.n_plus_one += 1
+            for shape, count in repeated.items():
+                suspect = totals.suspects.get(shape)
+                if suspect is None and len(totals.suspects) < MAX_FINGERPRINTS_PER_ROUTE:
+                    suspect = totals.suspects[shape] = [0, 0]
+                if suspect is not None:
+                    suspect[0] += 1
+                    suspect[1] = max(suspect[1], count)
+            if slow:
+                totals.slow += 1
+        if slow:
+            self._log_slow(key, trace, status, seconds, repeated)
+
+    @staticmethod
+    def _log_slow(key: tuple, trace: RequestTrace, status: int, seconds: float, repeated: dict):
+        lines = [f"Slow request {key[0]} {key[1]} -> {status}: {seconds * 1000:.0f}ms, {trace.statements} statements,"
+                 f" {trace.sql_seconds * 1000:.1f}ms in SQL, {trace.rows} rows"]
+        for shape, count in sorted(repeated.items(), key=lambda item: -item[1]):
+            lines.append(f"  repeated x{count}: {shape}")
+        for statement_seconds, statement in sorted(trace.kept, key=lambda item: -item[0])[:10]:
+            lines.append(f"  {statement_seconds * 1000:8.2f}ms  {_SPACE.sub(' ', statement).strip()}")
+        logger.warning("\n".join(lines))
+
+    def render(self) -> str:
+        # Prometheus text exposition format
+        with self._lock:
+            routes = sorted(self._routes.items())
+            out = []
+
+            def metric(name, kind, text):
+                out.append(f"# HELP {name} {text}")
+                out.append(f"# TYPE {name} {kind}")
+
+            def histogram(name, labels, hist):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    out.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                out.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                out.append(f"{name}_sum{{{labels}}} {hist.total:.6f}")
+                out.append(f"{name}_count{{{labels}}} {hist.count}")
+
+            labels = {key: f'method="{key[0]}",route="{_label(key[1])}"' for key, _ in routes}
+            metric("quiz_http_requests_total", "counter", "Requests by route and status")
+            for key, totals in routes:
+                for status, count in sorted(totals.statuses.items()):
+                    out.append(f'quiz_http_requests_total{{{labels[key]},status="{status}"}} {count}')
+            metric("quiz_http_request_duration_seconds", "histogram", "Request latency, event streams excluded")
+            for key, totals in routes:
+                histogram("quiz_http_request_duration_seconds", labels[key], totals.duration)
+            metric("quiz_sql_statements_per_request", "histogram", "SQL statements run by one request")
+            for key, totals in routes:
+                histogram("quiz_sql_statements_per_request", labels[key], totals.statements)
+            metric("quiz_sql_seconds_total", "counter", "Time spent executing statements and fetching rows")
+            for key, totals in routes:
+                out.append(f"quiz_sql_seconds_total{{{labels[key]}}} {totals.sql_seconds:.6f}")
+            metric("quiz_sql_rows_fetched_total", "counter", "Rows fetched from the database")
+            for key, totals in routes:
+                out.append(f"quiz_sql_rows_fetched_total{{{labels[key]}}} {totals.rows}")
+            metric("quiz_sql_n_plus_one_requests_total", "counter",
+                   "Requests that repeated one statement shape at least QUIZ_N_PLUS_ONE_THRESHOLD times")
+            for key, totals in routes:
+                out.append(f"quiz_sql_n_plus_one_requests_total{{{labels[key]}}} {totals.n_plus_one}")
+            metric("quiz_http_slow_requests_total", "counter", "Requests slower than QUIZ_SLOW_REQUEST_MS")
+            for key, totals in routes:
+                out.append(f"quiz_http_slow_requests_total{{{labels[key]}}} {totals.slow}")
+        return "\n".join(out) + "\n"
+
+    def stats(self) -> list:
+        # Per route averages and suspected N+1 statements, busiest routes first
+        with self._lock:
+            routes = []
+            for (method, path), totals in self._routes.items():
+                count = totals.statements.count
+                routes.append({
+                    "method": method, "route": path, "requests": count,
+                    "average_ms": round(totals.duration.total / totals.duration.count * 1000, 2)
+                    if totals.duration.count else None,
+                    "statements_per_request": round(totals.statements.total / count, 2) if count else 0,
+                    "sql_ms_per_request": round(totals.sql_seconds / count * 1000, 2) if count else 0,
+                    "rows_per_request": round(totals.rows / count, 1) if count else 0,
+                    "n_plus_one_requests": totals.n_plus_one, "slow_requests": totals.slow,
+                    "repeated_statements": [
+                        {"statement": shape, "requests": seen, "max_repeats": most}
+                        for shape, (seen, most) in sorted(totals.suspects.items(), key=lambda item: -item[1][1])
+                    ],
+                })
+        return sorted(routes, key=lambda route: -route["requests"])
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestMetricsMiddleware:
+    # Plain ASGI middleware, so streamed responses pass straight through
+
+    def __init__(self, app, debug_header: bool = config.SQL_DEBUG_HEADER):
+        self.app = app
+        self.debug_header = debug_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_stats(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                trace.streaming = any(name == b"content-type" and value.startswith(b"text/event-stream")
+                                      for name, value in headers)
+                if self.debug_header:
+                    # What ran before the headers went out; a streamed body may run more
+                    sql_ms = trace.sql_seconds * 1000
+                    headers.append((b"x-sql-stats", (f"statements={trace.statements}; sql_ms={sql_ms:.2f}; "
+                                                     f"rows={trace.rows}; repeated={len(trace.repeated())}").encode()))
+                    headers.append((b"server-timing", f"sql;dur={sql_ms:.2f}".encode()))
+                    message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _trace.reset(token)
+            request_metrics.finish(scope, trace, status, time.perf_counter() - started)
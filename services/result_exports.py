@@ -0,0 +1,158 @@
+# services/result_exports.py
+# Quiz results as CSV or XLSX, for one quiz or many. Attempts are read yield_per at a time (with their
+# answers fetched per batch when pivoted into columns), so memory stays flat for any cohort size.
+# XLSX uses openpyxl's write-only workbook, which spools rows to disk; the finished file is then streamed.
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from openpyxl import Workbook
+from models import Quiz, QuizQuestion, StudentQuiz, StudentAnswer, User
+from typing import Callable, Dict, Iterator, List, Optional
+import csv
+import io
+import re
+import tempfile
+
+BATCH_SIZE = 1000
+FILE_CHUNK = 64 * 1024
+
+BASE_COLUMNS = ["quiz_id", "quiz_title", "student_id", "name", "email", "batch", "semester",
+                "started_at", "submitted_at", "score", "total_marks"]
+
+
+def _student_filter(stmt, batch: Optional[str], semester: Optional[str]):
+    if batch is not None:
+        stmt = stmt.where(User.batch == batch)
+    if semester is not None:
+        stmt = stmt.where(User.semester == semester)
+    return stmt
+
+
+def select_quizzes(db: Session, quiz_ids: Optional[List[int]], batch: Optional[str], semester: Optional[str]) -> list:
+    # The quizzes to export: those asked for, or every quiz attempted by the batch / semester
+    if quiz_ids:
+        stmt = select(Quiz.id, Quiz.title, Quiz.total_marks).where(Quiz.id.in_(quiz_ids))
+    else:
+        attempted = _student_filter(
+            select(StudentQuiz.quiz_id).join(User, User.id == StudentQuiz.student_id), batch, semester
+        )
+        stmt = select(Quiz.id, Quiz.title, Quiz.total_marks).where(Quiz.id.in_(attempted))
+    return db.execute(stmt.order_by(Quiz.id)).all()
+
+
+def quiz_question_ids(db: Session, quiz_ids: List[int]) -> Dict[int, List[int]]:
+    questions = {quiz_id: [] for quiz_id in quiz_ids}
+    for quiz_id, question_id in db.execute(
+        select(QuizQuestion.quiz_id, QuizQuestion.question_id)
+        .where(QuizQuestion.quiz_id.in_(quiz_ids))
+        .order_by(QuizQuestion.quiz_id, QuizQuestion.id)
+    ):
+        questions[quiz_id].append(question_id)
+    return questions
+
+
+def answer_columns(count: int) -> List[str]:
+    return [name for n in range(1, count + 1) for name in (f"Q{n} answer", f"Q{n} correct")]
+
+
+def result_rows(db: Session, quizzes: list, batch: Optional[str], semester: Optional[str],
+                with_answers: bool, batch_size: int = BATCH_SIZE) -> Iterator[List[tuple]]:
+    # Yields lists of (quiz_id, row) in quiz order; rows follow BASE_COLUMNS, then answer pairs per question
+    titles = {quiz.id: (quiz.title, quiz.total_marks) for quiz in quizzes}
+    questions = quiz_question_ids(db, list(titles)) if with_answers else {}
+    stmt = _student_filter(
+        select(StudentQuiz.id, StudentQuiz.quiz_id, StudentQuiz.student_id, User.name, User.email, User.batch,
+               User.semester, StudentQuiz.started_at, StudentQuiz.submitted_at, StudentQuiz.total_score)
+        .join(User, User.id == StudentQuiz.student_id)
+        .where(StudentQuiz.quiz_id.in_(list(titles))),
+        batch, semester
+    ).order_by(StudentQuiz.quiz_id, StudentQuiz.student_id).execution_options(yield_per=batch_size)
+
+    for attempts in db.execute(stmt).partitions():
+        answers = {}
+        if with_answers:
+            for attempt_id, question_id, given, is_correct in db.execute(
+                select(StudentAnswer.student_quiz_id, StudentAnswer.question_id, StudentAnswer.given_answer,
+                       StudentAnswer.is_correct)
+                .where(StudentAnswer.student_quiz_id.in_([a.id for a in attempts]))
+            ):
+                answers.setdefault(attempt_id, {})[question_id] = (given, bool(is_correct))
+        rows = []
+        for a in attempts:
+            title, total_marks = titles[a.quiz_id]
+            row = [a.quiz_id, title, a.student_id, a.name, a.email, a.batch, a.semester,
+                   a.started_at, a.submitted_at, a.total_score, total_marks]
+            if with_answers:
+                given = answers.get(a.id, {})
+                for question_id in questions[a.quiz_id]:
+                    answer, correct = given.get(question_id, (None, None))
+                    row.extend((answer, correct))
+            rows.append((a.quiz_id, row))
+        yield rows
+
+
+def stream_csv(session_factory: Callable[[], Session], quiz_ids: Optional[List[int]], batch: Optional[str],
+               semester: Optional[str], with_answers: bool) -> Iterator[bytes]:
+    # One table for all quizzes; with answers, question columns are by position in each quiz
+    db = session_factory()
+    try:
+        quizzes = select_quizzes(db, quiz_ids, batch, semester)
+        header = list(BASE_COLUMNS)
+        if with_answers:
+            counts = quiz_question_ids(db, [q.id for q in quizzes])
+            header += answer_columns(max((len(ids) for ids in counts.values()), default=0))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for rows in result_rows(db, quizzes, batch, semester, with_answers):
+            writer.writerows(row for _, row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+SHEET_TITLE_UNSAFE = re.compile(r"[\[\]:*?/\\]")
+
+
+def _sheet_title(quiz_id: int, title: str) -> str:
+    # Excel sheet names: at most 31 characters, none of []:*?/\ ; the id keeps them unique
+    return SHEET_TITLE_UNSAFE.sub(" ", f"{quiz_id} {title or ''}")[:31].strip()
+
+
+def stream_xlsx(session_factory: Callable[[], Session], quiz_ids: Optional[List[int]], batch: Optional[str],
+                semester: Optional[str], with_answers: bool) -> Iterator[bytes]:
+    # One sheet per quiz. The workbook is written to a temporary file in write-only mode, then sent in chunks.
+    db = session_factory()
+    try:
+        quizzes = select_quizzes(db, quiz_ids, batch, semester)
+        counts = quiz_question_ids(db, [q.id for q in quizzes]) if with_answers else {}
+        workbook = Workbook(write_only=True)
+        sheets = {}
+        for quiz in quizzes:
+            sheet = workbook.create_sheet(_sheet_title(quiz.id, quiz.title))
+            sheet.append(BASE_COLUMNS + (answer_columns(len(counts[quiz.id])) if with_answers else []))
+            sheets[quiz.id] = sheet
+        for rows in result_rows(db, quizzes, batch, semester, with_answers):
+            for quiz_id, row in rows:
+                sheets[quiz_id].append(row)
+    finally:
+        db.close()
+
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(FILE_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+
+
+# format -> (media type, file extension, stream function)
+RESULT_FORMATS = {
+    "csv": ("text/csv", "csv", stream_csv),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx", stream_xlsx),
+}
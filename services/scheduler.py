@@ -0,0 +1,150 @@
+# services/scheduler.py
+from sqlalchemy import select
+from database import SessionLocal
+from models import Quiz, QuizStatus
+from services.quiz_status import close_expired_quizzes
+from services.grading import get_answer_key
+from services.papers import get_paper
+from services.assignments import get_assigned_students
+from services.events import publish_quiz_event
+from datetime import datetime, timedelta, timezone
+from threading import Thread, Condition
+from typing import Optional
+import heapq
+import itertools
+import logging
+
+PREWARM_LEAD = timedelta(minutes=5)
+RESCAN_INTERVAL = timedelta(minutes=1)
+SCHEDULE_HORIZON = timedelta(hours=1)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_quiz_time(value: Optional[str]) -> Optional[datetime]:
+    # Quiz times arrive as ISO strings, with or without a Z; naive ones are UTC like utc_now_iso()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class QuizScheduler:
+    # Timer heap of (run_at, seq, kind, quiz_id) served by one background thread
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._heap = []
+        self._pending = set()
+        self._seq = itertools.count()
+        self._cond = Condition()
+        self._thread = None
+        self._stopping = False
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = Thread(target=self._run, name="quiz-scheduler", daemon=True)
+        self.schedule(utc_now(), "rescan")
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def schedule(self, run_at: datetime, kind: str, quiz_id: Optional[int] = None):
+        key = (kind, quiz_id, run_at)
+        with self._cond:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            heapq.heappush(self._heap, (run_at, next(self._seq), kind, quiz_id))
+            self._cond.notify()
+
+    def schedule_quiz(self, quiz: Quiz, now: Optional[datetime] = None):
+        # Prewarm shortly before the start, announce the start, close at the end; later jobs wait for a rescan
+        now = now or utc_now()
+        if not quiz.is_active or quiz.status != QuizStatus.ACTIVE:
+            return
+        start = parse_quiz_time(quiz.start_time)
+        end = parse_quiz_time(quiz.quiz_end_time)
+        if start and start > now and start - PREWARM_LEAD <= now + SCHEDULE_HORIZON:
+            self.schedule(max(now, start - PREWARM_LEAD), "prewarm", quiz.id)
+        if start and start > now and start <= now + SCHEDULE_HORIZON:
+            self.schedule(start, "open", quiz.id)
+        if end and end <= now + SCHEDULE_HORIZON:
+            self.schedule(max(now, end), "close", quiz.id)
+
+    def jobs(self) -> list:
+        with self._cond:
+            return [
+                {"run_at": run_at.isoformat(), "kind": kind, "quiz_id": quiz_id}
+                for run_at, _, kind, quiz_id in sorted(self._heap)
+            ]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    now = utc_now()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+                run_at, _, kind, quiz_id = heapq.heappop(self._heap)
+                self._pending.discard((kind, quiz_id, run_at))
+            try:
+                self._execute(kind, quiz_id)
+            except Exception:
+                logger.exception("Scheduled %s for quiz %s failed", kind, quiz_id)
+
+    def _execute(self, kind: str, quiz_id: Optional[int]):
+        db = self.session_factory()
+        try:
+            if kind == "rescan":
+                now = utc_now()
+                quizzes = db.execute(
+                    select(Quiz).where(Quiz.status == QuizStatus.ACTIVE, Quiz.is_active == True)
+                ).scalars().all()
+                for quiz in quizzes:
+                    self.schedule_quiz(quiz, now)
+                self.schedule(now + RESCAN_INTERVAL, "rescan")
+            elif kind == "close":
+                # One bulk UPDATE closes this quiz and any other that has also run out
+                for closed_id in close_expired_quizzes(db):
+                    publish_quiz_event(db, closed_id, "quiz_completed", status=QuizStatus.COMPLETED.value)
+            elif kind == "open":
+                # Only announced if the quiz wasn't withdrawn or closed early in the meantime
+                quiz = db.get(Quiz, quiz_id)
+                if quiz is not None and quiz.is_active and quiz.status == QuizStatus.ACTIVE:
+                    publish_quiz_event(db, quiz_id, "quiz_opened", start_time=quiz.start_time)
+            elif kind == "prewarm":
+                get_answer_key(db, quiz_id)
+                get_paper(db, quiz_id)
+                get_assigned_students(db, quiz_id)
+        finally:
+            db.close()
+
+
+scheduler = QuizScheduler()
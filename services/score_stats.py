@@ -0,0 +1,120 @@
+# services/score_stats.py
+from sqlalchemy import select, update, delete, insert, func, literal, cast, Float
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import StudentQuiz, QuizScoreStats, QuizScoreBucket
+from typing import Optional
+
+REPORT_PERCENTILES = (25, 75, 90)
+
+
+def _upsert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _add_to_bucket(db: Session, quiz_id: int, score: float, delta: int):
+    stmt = _upsert(db)(QuizScoreBucket).values(quiz_id=quiz_id, score=float(score), count=delta)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[QuizScoreBucket.quiz_id, QuizScoreBucket.score],
+        set_={"count": QuizScoreBucket.count + delta}
+    ))
+
+
+def _bump_totals(db: Session, quiz_id: int, attempts: int, score_delta: float) -> bool:
+    result = db.execute(
+        update(QuizScoreStats)
+        .where(QuizScoreStats.quiz_id == quiz_id)
+        .values(attempts=QuizScoreStats.attempts + attempts, score_sum=QuizScoreStats.score_sum + score_delta)
+    )
+    return result.rowcount > 0
+
+
+def rebuild_quiz_stats(db: Session, quiz_id: int):
+    # Recomputes the running stats for one quiz from student_quizzes
+    db.flush()
+    score = cast(func.coalesce(StudentQuiz.total_score, 0), Float)
+    db.execute(delete(QuizScoreBucket).where(QuizScoreBucket.quiz_id == quiz_id))
+    db.execute(delete(QuizScoreStats).where(QuizScoreStats.quiz_id == quiz_id))
+    db.execute(insert(QuizScoreBucket).from_select(
+        ["quiz_id", "score", "count"],
+        select(literal(quiz_id), score, func.count()).where(StudentQuiz.quiz_id == quiz_id).group_by(score)
+    ))
+    db.execute(insert(QuizScoreStats).from_select(
+        ["quiz_id", "attempts", "score_sum"],
+        select(literal(quiz_id), func.count(), func.coalesce(func.sum(score), 0)).where(StudentQuiz.quiz_id == quiz_id)
+    ))
+
+
+def rebuild_missing_quiz_stats(db: Session) -> int:
+    # Backfill for quizzes attempted before running stats existed
+    quiz_ids = db.execute(
+        select(StudentQuiz.quiz_id).distinct()
+        .where(StudentQuiz.quiz_id.not_in(select(QuizScoreStats.quiz_id)))
+    ).scalars().all()
+    for quiz_id in quiz_ids:
+        rebuild_quiz_stats(db, quiz_id)
+    db.commit()
+    return len(quiz_ids)
+
+
+def record_attempt_started(db: Session, quiz_id: int):
+    # New attempts count with a score of 0 until graded; call before the attempt's commit
+    if not _bump_totals(db, quiz_id, 1, 0):
+        rebuild_quiz_stats(db, quiz_id)
+        return
+    _add_to_bucket(db, quiz_id, 0, 1)
+
+
+def record_attempt_graded(db: Session, quiz_id: int, old_score: Optional[float], new_score: float):
+    # Moves the attempt from its previous score to the graded one; call before the grading commit
+    old_score = old_score or 0
+    if not _bump_totals(db, quiz_id, 0, new_score - old_score):
+        rebuild_quiz_stats(db, quiz_id)
+        return
+    _add_to_bucket(db, quiz_id, old_score, -1)
+    _add_to_bucket(db, quiz_id, new_score, 1)
+
+
+def _plain(score: float):
+    # Whole-number scores read back from REAL columns are reported as ints, like total_score
+    return int(score) if float(score).is_integer() else score
+
+
+def _nth_score(buckets, index: int):
+    # Score at position index (0-based, ascending) in the histogram
+    seen = 0
+    for score, count in buckets:
+        seen += count
+        if index < seen:
+            return _plain(score)
+    return _plain(buckets[-1][0])
+
+
+def read_quiz_stats(db: Session, quiz_id: int) -> dict:
+    totals = db.execute(
+        select(QuizScoreStats.attempts, QuizScoreStats.score_sum).where(QuizScoreStats.quiz_id == quiz_id)
+    ).first()
+    if totals is None:
+        rebuild_quiz_stats(db, quiz_id)
+        db.commit()
+        return read_quiz_stats(db, quiz_id)
+
+    attempts, score_sum = totals
+    buckets = db.execute(
+        select(QuizScoreBucket.score, QuizScoreBucket.count)
+        .where(QuizScoreBucket.quiz_id == quiz_id, QuizScoreBucket.count > 0)
+        .order_by(QuizScoreBucket.score)
+    ).all()
+
+    if not attempts or not buckets:
+        return {"attempts": 0, "average": 0, "median": 0, "minimum": 0, "maximum": 0,
+                "percentiles": {p: 0 for p in REPORT_PERCENTILES}}
+
+    return {
+        "attempts": attempts,
+        "average": score_sum / attempts,
+        "median": _nth_score(buckets, attempts // 2),
+        "minimum": _plain(buckets[0][0]),
+        "maximum": _plain(buckets[-1][0]),
+        "percentiles": {p: _nth_score(buckets, max(0, -(-p * attempts // 100) - 1)) for p in REPORT_PERCENTILES}
+    }
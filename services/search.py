@@ -0,0 +1,113 @@
+# services/search.py
+# Full-text search over the question bank. On SQLite, question_search is an FTS5 table with one row per
+# question (rowid = question id) holding its text, its options' text and its feedback; writers call
+# index_questions after adding or changing questions. Other databases fall back to a LIKE match on the text.
+from sqlalchemy import event, select, text, bindparam, func
+from sqlalchemy.orm import Session
+from database import Base
+from models import Question, Option
+from typing import Iterable, List, Optional, Tuple
+import re
+
+INDEX_CHUNK = 500
+
+# Question text outweighs option text, which outweighs feedback
+RANK_WEIGHTS = (4.0, 2.0, 1.0)
+
+TERM = re.compile(r"\w+")
+
+
+def search_enabled(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def create_search_table(conn):
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS question_search USING fts5("
+        "question_text, options, feedback, tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+    # Persistent rank function, so ORDER BY rank uses these weights
+    weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+    conn.execute(text(f"INSERT INTO question_search(question_search, rank) VALUES ('rank', 'bm25({weights})')"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_with_tables(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_search_table(connection)
+
+
+def index_questions(db: Session, question_ids: Iterable[int]):
+    # (Re)indexes the given questions from their current rows; ids with no question left are dropped
+    if not search_enabled(db):
+        return
+    db.flush()
+    ids = list(dict.fromkeys(question_ids))
+    option_text = (
+        select(func.group_concat(Option.text, "\n")).where(Option.question_id == Question.id).scalar_subquery()
+    )
+    for start in range(0, len(ids), INDEX_CHUNK):
+        chunk = ids[start:start + INDEX_CHUNK]
+        db.execute(text("DELETE FROM question_search WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+                   {"ids": chunk})
+        rows = db.execute(
+            select(Question.id, Question.question_text, option_text.label("options"), Question.feedback)
+            .where(Question.id.in_(chunk))
+        ).mappings().all()
+        if rows:
+            db.execute(text(
+                "INSERT INTO question_search(rowid, question_text, options, feedback) "
+                "VALUES (:id, :question_text, :options, :feedback)"
+            ), [dict(row) for row in rows])
+
+
+def rebuild_search_index(db: Session) -> int:
+    db.execute(text("DELETE FROM question_search"))
+    ids = db.execute(select(Question.id).order_by(Question.id)).scalars().all()
+    index_questions(db, ids)
+    return len(ids)
+
+
+def match_expression(query: str) -> Optional[str]:
+    # Every word must appear; the last one may be a prefix, so results follow the teacher's typing.
+    # Words are quoted, which keeps FTS5 operators and punctuation in the input from being parsed.
+    terms = TERM.findall(query)
+    if not terms:
+        return None
+    return " ".join(f'"{t}"' for t in terms) + "*"
+
+
+def search_questions(db: Session, query: str, question_type: Optional[str] = None,
+                     subcategory_id: Optional[int] = None, offset: int = 0, limit: int = 20) -> Tuple[List[dict], bool]:
+    # Returns (items, more) for one page of results, best match first
+    expression = match_expression(query)
+    if expression is None:
+        return [], False
+    filters, params = "", {"match": expression, "limit": limit + 1, "offset": offset}
+    if question_type:
+        filters += " AND q.question_type = :question_type"
+        params["question_type"] = question_type
+    if subcategory_id:
+        filters += " AND q.subcategory_id = :subcategory_id"
+        params["subcategory_id"] = subcategory_id
+
+    if search_enabled(db):
+        sql = f"""
+            SELECT q.id, q.question_text, q.question_type, q.subcategory_id
+            FROM question_search s
+            JOIN questions q ON q.id = s.rowid
+            WHERE s.question_search MATCH :match{filters}
+            ORDER BY s.rank, q.id
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        params["match"] = "%" + "%".join(TERM.findall(query)) + "%"
+        sql = f"""
+            SELECT q.id, q.question_text, q.question_type, q.subcategory_id
+            FROM questions q
+            WHERE lower(q.question_text) LIKE lower(:match){filters}
+            ORDER BY q.id
+            LIMIT :limit OFFSET :offset
+        """
+    rows = db.execute(text(sql), params).mappings().all()
+    return [dict(row) for row in rows[:limit]], len(rows) > limit
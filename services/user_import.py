@@ -0,0 +1,104 @@
+# services/user_import.py
+# Bulk user provisioning from CSV. Rows are handled in batches. Each batch is checked for duplicate
+# emails with one set query, its passwords are hashed on the process pool, and it is inserted with one
+# executemany. Hashing happens outside any transaction, so the database is only locked for the insert.
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import User
+from services.passwords import hash_passwords
+from typing import Callable, List, Optional
+import codecs
+import csv
+
+BATCH_SIZE = 1000
+
+REQUIRED_FIELDS = ("name", "email", "password", "role")
+OPTIONAL_FIELDS = ("college", "batch", "semester", "course")
+
+
+def _row_error(line: int, email: Optional[str], message: str) -> dict:
+    return {"line": line, "email": email, "error": message}
+
+
+def _insert_rows(db: Session, rows: List[dict], errors: List[dict]) -> int:
+    try:
+        with db.begin_nested():
+            db.execute(insert(User), [row["values"] for row in rows])
+        return len(rows)
+    except IntegrityError:
+        pass
+    # Someone else added one of these emails since the duplicate check; find which, row by row
+    created = 0
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(User), [row["values"]])
+            created += 1
+        except IntegrityError:
+            errors.append(_row_error(row["line"], row["values"]["email"], "Email already exists"))
+    return created
+
+
+def import_users(db: Session, binary_file, progress: Optional[Callable] = None, total_bytes: Optional[int] = None,
+                 batch_size: int = BATCH_SIZE) -> dict:
+    # progress(processed=, created=, failed=, percent=) is called after every batch; percent needs total_bytes
+    reader = csv.DictReader(codecs.iterdecode(binary_file, "utf-8-sig"))
+    missing_columns = [f for f in REQUIRED_FIELDS if f not in (reader.fieldnames or [])]
+    if missing_columns:
+        return {"created": 0, "failed": 0,
+                "errors": [_row_error(1, None, f"Missing columns: {', '.join(missing_columns)}")]}
+
+    seen = {}
+    errors: List[dict] = []
+    created, processed = 0, 0
+    batch: List[dict] = []
+
+    def flush():
+        nonlocal created
+        emails = [row["values"]["email"] for row in batch]
+        existing = set(db.execute(select(User.email).where(User.email.in_(emails))).scalars())
+        fresh = []
+        for row in batch:
+            if row["values"]["email"] in existing:
+                errors.append(_row_error(row["line"], row["values"]["email"], "Email already exists"))
+            else:
+                fresh.append(row)
+        for row, hashed in zip(fresh, hash_passwords([row["values"]["password"] for row in fresh])):
+            row["values"]["password"] = hashed
+        if fresh:
+            created += _insert_rows(db, fresh, errors)
+        db.commit()
+        batch.clear()
+
+    def report():
+        if progress is not None:
+            fraction = min(1.0, binary_file.tell() / total_bytes) if total_bytes else None
+            progress(processed=processed, created=created, failed=len(errors),
+                     percent=round(fraction * 100, 1) if fraction is not None else None)
+
+    for record in reader:
+        processed += 1
+        line = reader.line_num
+        # Passwords are taken as written; everything else is trimmed
+        values = {f: (record.get(f) or "").strip() for f in REQUIRED_FIELDS}
+        values["password"] = record.get("password") or ""
+        values.update({f: (record.get(f) or "").strip() or None for f in OPTIONAL_FIELDS})
+        empty = [f for f in REQUIRED_FIELDS if not values[f]]
+        if empty:
+            errors.append(_row_error(line, values["email"] or None, f"Missing {', '.join(empty)}"))
+            continue
+        if values["email"] in seen:
+            errors.append(_row_error(line, values["email"], f"Duplicate email, first seen on line {seen[values['email']]}"))
+            continue
+        seen[values["email"]] = line
+        batch.append({"line": line, "values": values})
+        if len(batch) >= batch_size:
+            flush()
+            report()
+    if batch:
+        flush()
+    report()
+
+    errors.sort(key=lambda e: e["line"])
+    return {"created": created, "failed": len(errors), "errors": errors}
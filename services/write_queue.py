@@ -0,0 +1,138 @@
+# services/write_queue.py
+# Single writer for the student write paths. SQLite takes one writer at a time, so requests that each commit
+# on their own queue for the file lock and pay a commit apiece. With WRITE_QUEUE on, handlers hand their
+# writes to this queue instead: one thread takes everything waiting (up to WRITE_BATCH_MAX), runs each write
+# in its own savepoint so one failure doesn't undo the others, commits once and hands the results back.
+from database import SessionLocal
+from threading import Thread, Lock
+from typing import Callable
+import asyncio
+import config
+import logging
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve(future: asyncio.Future, ok: bool, value):
+    # Runs on the requester's loop; the request may have been cancelled meanwhile
+    if future.done():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+class GroupCommitWriter:
+    # Queue of (write, args) served by one thread, a batch per transaction
+
+    def __init__(self, session_factory=SessionLocal, enabled: bool = config.WRITE_QUEUE,
+                 max_batch: int = config.WRITE_BATCH_MAX):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = Lock()
+        self.batches = 0
+        self.writes = 0
+        self.largest_batch = 0
+        self.failed_commits = 0
+        self.commit_ms = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # Writes already queued are applied first
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=10)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    async def submit(self, write: Callable, *args):
+        # write(db, *args) runs on the writer thread; its result (or exception) comes back once committed
+        if not self.running:
+            self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((write, args, loop, future))
+        return await future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._apply(batch)
+            if stopping:
+                return
+
+    def _apply(self, batch: list):
+        outcomes = []
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            if db.get_bind().dialect.name == "sqlite":
+                # pysqlite opens its own transaction at a SAVEPOINT and commits it at RELEASE, which would commit
+                # every write separately; an explicit BEGIN keeps the batch in one transaction. IMMEDIATE takes
+                # the write lock up front, so the batch waits out busy_timeout instead of failing part way.
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for write, args, _, _ in batch:
+                savepoint = db.begin_nested()
+                try:
+                    outcomes.append((True, write(db, *args)))
+                    savepoint.commit()
+                except Exception as exc:
+                    savepoint.rollback()
+                    outcomes.append((False, exc))
+            db.commit()
+        except Exception as exc:
+            # The commit itself failed, so none of the batch was written
+            logger.exception("Write queue commit of %d writes failed", len(batch))
+            db.rollback()
+            self.failed_commits += 1
+            outcomes = [(False, exc)] * len(batch)
+        finally:
+            db.close()
+        self.batches += 1
+        self.writes += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self.commit_ms += (time.perf_counter() - started) * 1000
+        for (_, _, loop, future), (ok, value) in zip(batch, outcomes):
+            try:
+                loop.call_soon_threadsafe(_resolve, future, ok, value)
+            except RuntimeError:
+                pass  # the requester's loop has closed
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "running": self.running, "queued": self._queue.qsize(),
+                "batches": self.batches, "writes": self.writes, "largest_batch": self.largest_batch,
+                "average_batch": round(self.writes / self.batches, 2) if self.batches else 0,
+                "average_batch_ms": round(self.commit_ms / self.batches, 2) if self.batches else 0,
+                "failed_commits": self.failed_commits}
+
+
+write_queue = GroupCommitWriter()
@@ -0,0 +1,115 @@
+# tools/bench_aiken_import.py
+# Times the /teacher/bulk_upload_questions handler on a generated Aiken file and reports peak memory growth.
+# Each run is its own process against a fresh SQLite file; --compare runs an earlier git ref the same way:
+#   python tools/bench_aiken_import.py [--questions 50000] [--compare HEAD~1]
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_aiken(path, count):
+    # Four options per question, with an unparseable block every 1000 questions
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            if i % 1000 == 999:
+                f.write(f"Broken question {i}\nA) only one option\n\n")
+                continue
+            f.write(f"Question {i}: which option is correct for item {i}?\n")
+            for label in "ABCD":
+                f.write(f"{label}) Option {label} for question {i}\n")
+            f.write(f"ANSWER: {'ABCD'[i % 4]}\n\n")
+
+
+def worker(args):
+    sys.path.insert(0, args.tree)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    from fastapi import UploadFile
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option
+    from routers.teacher import bulk_upload_questions
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    db.add(subcategory)
+    db.commit()
+    ids = {"subcategory_id": subcategory.id, "created_by": teacher.id}
+    db.close()
+
+    # Call the endpoint function directly, filling any newer query parameters with their defaults
+    params = inspect.signature(bulk_upload_questions).parameters
+    extra = {name: p.default.default for name, p in params.items()
+             if name not in ("subcategory_id", "created_by", "file", "db") and hasattr(p.default, "default")}
+
+    db = SessionLocal()
+    # ru_maxrss is a high-water mark, so growth over the level before the import is the import's peak
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(args.file, "rb") as f:
+        started = time.perf_counter()
+        result = bulk_upload_questions(file=UploadFile(f, filename="bank.txt"), db=db, **ids, **extra)
+        elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    db.close()
+
+    db = SessionLocal()
+    stored = db.query(Question).count(), db.query(Option).count()
+    db.close()
+    print(json.dumps({"seconds": elapsed, "uploaded": result["uploaded"], "errors": len(result["errors"]),
+                      "questions": stored[0], "options": stored[1], "peak_growth_mb": (rss_after - rss_before) / 1024,
+                      "maxrss_mb": rss_after / 1024}))
+
+
+def export_ref(ref):
+    target = tempfile.mkdtemp(prefix="quiz-ref-")
+    archive = subprocess.run(["git", "-C", ROOT, "archive", ref], capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=50000)
+    parser.add_argument("--compare", help="git ref to run alongside the working tree")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--tree", default=ROOT)
+    parser.add_argument("--file")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    path = os.path.join(tempfile.mkdtemp(prefix="quiz-aiken-"), "bank.txt")
+    write_aiken(path, args.questions)
+    print(f"{args.questions} questions, {os.path.getsize(path) / 2**20:.1f} MB")
+    print(f"{'tree':<14} {'seconds':>8} {'q/s':>8} {'uploaded':>9} {'errors':>7} {'peak +MB':>9} {'maxrss MB':>10}")
+
+    trees = [("working tree", ROOT)]
+    if args.compare:
+        trees.append((args.compare, export_ref(args.compare)))
+    for name, tree in trees:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--tree", tree, "--file", path],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        if r["questions"] != r["uploaded"] or r["options"] != 4 * r["uploaded"]:
+            sys.exit(f"{name}: stored {r['questions']} questions / {r['options']} options for {r['uploaded']} uploaded")
+        print(f"{name:<14} {r['seconds']:>8.1f} {r['uploaded'] / r['seconds']:>8.0f} {r['uploaded']:>9} "
+              f"{r['errors']:>7} {r['peak_growth_mb']:>9.1f} {r['maxrss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# tools/bench_async_students.py
+# Simulates an exam-start burst: every student starts the quiz, fetches the paper, submits and opens the dashboard,
+# all at once. Runs the working tree and, with --compare, an earlier git ref (e.g. the sync endpoints) side by side.
+# Each run is its own process against a fresh SQLite file:
+#   python tools/bench_async_students.py [--students 1000 5000] [--questions 20] [--compare HEAD]
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ["start", "paper", "submit", "list"]
+
+
+def seed(student_count, question_count):
+    from sqlalchemy import insert
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, AssignedQuiz
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    now = "2020-01-01T00:00:00"
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    quiz = Quiz(title="burst", total_marks=question_count, duration_minutes=60, created_by=teacher.id,
+                created_at=now, start_time=now, is_active=True, status=QuizStatus.ACTIVE, random_order=True)
+    db.add_all([subcategory, quiz])
+    db.flush()
+    answers = {}
+    for i in range(question_count):
+        q = Question(question_text=f"Q{i}", question_type="MCQ", subcategory_id=subcategory.id,
+                     created_by=teacher.id, created_at=now, is_active=True)
+        db.add(q)
+        db.flush()
+        db.add_all([Option(text=t, is_correct=(t == "a"), question_id=q.id) for t in "abcd"])
+        db.add(QuizQuestion(quiz_id=quiz.id, question_id=q.id, mark=1))
+        answers[q.id] = "a"
+    db.execute(insert(User), [{"name": f"S{i}", "email": f"s{i}@bench", "password": "x", "role": "student"}
+                              for i in range(student_count)])
+    student_ids = [u.id for u in db.query(User.id).filter(User.role == "student").order_by(User.id)]
+    db.execute(insert(AssignedQuiz), [{"quiz_id": quiz.id, "student_id": s} for s in student_ids])
+    db.commit()
+    quiz_id = quiz.id
+    db.close()
+    return quiz_id, student_ids, answers
+
+
+async def burst(app, quiz_id, student_ids, answers):
+    import httpx
+
+    latencies = {step: [] for step in STEPS}
+    errors = {step: 0 for step in STEPS}
+
+    async def timed(step, request):
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        latencies[step].append(time.perf_counter() - started)
+        if not ok:
+            errors[step] += 1
+        return ok
+
+    async def student(client, student_id):
+        if not await timed("start", client.post(f"/start_quiz/{quiz_id}/{student_id}")):
+            return
+        await timed("paper", client.get(f"/quiz/{quiz_id}/questions/{student_id}"))
+        await timed("submit", client.post("/submit_quiz", json={"quiz_id": quiz_id, "student_id": student_id,
+                                                                "answers": answers}))
+        await timed("list", client.get(f"/list/{student_id}"))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(student(client, s) for s in student_ids))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, errors
+
+
+def worker(args):
+    sys.path.insert(0, args.tree)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    quiz_id, student_ids, answers = seed(args.students[0], args.questions)
+    from main import app
+
+    elapsed, latencies, errors = asyncio.run(burst(app, quiz_id, student_ids, answers))
+    result = {"seconds": elapsed, "requests_per_s": sum(len(v) for v in latencies.values()) / elapsed,
+              "errors": sum(errors.values())}
+    for step in STEPS:
+        values = sorted(latencies[step])
+        result[step] = {
+            "p50_ms": values[len(values) // 2] * 1000 if values else 0,
+            "p99_ms": values[max(0, int(len(values) * 0.99) - 1)] * 1000 if values else 0,
+            "errors": errors[step],
+        }
+    print(json.dumps(result))
+
+
+def export_ref(ref):
+    # git archive of the ref into a temp directory, so the comparison never touches the working tree
+    target = tempfile.mkdtemp(prefix="quiz-ref-")
+    archive = subprocess.run(["git", "-C", ROOT, "archive", ref], capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--compare", help="git ref to run alongside the working tree, e.g. HEAD")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--tree", default=ROOT)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    trees = [("working tree", ROOT)]
+    if args.compare:
+        trees.append((args.compare, export_ref(args.compare)))
+
+    print(f"{args.questions} questions; each student runs {' -> '.join(STEPS)} concurrently")
+    print(f"{'tree':<14} {'students':>8} {'seconds':>8} {'req/s':>7} {'errors':>7}  "
+          + " ".join(f"{step + ' p50/p99 ms':>22}" for step in STEPS))
+    for count in args.students:
+        for name, tree in trees:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", "--tree", tree,
+                 "--students", str(count), "--questions", str(args.questions)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            cells = " ".join(f"{r[step]['p50_ms']:>10.0f}/{r[step]['p99_ms']:<11.0f}" for step in STEPS)
+            print(f"{name:<14} {count:>8} {r['seconds']:>8.1f} {r['requests_per_s']:>7.0f} {r['errors']:>7}  {cells}")
+
+
+if __name__ == "__main__":
+    main()
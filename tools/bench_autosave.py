@@ -0,0 +1,145 @@
+# tools/bench_autosave.py
+# Compares a deadline rush where every student submits all their answers at once with the same exam taken
+# through autosave: answers are saved one at a time while the exam runs, and the final submissions carry none.
+# Reports request latencies and how long the submission rush takes; both modes must award the same scores.
+# Each mode is its own process against a fresh SQLite file:
+#   python tools/bench_autosave.py [--students 300] [--questions 40]
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)] * 1000 if values else 0
+
+
+def seed(students, question_count, started=True):
+    from sqlalchemy import insert, select
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, StudentQuiz, AssignedQuiz
+
+    Base.metadata.create_all(bind=engine)
+    now = "2025-01-01T00:00:00"
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    quiz = Quiz(title="Bench", total_marks=question_count, duration_minutes=60, created_by=teacher.id,
+                created_at=now, start_time=now, is_active=True, status=QuizStatus.ACTIVE, random_order=False)
+    db.add_all([subcategory, quiz])
+    db.flush()
+    question_ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), [
+        {"question_text": f"Q{i}", "question_type": "MCQ", "created_by": teacher.id, "created_at": now,
+         "is_active": True, "subcategory_id": subcategory.id} for i in range(question_count)
+    ]).scalars().all()
+    db.execute(insert(Option), [{"question_id": qid, "text": label, "is_correct": label == "a"}
+                                for qid in question_ids for label in "abcd"])
+    db.execute(insert(QuizQuestion), [{"quiz_id": quiz.id, "question_id": qid, "mark": 1} for qid in question_ids])
+    db.execute(insert(User), [{"name": f"S{i}", "email": f"s{i}@bench", "password": "x", "role": "student"}
+                              for i in range(students)])
+    student_ids = db.execute(select(User.id).where(User.role == "student").order_by(User.id)).scalars().all()
+    db.execute(insert(AssignedQuiz), [{"quiz_id": quiz.id, "student_id": sid} for sid in student_ids])
+    if started:
+        db.execute(insert(StudentQuiz), [{"quiz_id": quiz.id, "student_id": sid, "started_at": now, "total_score": 0}
+                                         for sid in student_ids])
+    quiz_id = quiz.id
+    db.commit()
+    db.close()
+    return quiz_id, student_ids, question_ids
+
+
+async def exam(app, mode, quiz_id, student_ids, question_ids):
+    import httpx
+    from services.autosave import answer_buffer
+
+    rng = random.Random(7)
+    answers = {sid: {qid: rng.choice("abcd") for qid in question_ids} for sid in student_ids}
+    transport = httpx.ASGITransport(app=app)
+    result = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        if mode == "autosave":
+            # Every student answers one question per round, all students at once
+            latencies = []
+
+            async def save(sid, qid):
+                started = time.perf_counter()
+                r = await client.post(f"/quiz/{quiz_id}/autosave/{sid}", json={"answers": {qid: answers[sid][qid]}})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for qid in question_ids:
+                await asyncio.gather(*(save(sid, qid) for sid in student_ids))
+            result.update(autosaves=len(latencies), autosave_seconds=time.perf_counter() - started,
+                          autosave_p50_ms=percentile(latencies, 0.5), autosave_p99_ms=percentile(latencies, 0.99))
+
+        latencies, scores = [], []
+
+        async def submit(sid):
+            payload = {} if mode == "autosave" else answers[sid]
+            started = time.perf_counter()
+            r = await client.post("/submit_quiz", json={"quiz_id": quiz_id, "student_id": sid, "answers": payload})
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            scores.append(r.json()["score"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(submit(sid) for sid in student_ids))
+        result.update(submit_seconds=time.perf_counter() - started, submit_p50_ms=percentile(latencies, 0.5),
+                      submit_p99_ms=percentile(latencies, 0.99), score_sum=round(sum(scores), 2))
+    answer_buffer.stop()
+    result["flushes"] = answer_buffer.flushes
+    return result
+
+
+def worker(args):
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    quiz_id, student_ids, question_ids = seed(args.students, args.questions)
+    from main import app
+    print(json.dumps(asyncio.run(exam(app, args.mode, quiz_id, student_ids, question_ids))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--mode")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.students} students x {args.questions} questions")
+    results = {}
+    for mode in ("deadline", "autosave"):
+        command = [sys.executable, os.path.abspath(__file__), "--worker", "--mode", mode,
+                   "--students", str(args.students), "--questions", str(args.questions)]
+        out = subprocess.run(command, capture_output=True, text=True)
+        if out.returncode:
+            sys.exit(out.stderr)
+        results[mode] = r = json.loads(out.stdout.strip().splitlines()[-1])
+        line = f"{mode:<9} submit rush {r['submit_seconds']:6.2f}s  p50 {r['submit_p50_ms']:7.1f}ms  p99 {r['submit_p99_ms']:7.1f}ms"
+        if "autosaves" in r:
+            line += (f"  | {r['autosaves']} autosaves over {r['autosave_seconds']:.1f}s, p50 {r['autosave_p50_ms']:.1f}ms"
+                     f" p99 {r['autosave_p99_ms']:.1f}ms, {r['flushes']} flushes")
+        print(line)
+    if results["deadline"]["score_sum"] != results["autosave"]["score_sum"]:
+        sys.exit(f"scores differ: {results['deadline']['score_sum']} vs {results['autosave']['score_sum']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# tools/bench_dashboard_queries.py
+# Checks that GET /list/{student_id} runs a fixed number of SQL statements however many quizzes are assigned.
+# Runs against a throwaway database in a temp directory and exits 1 if the count changes with the quiz count,
+# so it can run as a CI step (the repository has no test suite):
+#   python tools/bench_dashboard_queries.py [assigned quiz counts...]
+import os
+import sys
+import time
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import Base, engine, async_engine, async_read_engine, SessionLocal
+from models import User, Quiz, QuizStatus, AssignedQuiz, StudentQuiz
+from services.invalidation import QUIZ_CACHES
+from main import app
+
+Base.metadata.create_all(bind=engine)
+
+statements = []
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+# The student endpoints run on the async engines; their statements go through the wrapped sync engines
+for counted in {engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    event.listen(counted, "before_cursor_execute", count_statement)
+
+
+def seed_student(db, index, quiz_count):
+    # A third each of finished-and-attempted, open and upcoming quizzes, with a few classmates per quiz
+    student = User(name=f"S{index}", email=f"s{index}@bench", password="x", role="student")
+    classmates = [User(name=f"C{index}-{i}", email=f"c{index}-{i}@bench", password="x", role="student") for i in range(5)]
+    db.add_all([student] + classmates)
+    db.flush()
+    for i in range(quiz_count):
+        kind = i % 3
+        quiz = Quiz(title=f"Q{i}", total_marks=10, duration_minutes=30, created_at="2020-01-01T00:00:00",
+                    start_time="2099-01-01T00:00:00" if kind == 2 else "2020-01-01T00:00:00",
+                    quiz_end_time="2020-01-02T00:00:00" if kind == 0 else None,
+                    is_active=True, status=QuizStatus.ACTIVE)
+        db.add(quiz)
+        db.flush()
+        db.add(AssignedQuiz(quiz_id=quiz.id, student_id=student.id))
+        if kind == 0:
+            for n, user in enumerate([student] + classmates):
+                db.add(StudentQuiz(student_id=user.id, quiz_id=quiz.id, started_at="2020-01-01T00:00:00",
+                                   submitted_at="2020-01-01T00:10:00", total_score=n))
+    db.commit()
+    return student.id
+
+
+def measure(client, student_id):
+    statements.clear()
+    started = time.perf_counter()
+    response = client.get(f"/list/{student_id}")
+    elapsed = (time.perf_counter() - started) * 1000
+    response.raise_for_status()
+    return len(statements), elapsed
+
+
+def main(sizes):
+    db = SessionLocal()
+    client = TestClient(app)
+    print(f"{'assigned':>9} {'cold stmts':>11} {'warm stmts':>11} {'cold ms':>8} {'warm ms':>8}")
+    cold_counts, warm_counts = [], []
+    for index, size in enumerate(sizes):
+        student_id = seed_student(db, index, size)
+        for cache in QUIZ_CACHES:
+            cache.clear()
+        cold, cold_ms = measure(client, student_id)
+        warm, warm_ms = measure(client, student_id)
+        cold_counts.append(cold)
+        warm_counts.append(warm)
+        print(f"{size:>9} {cold:>11} {warm:>11} {cold_ms:>8.1f} {warm_ms:>8.1f}")
+    db.close()
+
+    if len(set(cold_counts)) != 1 or len(set(warm_counts)) != 1:
+        sys.exit(f"statement count grows with assigned quizzes: cold={cold_counts} warm={warm_counts}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [5, 50, 500])
@@ -0,0 +1,141 @@
+# tools/bench_db_config.py
+# Compares mixed read/write throughput of the database engine under different QUIZ_* settings.
+# Each configuration runs in its own process against a fresh SQLite file:
+#   python tools/bench_db_config.py [--threads 16] [--seconds 5] [--write-ratio 0.3]
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = {
+    "sqlite defaults": {"QUIZ_SQLITE_PRAGMAS": "0"},
+    "WAL, synchronous=FULL": {"QUIZ_SQLITE_SYNCHRONOUS": "FULL"},
+    "WAL, synchronous=NORMAL": {},
+    "WAL, NORMAL, read pool": {"QUIZ_READ_DATABASE_URL": "same"},
+    "WAL, NORMAL, pool=4": {"QUIZ_DB_POOL_SIZE": "4", "QUIZ_DB_MAX_OVERFLOW": "0"},
+}
+
+
+def worker(args):
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+
+    from sqlalchemy import select, insert, update
+    from sqlalchemy.exc import OperationalError
+    from database import Base, engine, SessionLocal, ReadSessionLocal
+    from models import User, Quiz, QuizStatus, AssignedQuiz, StudentQuiz, StudentAnswer, QuizScoreStats
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    students = [User(name=f"S{i}", email=f"s{i}@bench", password="x", role="student") for i in range(200)]
+    quizzes = [Quiz(title=f"Q{i}", total_marks=10, duration_minutes=30, created_at="2020-01-01T00:00:00",
+                    start_time="2020-01-01T00:00:00", is_active=True, status=QuizStatus.ACTIVE) for i in range(20)]
+    db.add_all(students + quizzes)
+    db.flush()
+    db.execute(insert(AssignedQuiz), [{"quiz_id": q.id, "student_id": s.id} for q in quizzes for s in students])
+    db.execute(insert(QuizScoreStats), [{"quiz_id": q.id, "attempts": 0, "score_sum": 0} for q in quizzes])
+    db.commit()
+    student_ids = [s.id for s in students]
+    quiz_ids = [q.id for q in quizzes]
+    db.close()
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def read_op(rng):
+        session = ReadSessionLocal()
+        try:
+            student_id = rng.choice(student_ids)
+            session.execute(
+                select(Quiz.id, Quiz.title, StudentQuiz.total_score)
+                .outerjoin(StudentQuiz, (StudentQuiz.quiz_id == Quiz.id) & (StudentQuiz.student_id == student_id))
+                .where(Quiz.id.in_(select(AssignedQuiz.quiz_id).where(AssignedQuiz.student_id == student_id)))
+            ).all()
+        finally:
+            session.close()
+
+    def write_op(rng):
+        # Shape of a submit: attempt row, a batch of answers and a stats bump in one transaction
+        session = SessionLocal()
+        try:
+            quiz_id = rng.choice(quiz_ids)
+            attempt = StudentQuiz(student_id=rng.choice(student_ids), quiz_id=quiz_id, started_at="2020-01-01T00:00:00",
+                                  submitted_at="2020-01-01T00:10:00", total_score=rng.randint(0, 10))
+            session.add(attempt)
+            session.flush()
+            session.execute(insert(StudentAnswer), [
+                {"student_quiz_id": attempt.id, "question_id": n, "given_answer": "a", "is_correct": True, "marks_awarded": 1}
+                for n in range(20)
+            ])
+            session.execute(update(QuizScoreStats).where(QuizScoreStats.quiz_id == quiz_id)
+                            .values(attempts=QuizScoreStats.attempts + 1))
+            session.commit()
+        finally:
+            session.close()
+
+    def run(seed):
+        rng = random.Random(seed)
+        local = {"reads": 0, "writes": 0, "errors": 0}
+        local_latencies = []
+        while time.perf_counter() < deadline:
+            is_write = rng.random() < args.write_ratio
+            started = time.perf_counter()
+            try:
+                (write_op if is_write else read_op)(rng)
+                local["writes" if is_write else "reads"] += 1
+                local_latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                local["errors"] += 1
+        with lock:
+            for key in counts:
+                counts[key] += local[key]
+            latencies.extend(local_latencies)
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0
+    print(json.dumps(dict(counts, ops_per_s=(counts["reads"] + counts["writes"]) / args.seconds, p99_ms=p99)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--worker", action="store_true")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.threads} threads, {args.seconds}s per run, {args.write_ratio:.0%} writes")
+    print(f"{'configuration':<26} {'ops/s':>8} {'reads':>7} {'writes':>7} {'errors':>7} {'p99 ms':>8}")
+    for name, overrides in CONFIGS.items():
+        env = {k: v for k, v in os.environ.items() if not k.startswith("QUIZ_")}
+        env.update(overrides)
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", "--threads", str(args.threads),
+             "--seconds", str(args.seconds), "--write-ratio", str(args.write_ratio)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        print(f"{name:<26} {r['ops_per_s']:>8.0f} {r['reads']:>7} {r['writes']:>7} {r['errors']:>7} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# tools/bench_events.py
+# How many idle quiz event streams one worker holds. Starts one uvicorn worker on a generated cohort, opens
+# GET /events streams in steps and reports the worker's resident memory per open stream, its CPU use while
+# the streams sit idle, and how long one toggle_quiz_active takes to reach every stream. The client runs in
+# this process over raw sockets, so it shares the machine's CPUs with the worker:
+#   python tools/bench_events.py [--connections 5000] [--step 1000]
+import os
+import sys
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from bench_autosave import seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def serve(args):
+    sys.path.insert(0, ROOT)
+    os.chdir(args.dir)
+    raise_fd_limit()
+    import uvicorn
+    from main import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", backlog=4096)
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Stream:
+    # One raw-socket EventSource: waits for "ready", then records when the awaited event arrives
+
+    def __init__(self, port, student_id):
+        self.port = port
+        self.student_id = student_id
+        self.ready = asyncio.Event()
+        self.received = {}
+
+    async def run(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET /events/{self.student_id} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        self.writer = writer
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b"event: "):
+                event = line[7:].strip().decode()
+                self.received[event] = time.perf_counter()
+                if event == "ready":
+                    self.ready.set()
+
+
+async def request(port, method, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    writer.close()
+    return int(status)
+
+
+async def measure(args, pid, quiz_id, student_ids):
+    streams, tasks = [], []
+    base = rss_kb(pid)
+    print(f"worker RSS with no streams: {base / 1024:.1f} MB")
+    print(f"{'streams':>8} {'RSS MB':>8} {'KB/stream':>10} {'open s':>7}")
+    while len(streams) < args.connections:
+        started = time.perf_counter()
+        batch = [Stream(args.port, sid) for sid in student_ids[len(streams):len(streams) + args.step]]
+        for i in range(0, len(batch), 200):
+            opening = batch[i:i + 200]
+            tasks += [asyncio.create_task(stream.run()) for stream in opening]
+            await asyncio.wait_for(asyncio.gather(*(stream.ready.wait() for stream in opening)), 60)
+        streams += batch
+        rss = rss_kb(pid)
+        print(f"{len(streams):>8} {rss / 1024:>8.1f} {(rss - base) / len(streams):>10.1f} "
+              f"{time.perf_counter() - started:>7.1f}")
+
+    before = cpu_seconds(pid)
+    await asyncio.sleep(args.idle)
+    print(f"worker CPU while {len(streams)} streams idle for {args.idle}s: "
+          f"{(cpu_seconds(pid) - before) / args.idle * 100:.1f}%")
+
+    sent = time.perf_counter()
+    if await request(args.port, "POST", f"/teacher/toggle_quiz_active/{quiz_id}") != 200:
+        raise SystemExit("toggle failed")
+    deadline = sent + 60
+    while time.perf_counter() < deadline and not all("quiz_deactivated" in s.received for s in streams):
+        await asyncio.sleep(0.01)
+    arrivals = sorted(s.received["quiz_deactivated"] - sent for s in streams if "quiz_deactivated" in s.received)
+    if len(arrivals) != len(streams):
+        raise SystemExit(f"only {len(arrivals)} of {len(streams)} streams got the event")
+    print(f"toggle_quiz_active reached all {len(streams)} streams: p50 {arrivals[len(arrivals) // 2] * 1000:.0f}ms, "
+          f"last {arrivals[-1] * 1000:.0f}ms")
+    for task in tasks:
+        task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--step", type=int, default=1000)
+    parser.add_argument("--idle", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--dir")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    limit = raise_fd_limit()
+    if args.connections + 100 > limit:
+        sys.exit(f"open file limit {limit} is too low for {args.connections} streams")
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    os.chdir(workdir)
+    quiz_id, student_ids, _ = seed(args.connections, 1, started=False)
+    env = {**os.environ, "QUIZ_EVENT_MAX_CONNECTIONS": str(args.connections)}
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", "--dir", workdir,
+                               "--port", str(args.port)], env=env)
+    try:
+        for _ in range(100):
+            try:
+                if asyncio.run(request(args.port, "GET", "/admin/events")) == 200:
+                    break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            sys.exit("worker did not come up")
+        asyncio.run(measure(args, server.pid, quiz_id, student_ids))
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    main()
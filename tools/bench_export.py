@@ -0,0 +1,149 @@
+# tools/bench_export.py
+# Streams GET /teacher/export/<format> for a generated question bank and reports time, size and peak memory growth.
+# Each run is its own process against a fresh SQLite file; --compare runs an earlier git ref the same way
+# (formats that ref does not have are skipped):
+#   python tools/bench_export.py [--questions 100000] [--formats aiken gift moodle csv] [--gzip] [--compare HEAD~1]
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(count):
+    from sqlalchemy import insert
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    db.add(subcategory)
+    db.flush()
+    for start in range(0, count, 10000):
+        rows = [{"question_text": f"Question {i}: which option is correct for item {i}?", "question_type": "MCQ",
+                 "created_by": teacher.id, "created_at": "2025-01-01T00:00:00", "is_active": True,
+                 "subcategory_id": subcategory.id} for i in range(start, min(count, start + 10000))]
+        ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), rows).scalars().all()
+        db.execute(insert(Option), [{"question_id": qid, "text": f"Option {label} for question {qid}",
+                                     "is_correct": label == "ABCD"[qid % 4]} for qid in ids for label in "ABCD"])
+    subcategory_id = subcategory.id
+    db.commit()
+    db.close()
+    return subcategory_id
+
+
+async def download(app, url):
+    # Drives the ASGI app directly and only counts body bytes; httpx's ASGI transport would buffer the
+    # whole response and hide whether the endpoint streams
+    path, _, query = url.partition("?")
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+             "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80)}
+    response = {"status": None, "bytes": 0}
+    requested, finished = asyncio.Event(), asyncio.Event()
+
+    async def receive():
+        # The empty request body once, then nothing until the response is complete; StreamingResponse keeps
+        # a receive() pending to notice client disconnects
+        if not requested.is_set():
+            requested.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["bytes"] += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    if response["status"] == 404:
+        return None
+    if response["status"] != 200:
+        raise RuntimeError(f"{url}: HTTP {response['status']}")
+    return response["bytes"]
+
+
+def worker(args):
+    # Seeding and exporting run in separate processes, so the export's peak is not hidden under the seed's
+    sys.path.insert(0, args.tree)
+    os.chdir(args.dir)
+    if args.seed:
+        print(json.dumps({"subcategory_id": seed(args.questions)}))
+        return
+    from main import app
+
+    url = f"/teacher/export/{args.format}?subcategory_id={args.subcategory_id}" + ("&gzip=true" if args.gzip else "")
+    # ru_maxrss is a high-water mark, so growth over the level before the export is the export's peak
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    size = asyncio.run(download(app, url))
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "bytes": size, "peak_growth_mb": (rss_after - rss_before) / 1024}))
+
+
+def export_ref(ref):
+    target = tempfile.mkdtemp(prefix="quiz-ref-")
+    archive = subprocess.run(["git", "-C", ROOT, "archive", ref], capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def run_json(command):
+    return json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--formats", nargs="+", default=["aiken", "gift", "moodle", "csv"])
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--compare", help="git ref to run alongside the working tree")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--tree", default=ROOT)
+    parser.add_argument("--format")
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--dir")
+    parser.add_argument("--subcategory-id", type=int)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.questions} questions with 4 options each{', gzip' if args.gzip else ''}")
+    print(f"{'tree':<14} {'format':<8} {'seconds':>8} {'MB out':>8} {'peak +MB':>9}")
+    trees = [("working tree", ROOT)]
+    if args.compare:
+        trees.append((args.compare, export_ref(args.compare)))
+    for name, tree in trees:
+        workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+        base = [sys.executable, os.path.abspath(__file__), "--worker", "--tree", tree, "--dir", workdir]
+        seeded = run_json(base + ["--seed", "--questions", str(args.questions)])
+        for fmt in args.formats:
+            r = run_json(base + ["--format", fmt, "--subcategory-id", str(seeded["subcategory_id"])]
+                         + (["--gzip"] if args.gzip else []))
+            if r["bytes"] is None:
+                continue
+            if not r["bytes"]:
+                sys.exit(f"{name} {fmt}: empty export")
+            print(f"{name:<14} {fmt:<8} {r['seconds']:>8.1f} {r['bytes'] / 2**20:>8.1f} {r['peak_growth_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# tools/bench_item_analysis.py
+# Seeds a quiz with N submitted attempts over K questions (answers drawn from a simple ability model), times
+# GET /teacher/item_analysis cold, cached and after one more submission, and checks the vectorised numbers
+# against a plain-Python computation of the same statistics:
+#   python tools/bench_item_analysis.py [--attempts 10000] [--questions 200]
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(attempts, question_count):
+    from sqlalchemy import insert
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, StudentQuiz, StudentAnswer, AssignedQuiz
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    now = "2025-01-01T00:00:00"
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    quiz = Quiz(title="Bench", total_marks=question_count, duration_minutes=60, created_by=teacher.id,
+                created_at=now, start_time=now, is_active=True, status=QuizStatus.ACTIVE, random_order=False)
+    db.add_all([subcategory, quiz])
+    db.flush()
+    question_ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), [
+        {"question_text": f"Q{i}", "question_type": "MCQ", "created_by": teacher.id, "created_at": now,
+         "is_active": True, "subcategory_id": subcategory.id} for i in range(question_count)
+    ]).scalars().all()
+    db.execute(insert(Option), [{"question_id": qid, "text": label, "is_correct": label == "a"}
+                                for qid in question_ids for label in "abcd"])
+    db.execute(insert(QuizQuestion), [{"quiz_id": quiz.id, "question_id": qid, "mark": 1} for qid in question_ids])
+    db.execute(insert(User), [{"name": f"S{i}", "email": f"s{i}@bench", "password": "x", "role": "student"}
+                              for i in range(attempts + 1)])
+    student_ids = [row[0] for row in db.execute(User.__table__.select().with_only_columns(User.id).where(User.role == "student"))]
+    attempt_ids = db.execute(insert(StudentQuiz).returning(StudentQuiz.id, sort_by_parameter_order=True), [
+        {"quiz_id": quiz.id, "student_id": sid, "started_at": now, "submitted_at": now, "total_score": 0}
+        for sid in student_ids[:attempts]
+    ]).scalars().all()
+    difficulty = [rng.uniform(-2, 2) for _ in question_ids]
+    for start in range(0, len(attempt_ids), 500):
+        rows = []
+        for attempt_id in attempt_ids[start:start + 500]:
+            ability = rng.gauss(0, 1)
+            for qid, b in zip(question_ids, difficulty):
+                if rng.random() < 0.03:
+                    continue  # left unanswered
+                correct = rng.random() < 1 / (1 + math.exp(b - 1.5 * ability))
+                rows.append({"student_quiz_id": attempt_id, "question_id": qid, "is_correct": correct,
+                             "marks_awarded": int(correct), "given_answer": "a" if correct else rng.choice("bcd")})
+        db.execute(insert(StudentAnswer), rows)
+    db.add(AssignedQuiz(quiz_id=quiz.id, student_id=student_ids[attempts]))
+    quiz_id, spare_student = quiz.id, student_ids[attempts]
+    db.commit()
+    db.close()
+    return quiz_id, question_ids, spare_student
+
+
+def reference(quiz_id, question_ids, items_to_check):
+    # Straight per-item loops over the answers table, for the first few questions
+    from database import SessionLocal
+    from models import StudentQuiz, StudentAnswer
+
+    db = SessionLocal()
+    attempts = [a for (a,) in db.query(StudentQuiz.id).filter(StudentQuiz.quiz_id == quiz_id, StudentQuiz.submitted_at != None)]
+    correct = {(a, q) for a, q in db.query(StudentAnswer.student_quiz_id, StudentAnswer.question_id).filter(StudentAnswer.is_correct == True)}
+    db.close()
+    k, n = len(question_ids), len(attempts)
+    scores = [[1.0 if (a, q) in correct else 0.0 for q in question_ids] for a in attempts]
+    totals = [sum(row) for row in scores]
+    ranked = sorted(range(n), key=lambda i: totals[i])
+    group = max(1, round(0.27 * n))
+    results = {}
+    for j in range(items_to_check):
+        item = [row[j] for row in scores]
+        rest = [t - x for t, x in zip(totals, item)]
+        p = sum(item) / n
+        mean_rest = sum(rest) / n
+        cov = sum((x - p) * (r - mean_rest) for x, r in zip(item, rest)) / n
+        sd_item = math.sqrt(sum((x - p) ** 2 for x in item) / n)
+        sd_rest = math.sqrt(sum((r - mean_rest) ** 2 for r in rest) / n)
+        upper = sum(item[i] for i in ranked[-group:]) / group
+        lower = sum(item[i] for i in ranked[:group]) / group
+        results[question_ids[j]] = (p, upper - lower, cov / (sd_item * sd_rest))
+    variances = []
+    for j in range(k):
+        column = [row[j] for row in scores]
+        mean = sum(column) / n
+        variances.append(sum((x - mean) ** 2 for x in column) / (n - 1))
+    mean_total = sum(totals) / n
+    total_variance = sum((t - mean_total) ** 2 for t in totals) / (n - 1)
+    return results, k / (k - 1) * (1 - sum(variances) / total_variance)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    started = time.perf_counter()
+    quiz_id, question_ids, spare_student = seed(args.attempts, args.questions)
+    print(f"{args.attempts} attempts x {args.questions} questions seeded in {time.perf_counter() - started:.1f} s")
+
+    from fastapi.testclient import TestClient
+    from database import ReadSessionLocal
+    from services.item_analysis import load_responses, item_statistics
+    from main import app
+
+    db = ReadSessionLocal()
+    started = time.perf_counter()
+    matrix = load_responses(db, quiz_id).matrix
+    loaded = time.perf_counter()
+    item_statistics(matrix)
+    computed = time.perf_counter()
+    db.close()
+    print(f"matrix and option counts load {1000 * (loaded - started):.0f} ms, statistics {1000 * (computed - loaded):.0f} ms")
+
+    client = TestClient(app)
+
+    def timed_get():
+        started = time.perf_counter()
+        response = client.get(f"/teacher/item_analysis/{quiz_id}")
+        response.raise_for_status()
+        return response.json(), 1000 * (time.perf_counter() - started)
+
+    analysis, cold = timed_get()
+    _, cached = timed_get()
+    print(f"endpoint cold {cold:.0f} ms, cached {cached:.1f} ms")
+
+    attempt = client.post(f"/start_quiz/{quiz_id}/{spare_student}")
+    attempt.raise_for_status()
+    client.post("/submit_quiz", json={"quiz_id": quiz_id, "student_id": spare_student,
+                                      "answers": {str(q): "a" for q in question_ids}}).raise_for_status()
+    refreshed, after_submit = timed_get()
+    print(f"endpoint after a new submission {after_submit:.0f} ms")
+    if refreshed["attempts"] != analysis["attempts"] + 1:
+        sys.exit(f"cache not refreshed: {analysis['attempts']} -> {refreshed['attempts']} attempts")
+
+    expected, alpha = reference(quiz_id, question_ids, items_to_check=5)
+    items = {item["question_id"]: item for item in refreshed["items"]}
+    for qid, (p, d, r) in expected.items():
+        got = items[qid]
+        for name, want in (("difficulty", p), ("discrimination", d), ("point_biserial", r)):
+            if abs(got[name] - want) > 1e-3:
+                sys.exit(f"question {qid} {name}: {got[name]} != {want:.4f}")
+    if abs(refreshed["cronbach_alpha"] - alpha) > 1e-3:
+        sys.exit(f"cronbach_alpha {refreshed['cronbach_alpha']} != {alpha:.4f}")
+    sample = items[question_ids[0]]
+    from sqlalchemy import func
+    from database import SessionLocal
+    from models import StudentAnswer
+    db = SessionLocal()
+    given = dict(db.query(StudentAnswer.given_answer, func.count()).filter(StudentAnswer.question_id == question_ids[0])
+                 .group_by(StudentAnswer.given_answer).all())
+    db.close()
+    if {o["text"]: o["chosen"] for o in sample["options"]} != given or sample["answered"] != sum(given.values()):
+        sys.exit(f"option counts {sample['options']} != {given}")
+    print(f"matches the reference; alpha {refreshed['cronbach_alpha']}, first item "
+          + json.dumps({k: sample[k] for k in ("difficulty", "discrimination", "point_biserial")}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# tools/bench_login_storm.py
+# Fires N concurrent student logins and, alongside them, a steady trickle of token-authenticated dashboard
+# requests, to show that bcrypt checks stay off the event loop and that logins past LOGIN_MAX_PENDING are shed.
+# Each run is its own process against a fresh SQLite file:
+#   python tools/bench_login_storm.py [--students 1000] [--rounds 10] [--max-pending 32 1000000]
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)] * 1000 if values else 0
+
+
+async def storm(app, students):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        token = (await client.post("/login", json={"email": "s0@bench", "password": "secret-0"})).json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        statuses, login_latencies, dashboard_latencies = {}, [], []
+        done = asyncio.Event()
+
+        async def login(i):
+            started = time.perf_counter()
+            response = await client.post("/login", json={"email": f"s{i}@bench", "password": f"secret-{i}"})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                login_latencies.append(time.perf_counter() - started)
+
+        async def dashboard():
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get("/list", headers=headers)).raise_for_status()
+                dashboard_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        watcher = asyncio.create_task(dashboard())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(students)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await watcher
+    return {"seconds": elapsed, "statuses": statuses,
+            "login_p50_ms": percentile(login_latencies, 0.5), "login_p99_ms": percentile(login_latencies, 0.99),
+            "dashboard_p50_ms": percentile(dashboard_latencies, 0.5),
+            "dashboard_p99_ms": percentile(dashboard_latencies, 0.99)}
+
+
+def worker(args):
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    from sqlalchemy import insert
+    from database import Base, engine, SessionLocal
+    from models import User
+    from services.passwords import hash_passwords
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    hashes = hash_passwords([f"secret-{i}" for i in range(args.students)])
+    db.execute(insert(User), [{"name": f"S{i}", "email": f"s{i}@bench", "password": h, "role": "student"}
+                              for i, h in enumerate(hashes)])
+    db.commit()
+    db.close()
+
+    from main import app
+    print(json.dumps(asyncio.run(storm(app, args.students))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost factor")
+    parser.add_argument("--max-pending", type=int, nargs="+", default=[32, 1000000])
+    parser.add_argument("--worker", action="store_true")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.students} concurrent logins, bcrypt cost {args.rounds}, {os.cpu_count()} cores")
+    print(f"{'max pending':>12} {'seconds':>8} {'200':>6} {'503':>6} {'login p50/p99 ms':>18} {'dashboard p50/p99 ms':>22}")
+    for max_pending in args.max_pending:
+        env = dict(os.environ, QUIZ_BCRYPT_ROUNDS=str(args.rounds), QUIZ_LOGIN_MAX_PENDING=str(max_pending))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--students", str(args.students)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        statuses = {int(k): v for k, v in r["statuses"].items()}
+        print(f"{max_pending:>12} {r['seconds']:>8.1f} {statuses.get(200, 0):>6} {statuses.get(503, 0):>6} "
+              f"{r['login_p50_ms']:>8.0f}/{r['login_p99_ms']:<9.0f} {r['dashboard_p50_ms']:>10.0f}/{r['dashboard_p99_ms']:<11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# tools/bench_results_export.py
+# Streams GET /teacher/results/export for a generated cohort and reports time, size and peak memory growth,
+# next to the JSON quiz_report for the same quiz. Each run is its own process against a fresh SQLite file.
+# Peak growth includes SQLite's page cache and the pages it maps; QUIZ_SQLITE_MMAP_SIZE=0 leaves just the export's own:
+#   python tools/bench_results_export.py [--students 20000] [--questions 50] [--quizzes 2]
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import tempfile
+
+from bench_export import download, run_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(students, question_count, quiz_count):
+    from sqlalchemy import insert, select
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, StudentQuiz, StudentAnswer
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    now = "2025-01-01T00:00:00"
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    db.add(subcategory)
+    db.flush()
+    db.execute(insert(User), [{"name": f"Student {i}", "email": f"s{i}@bench", "password": "x", "role": "student",
+                               "batch": "2025", "semester": "S1"} for i in range(students)])
+    student_ids = db.execute(select(User.id).where(User.role == "student").order_by(User.id)).scalars().all()
+    quiz_ids = []
+    for n in range(quiz_count):
+        quiz = Quiz(title=f"Bench {n}", total_marks=question_count, duration_minutes=60, created_by=teacher.id,
+                    created_at=now, start_time=now, is_active=True, status=QuizStatus.ACTIVE, random_order=False)
+        db.add(quiz)
+        db.flush()
+        quiz_ids.append(quiz.id)
+        question_ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), [
+            {"question_text": f"Q{n}.{i}", "question_type": "MCQ", "created_by": teacher.id, "created_at": now,
+             "is_active": True, "subcategory_id": subcategory.id} for i in range(question_count)
+        ]).scalars().all()
+        db.execute(insert(Option), [{"question_id": qid, "text": label, "is_correct": label == "a"}
+                                    for qid in question_ids for label in "abcd"])
+        db.execute(insert(QuizQuestion), [{"quiz_id": quiz.id, "question_id": qid, "mark": 1} for qid in question_ids])
+        attempt_ids = db.execute(insert(StudentQuiz).returning(StudentQuiz.id, sort_by_parameter_order=True), [
+            {"quiz_id": quiz.id, "student_id": sid, "started_at": now, "submitted_at": now,
+             "total_score": rng.randint(0, question_count)} for sid in student_ids
+        ]).scalars().all()
+        for start in range(0, len(attempt_ids), 500):
+            rows = []
+            for attempt_id in attempt_ids[start:start + 500]:
+                for qid in question_ids:
+                    given = rng.choice("abcd")
+                    rows.append({"student_quiz_id": attempt_id, "question_id": qid, "given_answer": given,
+                                 "is_correct": given == "a", "marks_awarded": int(given == "a")})
+            db.execute(insert(StudentAnswer), rows)
+    db.commit()
+    db.close()
+    return quiz_ids
+
+
+def worker(args):
+    # Seeding and exporting run in separate processes, so the export's peak is not hidden under the seed's
+    sys.path.insert(0, ROOT)
+    os.chdir(args.dir)
+    if args.seed:
+        print(json.dumps({"quiz_ids": seed(args.students, args.questions, args.quizzes)}))
+        return
+    from main import app
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    size = asyncio.run(download(app, args.url))
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "bytes": size, "peak_growth_mb": (rss_after - rss_before) / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--quizzes", type=int, default=2)
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--dir")
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.students} students x {args.quizzes} quizzes x {args.questions} questions")
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    base = [sys.executable, os.path.abspath(__file__), "--worker", "--dir", workdir]
+    quiz_ids = run_json(base + ["--seed", "--students", str(args.students), "--questions", str(args.questions),
+                                "--quizzes", str(args.quizzes)])["quiz_ids"]
+    one = f"quiz_id={quiz_ids[0]}"
+    every = "&".join(f"quiz_id={q}" for q in quiz_ids)
+    runs = [
+        ("quiz_report json, 1 quiz", f"/teacher/quiz_report/{quiz_ids[0]}"),
+        ("csv, 1 quiz", f"/teacher/results/export?{one}"),
+        ("csv + answers, all", f"/teacher/results/export?{every}&answers=true"),
+        ("csv + answers, batch", "/teacher/results/export?batch=2025&answers=true"),
+        ("xlsx, 1 quiz", f"/teacher/results/export?{one}&format=xlsx"),
+        ("xlsx + answers, all", f"/teacher/results/export?{every}&format=xlsx&answers=true"),
+    ]
+    print(f"{'export':<26} {'seconds':>8} {'MB out':>8} {'peak +MB':>9}")
+    for name, url in runs:
+        r = run_json(base + ["--url", url])
+        if not r["bytes"]:
+            sys.exit(f"{name}: empty export")
+        print(f"{name:<26} {r['seconds']:>8.1f} {r['bytes'] / 2**20:>8.1f} {r['peak_growth_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# tools/bench_search.py
+# Times GET /teacher/questions/search against a generated bank, next to the same queries answered with a
+# LIKE scan over question text, and checks that both find the planted questions:
+#   python tools/bench_search.py [--questions 100000] [--repeat 50]
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOPICS = ["photosynthesis", "mitochondria", "algebra", "geometry", "thermodynamics", "electrolysis", "grammar",
+          "poetry", "migration", "volcano", "probability", "calculus", "friction", "magnetism", "enzymes", "tectonics"]
+WORDS = ["which", "statement", "about", "best", "describes", "the", "process", "of", "following", "correct",
+         "value", "when", "given", "explain", "role", "in", "system", "energy", "rate", "change"]
+
+QUERIES = [
+    ("common word", {"q": "energy"}),
+    ("two words", {"q": "photosynthesis energy"}),
+    ("prefix", {"q": "thermo"}),
+    ("option text", {"q": "zeolite"}),
+    ("rare word", {"q": "quasicrystal"}),
+    ("with filters", {"q": "algebra rate", "question_type": "MCQ", "subcategory_id": 2}),
+]
+
+
+def seed(count):
+    from sqlalchemy import insert
+    from database import Base, engine, SessionLocal
+    from models import User, Category, Subcategory, Question, Option
+    from services.search import index_questions
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(1)
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategories = [Subcategory(name=f"Bench {n}", category_id=category.id) for n in range(4)]
+    db.add_all(subcategories)
+    db.flush()
+    for start in range(0, count, 5000):
+        rows = []
+        for i in range(start, min(count, start + 5000)):
+            words = rng.sample(WORDS, 8) + [rng.choice(TOPICS)]
+            if i % 20000 == 7:
+                words.append("quasicrystal")
+            rows.append({"question_text": " ".join(words) + f" (item {i})?", "question_type": rng.choice(["MCQ", "MCQ", "MULTI_SELECT"]),
+                         "created_by": teacher.id, "created_at": "2025-01-01T00:00:00", "is_active": True,
+                         "subcategory_id": subcategories[i % 4].id, "feedback": " ".join(rng.sample(WORDS, 5))})
+        ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), rows).scalars().all()
+        db.execute(insert(Option), [{"question_id": qid, "is_correct": n == 0,
+                                     "text": "zeolite" if qid % 5000 == 11 and n == 1 else f"{rng.choice(TOPICS)} {rng.choice(WORDS)}"}
+                                    for qid in ids for n in range(4)])
+        index_questions(db, ids)
+    db.commit()
+    db.close()
+
+
+def like_search(db, params, limit=20):
+    from sqlalchemy import select
+    from models import Question
+
+    stmt = select(Question.id).order_by(Question.id).limit(limit)
+    for term in params["q"].split():
+        stmt = stmt.where(Question.question_text.ilike(f"%{term}%"))
+    if "question_type" in params:
+        stmt = stmt.where(Question.question_type == params["question_type"])
+    if "subcategory_id" in params:
+        stmt = stmt.where(Question.subcategory_id == params["subcategory_id"])
+    return db.execute(stmt).scalars().all()
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return result, times[len(times) // 2] * 1000, times[max(0, int(len(times) * 0.99) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    started = time.perf_counter()
+    seed(args.questions)
+    print(f"{args.questions} questions seeded and indexed in {time.perf_counter() - started:.1f} s")
+
+    from fastapi.testclient import TestClient
+    from database import ReadSessionLocal
+    from main import app
+
+    client = TestClient(app)
+    db = ReadSessionLocal()
+    print(f"{'query':<14} {'hits':>5} {'fts p50/p99 ms':>16} {'like p50/p99 ms':>17}")
+    for name, params in QUERIES:
+        def search():
+            response = client.get("/teacher/questions/search", params=params)
+            response.raise_for_status()
+            return response.json()["items"]
+        items, p50, p99 = timed(search, args.repeat)
+        _, like_p50, like_p99 = timed(lambda: like_search(db, params), max(3, args.repeat // 10))
+        if not items:
+            sys.exit(f"{name}: no results for {params}")
+        print(f"{name:<14} {len(items):>5} {p50:>7.1f}/{p99:<8.1f} {like_p50:>8.1f}/{like_p99:<8.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
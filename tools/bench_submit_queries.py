@@ -0,0 +1,104 @@
+# tools/bench_submit_queries.py
+# Counts SQL statements and time per /submit_quiz for growing quiz sizes.
+# Runs against a throwaway database in a temp directory:
+#   python tools/bench_submit_queries.py [question counts...]
+import os
+import sys
+import json
+import time
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import Base, engine, async_engine, async_read_engine, SessionLocal
+from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, AssignedQuiz
+from main import app
+
+Base.metadata.create_all(bind=engine)
+
+statements = []
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+# The student endpoints run on the async engines; their statements go through the wrapped sync engines
+for counted in {engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    event.listen(counted, "before_cursor_execute", count_statement)
+
+
+def seed_quiz(db, teacher_id, subcategory_id, question_count):
+    now = "2020-01-01T00:00:00"
+    quiz = Quiz(title=f"bench-{question_count}", total_marks=question_count, duration_minutes=60,
+                created_by=teacher_id, created_at=now, start_time=now, is_active=True,
+                status=QuizStatus.ACTIVE, random_order=True)
+    db.add(quiz)
+    db.flush()
+    answers = {}
+    kinds = ["MCQ", "MULTI_SELECT", "FILL_BLANK", "TRUE_FALSE"]
+    for i in range(question_count):
+        kind = kinds[i % len(kinds)]
+        q = Question(question_text=f"Q{i}", question_type=kind, subcategory_id=subcategory_id,
+                     created_by=teacher_id, created_at=now, is_active=True)
+        if kind == "FILL_BLANK":
+            q.correct_answer = json.dumps(["answer", "Reply"])
+        elif kind == "TRUE_FALSE":
+            q.correct_answer = "True"
+        db.add(q)
+        db.flush()
+        if kind == "MCQ":
+            db.add_all([Option(text=t, is_correct=(t == "a"), question_id=q.id) for t in "abcd"])
+            answers[q.id] = "a"
+        elif kind == "MULTI_SELECT":
+            db.add_all([Option(text=t, is_correct=(t in "ab"), question_id=q.id) for t in "abcd"])
+            answers[q.id] = json.dumps(["b", "a"])
+        elif kind == "FILL_BLANK":
+            answers[q.id] = " reply "
+        else:
+            answers[q.id] = "true"
+        db.add(QuizQuestion(quiz_id=quiz.id, question_id=q.id, mark=1))
+    db.commit()
+    return quiz.id, answers
+
+
+def main(sizes):
+    db = SessionLocal()
+    teacher = User(name="Teacher", email="teacher@bench", password="x", role="teacher")
+    category = Category(name="Bench")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Bench", category_id=category.id)
+    db.add(subcategory)
+    db.commit()
+
+    client = TestClient(app)
+    print(f"{'questions':>10} {'statements':>11} {'submit ms':>10} {'score':>7}")
+    counts = []
+    for size in sizes:
+        quiz_id, answers = seed_quiz(db, teacher.id, subcategory.id, size)
+        student = User(name=f"S{size}", email=f"s{size}@bench", password="x", role="student")
+        db.add(student)
+        db.flush()
+        db.add(AssignedQuiz(quiz_id=quiz_id, student_id=student.id))
+        db.commit()
+        client.post(f"/start_quiz/{quiz_id}/{student.id}")
+
+        statements.clear()
+        started = time.perf_counter()
+        response = client.post("/submit_quiz", json={"quiz_id": quiz_id, "student_id": student.id, "answers": answers})
+        elapsed = (time.perf_counter() - started) * 1000
+        response.raise_for_status()
+        counts.append(len(statements))
+        print(f"{size:>10} {len(statements):>11} {elapsed:>10.1f} {response.json()['score']:>7}")
+    db.close()
+
+    if len(set(counts)) != 1:
+        sys.exit(f"statement count grows with quiz size: {counts}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [5, 20, 60, 200])
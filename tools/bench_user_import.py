@@ -0,0 +1,81 @@
+# tools/bench_user_import.py
+# Times POST /teacher/bulk_upload_users on a generated CSV with 1 and with one-per-core hashing workers.
+# Each run is its own process against a fresh SQLite file:
+#   python tools/bench_user_import.py [--rows 10000] [--rounds 12] [--workers 1 4 8]
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_csv(path, rows):
+    # One row in 100 repeats an earlier email, so the report has errors to carry
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("name,email,password,role,college,batch,semester,course\n")
+        for i in range(rows):
+            n = i - 1 if i % 100 == 99 else i
+            f.write(f"Student {i},student{n}@bench,secret-{i},student,College,2025,{i % 8 + 1},BSc\n")
+
+
+def worker(args):
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    from fastapi import UploadFile
+    from database import Base, engine, SessionLocal
+    from models import User
+    from routers.teacher import bulk_upload_users
+    from services.passwords import verify_password, shutdown_hash_pool
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    with open(args.file, "rb") as f:
+        started = time.perf_counter()
+        result = bulk_upload_users(file=UploadFile(f, filename="users.csv"), background=False, db=db)
+        elapsed = time.perf_counter() - started
+    db.close()
+    shutdown_hash_pool()
+
+    db = SessionLocal()
+    stored = db.query(User).count()
+    sample = db.query(User).filter(User.email == "student0@bench").one()
+    db.close()
+    print(json.dumps({"seconds": elapsed, "created": result["created"], "failed": result["failed"], "stored": stored,
+                      "verified": verify_password("secret-0", sample.password)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--file")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    path = os.path.join(tempfile.mkdtemp(prefix="quiz-users-"), "users.csv")
+    write_csv(path, args.rows)
+    print(f"{args.rows} rows, bcrypt cost {args.rounds}, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'seconds':>9} {'rows/s':>8} {'created':>8} {'failed':>7}")
+    for workers in args.workers:
+        env = dict(os.environ, QUIZ_PASSWORD_HASH_WORKERS=str(workers), QUIZ_BCRYPT_ROUNDS=str(args.rounds))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--file", path],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        if r["stored"] != r["created"] or not r["verified"]:
+            sys.exit(f"{workers} workers: stored {r['stored']} users for {r['created']} created, verified={r['verified']}")
+        print(f"{workers:>8} {r['seconds']:>9.1f} {args.rows / r['seconds']:>8.0f} {r['created']:>8} {r['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# tools/bench_write_queue.py
+# Every student starts the quiz at once and later submits at once, with each request committing on its own
+# and then with the writes going through the group-commit queue (QUIZ_WRITE_QUEUE). Reports throughput and
+# p50/p99 latency for both rushes; the two runs must award the same scores.
+# Each run is its own process against a fresh SQLite file:
+#   python tools/bench_write_queue.py [--students 500] [--questions 30]
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+from bench_autosave import seed, percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def rush(client, student_ids, request):
+    latencies = []
+
+    async def one(sid):
+        started = time.perf_counter()
+        r = await request(sid)
+        r.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        return r.json()
+
+    started = time.perf_counter()
+    bodies = await asyncio.gather(*(one(sid) for sid in student_ids))
+    elapsed = time.perf_counter() - started
+    return bodies, {"seconds": elapsed, "per_second": len(student_ids) / elapsed,
+                    "p50_ms": percentile(latencies, 0.5), "p99_ms": percentile(latencies, 0.99)}
+
+
+async def exam(app, quiz_id, student_ids, question_ids):
+    import httpx
+    from services.write_queue import write_queue
+
+    rng = random.Random(7)
+    answers = {sid: {qid: rng.choice("abcd") for qid in question_ids} for sid in student_ids}
+    transport = httpx.ASGITransport(app=app)
+    result = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        bodies, result["start"] = await rush(client, student_ids,
+                                             lambda sid: client.post(f"/start_quiz/{quiz_id}/{sid}"))
+        if any(body["message"] != "Quiz started" for body in bodies):
+            raise SystemExit("not every start created an attempt")
+        bodies, result["submit"] = await rush(client, student_ids, lambda sid: client.post(
+            "/submit_quiz", json={"quiz_id": quiz_id, "student_id": sid, "answers": answers[sid]}))
+        result["score_sum"] = round(sum(body["score"] for body in bodies), 2)
+    write_queue.stop()
+    result["queue"] = write_queue.stats()
+    return result
+
+
+def worker(args):
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-bench-"))
+    quiz_id, student_ids, question_ids = seed(args.students, args.questions, started=False)
+    from main import app
+    print(json.dumps(asyncio.run(exam(app, quiz_id, student_ids, question_ids))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--worker", action="store_true")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"{args.students} students x {args.questions} questions")
+    results = {}
+    for name, queued in (("per-request", "0"), ("write queue", "1")):
+        command = [sys.executable, os.path.abspath(__file__), "--worker",
+                   "--students", str(args.students), "--questions", str(args.questions)]
+        out = subprocess.run(command, capture_output=True, text=True, env={**os.environ, "QUIZ_WRITE_QUEUE": queued})
+        if out.returncode:
+            sys.exit(out.stderr)
+        results[name] = r = json.loads(out.stdout.strip().splitlines()[-1])
+        for phase in ("start", "submit"):
+            p = r[phase]
+            print(f"{name:<12} {phase:<7} {p['per_second']:7.0f}/s  p50 {p['p50_ms']:7.1f}ms  p99 {p['p99_ms']:7.1f}ms")
+        if r["queue"]["batches"]:
+            print(f"{'':<12} {r['queue']['batches']} batches, average {r['queue']['average_batch']} writes,"
+                  f" largest {r['queue']['largest_batch']}")
+    sums = {name: r["score_sum"] for name, r in results.items()}
+    if len(set(sums.values())) != 1:
+        sys.exit(f"scores differ: {sums}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# tools/check_query_plans.py
+# Drives the hot endpoints against a seeded throwaway SQLite database, records every statement they run and
+# fails if EXPLAIN QUERY PLAN shows a full table scan for any of them. Exits 1 on a scan, so it can run as a
+# CI step (the repository has no test suite); run it after adding a query or changing an index:
+#   python tools/check_query_plans.py [-v]
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="quiz-plans-"))
+
+from sqlalchemy import event, insert
+from fastapi.testclient import TestClient
+from database import Base, engine, async_engine, async_read_engine, read_engine, SessionLocal
+from migrations import run_migrations
+from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, AssignedQuiz
+from services.invalidation import QUIZ_CACHES
+from services.autosave import answer_buffer
+from main import app
+
+# Tables (or aliases) that may be read in full by a hot query, mapped to the reason
+ALLOWED_SCANS = {}
+
+# "SCAN <table or alias>", with or without a covering index; subqueries and constant rows are not tables
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)")
+
+statements = {}
+
+
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+        if executemany:
+            parameters = parameters[0]
+        statements.setdefault(statement, parameters)
+
+
+for watched in {engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    event.listen(watched, "before_cursor_execute", record_statement)
+
+
+def seed(db, student_count=50, question_count=40):
+    now = "2020-01-01T00:00:00"
+    teacher = User(name="Teacher", email="teacher@plans", password="pw", role="teacher")
+    category = Category(name="Plans")
+    db.add_all([teacher, category])
+    db.flush()
+    subcategory = Subcategory(name="Plans", category_id=category.id)
+    db.add(subcategory)
+    db.flush()
+    quiz_ids = []
+    for n in range(3):
+        quiz = Quiz(title=f"Q{n}", total_marks=question_count, duration_minutes=60, created_by=teacher.id,
+                    created_at=now, start_time=now, is_active=True, status=QuizStatus.ACTIVE, random_order=n == 0)
+        db.add(quiz)
+        db.flush()
+        quiz_ids.append(quiz.id)
+    question_ids = []
+    for i in range(question_count):
+        q = Question(question_text=f"Q{i}", question_type="MCQ", subcategory_id=subcategory.id,
+                     created_by=teacher.id, created_at=now, is_active=True)
+        db.add(q)
+        db.flush()
+        db.add_all([Option(text=t, is_correct=(t == "a"), question_id=q.id) for t in "abcd"])
+        question_ids.append(q.id)
+    db.execute(insert(QuizQuestion), [{"quiz_id": quiz_id, "question_id": qid, "mark": 1}
+                                      for quiz_id in quiz_ids[1:] for qid in question_ids])
+    db.execute(insert(User), [{"name": f"S{i}", "email": f"s{i}@plans", "password": "pw", "role": "student", "semester": "1"}
+                              for i in range(student_count)])
+    student_ids = [u.id for u in db.query(User.id).filter(User.role == "student")]
+    db.execute(insert(AssignedQuiz), [{"quiz_id": quiz_id, "student_id": s} for quiz_id in quiz_ids[1:] for s in student_ids])
+    db.commit()
+    return teacher.id, quiz_ids, question_ids, student_ids
+
+
+def exercise(client, quiz_ids, question_ids, student_ids):
+    def ok(response):
+        assert response.status_code < 300, (response.request.url, response.status_code, response.text)
+        return response
+
+    quiz_id, empty_quiz_id = quiz_ids[1], quiz_ids[0]
+    answers = {qid: "a" for qid in question_ids}
+    ok(client.post("/teacher/assign_questions", json={"quiz_id": empty_quiz_id, "question_ids": question_ids[:10]}))
+    ok(client.post(f"/teacher/assign_students/{empty_quiz_id}", json={"student_ids": student_ids[:10]}))
+    for student_id in student_ids[:5]:
+        for cache in QUIZ_CACHES:
+            cache.clear()
+        ok(client.get(f"/list/{student_id}"))
+        ok(client.post(f"/start_quiz/{quiz_id}/{student_id}"))
+        ok(client.get(f"/quiz/{quiz_id}/questions/{student_id}"))
+        ok(client.post(f"/quiz/{quiz_id}/autosave/{student_id}", json={"answers": {question_ids[0]: "b"}}))
+        answer_buffer.flush()
+        ok(client.post("/submit_quiz", json={"quiz_id": quiz_id, "student_id": student_id, "answers": answers}))
+        ok(client.get(f"/quiz/{quiz_id}/summary/{student_id}"))
+        ok(client.get(f"/quiz/{quiz_id}/leaderboard", params={"student_id": student_id}))
+        ok(client.get(f"/list/{student_id}"))
+        ok(client.post(f"/start_quiz/{empty_quiz_id}/{student_id}"))
+        ok(client.get(f"/quiz/{empty_quiz_id}/questions/{student_id}"))
+    ok(client.post("/login", json={"email": "s1@plans", "password": "pw"}))
+    ok(client.get(f"/teacher/quiz_report/{quiz_id}"))
+    ok(client.get(f"/teacher/item_analysis/{quiz_id}"))
+    ok(client.get("/teacher/results/export", params={"quiz_id": quiz_id, "answers": True}))
+    ok(client.get("/teacher/results/export", params={"semester": 1, "format": "xlsx"}))
+    # Teacher listings: a first page and the page after it, with and without filters
+    for path, params in [("/teacher/quizzes", {}), ("/teacher/quizzes", {"created_by": 1}),
+                         ("/teacher/questions", {}), ("/teacher/questions", {"subcategory_id": 1}),
+                         ("/teacher/questions", {"category_id": 1}), ("/teacher/students", {"semester": 1}),
+                         ("/teacher/users", {}), ("/teacher/users", {"role": "student"})]:
+        page = ok(client.get(path, params={**params, "limit": 2})).json()
+        if page["next_cursor"]:
+            ok(client.get(path, params={**params, "limit": 2, "cursor": page["next_cursor"]}))
+
+
+def full_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters or ())).all()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = FULL_SCAN.match(detail)
+        if match and match.group(1) not in ALLOWED_SCANS:
+            scans.append(detail)
+    return plan, scans
+
+
+def main():
+    verbose = "-v" in sys.argv[1:]
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    db = SessionLocal()
+    _, quiz_ids, question_ids, student_ids = seed(db)
+    db.close()
+
+    # No lifespan, so the scheduler thread doesn't add statements of its own
+    statements.clear()
+    exercise(TestClient(app), quiz_ids, question_ids, student_ids)
+
+    failures = []
+    with engine.connect() as conn:
+        for statement, parameters in statements.items():
+            plan, scans = full_scans(conn, statement, parameters)
+            if verbose:
+                print(statement)
+                for row in plan:
+                    print(f"    {row[-1]}")
+            if scans:
+                failures.append((statement, scans))
+
+    print(f"{len(statements)} distinct statements checked, {len(failures)} with full table scans")
+    for statement, scans in failures:
+        print()
+        print(" ".join(statement.split()))
+        for detail in scans:
+            print(f"    {detail}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
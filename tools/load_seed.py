@@ -0,0 +1,131 @@
+# tools/load_seed.py
+# Synthetic exam cohort for tools/load_test.py: teachers, students spread over batches and semesters,
+# categories and subcategories, a question bank of every question type, quizzes drawn from it that are open
+# now, and every student assigned to each of them. The same arguments and --seed give the same data.
+# Builds the database QUIZ_DATABASE_URL points at (./quizapp.db by default) and writes a manifest for the driver:
+#   python tools/load_seed.py [--students 1000] [--questions 400] [--quizzes 1] [--quiz-questions 30] [--manifest load.json]
+import os
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "loadtest"
+# Share of the bank per question type
+QUESTION_MIX = (("MCQ", 0.6), ("MULTI_SELECT", 0.15), ("TRUE_FALSE", 0.15), ("FILL_BLANK", 0.1))
+BLANK_ANSWERS = ["paris", "london", "delhi", "tokyo"]
+
+
+def student_email(n):
+    return f"student{n}@load.test"
+
+
+def _question_types(count, rng):
+    types = [kind for kind, share in QUESTION_MIX for _ in range(round(count * share))]
+    types = (types + ["MCQ"] * count)[:count]
+    rng.shuffle(types)
+    return types
+
+
+def build(students=1000, teachers=2, categories=4, subcategories=3, questions=400, quizzes=1, quiz_questions=30,
+          batches=4, bcrypt_rounds=None, seed=7) -> dict:
+    # Returns the manifest: what the driver needs to log in and which quizzes are open
+    import bcrypt
+    from sqlalchemy import insert, select
+    from database import Base, engine, SessionLocal
+    from migrations import run_migrations
+    from models import User, Category, Subcategory, Question, Option, Quiz, QuizQuestion, QuizStatus, AssignedQuiz
+    import config
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    created = (now - timedelta(days=7)).isoformat()
+    # One hash for everyone: verifying it still costs a full bcrypt check per login, seeding doesn't
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds or config.BCRYPT_ROUNDS)).decode("ascii")
+
+    db = SessionLocal()
+    db.execute(insert(User), [{"name": f"Teacher {n}", "email": f"teacher{n}@load.test", "password": password,
+                               "role": "teacher"} for n in range(teachers)])
+    db.execute(insert(User), [{"name": f"Student {n}", "email": student_email(n), "password": password,
+                               "role": "student", "college": "Load College", "course": "BSc",
+                               "batch": str(2022 + n % batches), "semester": str(1 + n % 8)} for n in range(students)])
+    teacher_ids = db.execute(select(User.id).where(User.role == "teacher").order_by(User.id)).scalars().all()
+    student_ids = db.execute(select(User.id).where(User.role == "student").order_by(User.id)).scalars().all()
+
+    category_ids = db.execute(insert(Category).returning(Category.id, sort_by_parameter_order=True),
+                              [{"name": f"Category {n}"} for n in range(categories)]).scalars().all()
+    subcategory_ids = db.execute(insert(Subcategory).returning(Subcategory.id, sort_by_parameter_order=True), [
+        {"name": f"Subcategory {c}.{n}", "category_id": cid}
+        for c, cid in enumerate(category_ids) for n in range(subcategories)
+    ]).scalars().all()
+
+    types = _question_types(questions, rng)
+    rows = []
+    for n, kind in enumerate(types):
+        correct = None
+        if kind == "TRUE_FALSE":
+            correct = rng.choice(["true", "false"])
+        elif kind == "FILL_BLANK":
+            correct = json.dumps([rng.choice(BLANK_ANSWERS)])
+        rows.append({"question_text": f"Question {n}: " + " ".join(rng.choice("lorem ipsum dolor sit amet".split())
+                                                                   for _ in range(rng.randint(8, 30))),
+                     "question_type": kind, "correct_answer": correct, "feedback": f"Feedback for question {n}",
+                     "created_by": rng.choice(teacher_ids), "created_at": created, "is_active": True,
+                     "subcategory_id": rng.choice(subcategory_ids)})
+    question_ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), rows).scalars().all()
+    options = []
+    for qid, kind in zip(question_ids, types):
+        if kind in ("MCQ", "MULTI_SELECT"):
+            right = set(rng.sample(range(4), 1 if kind == "MCQ" else 2))
+            options += [{"question_id": qid, "text": f"Option {label} of {qid}", "is_correct": i in right}
+                        for i, label in enumerate("ABCD")]
+    db.execute(insert(Option), options)
+
+    quiz_ids = []
+    for n in range(quizzes):
+        picked = rng.sample(question_ids, min(quiz_questions, len(question_ids)))
+        quiz = Quiz(title=f"Exam {n}", total_marks=len(picked), duration_minutes=60, created_by=teacher_ids[0],
+                    created_at=created, start_time=(now - timedelta(minutes=5)).isoformat(),
+                    quiz_end_time=(now + timedelta(hours=6)).isoformat(), is_active=True,
+                    status=QuizStatus.ACTIVE, random_order=True)
+        db.add(quiz)
+        db.flush()
+        quiz_ids.append(quiz.id)
+        db.execute(insert(QuizQuestion), [{"quiz_id": quiz.id, "question_id": qid, "mark": 1} for qid in picked])
+        db.execute(insert(AssignedQuiz), [{"quiz_id": quiz.id, "student_id": sid} for sid in student_ids])
+    db.commit()
+    db.close()
+    return {"students": students, "password": PASSWORD, "email_pattern": student_email("{n}"),
+            "quiz_ids": quiz_ids, "questions": questions, "quiz_questions": quiz_questions, "seed": seed}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--teachers", type=int, default=2)
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--subcategories", type=int, default=3, help="per category")
+    parser.add_argument("--questions", type=int, default=400, help="size of the question bank")
+    parser.add_argument("--quizzes", type=int, default=1, help="open quizzes, each assigned to every student")
+    parser.add_argument("--quiz-questions", type=int, default=30)
+    parser.add_argument("--batches", type=int, default=4)
+    parser.add_argument("--bcrypt-rounds", type=int, help="defaults to QUIZ_BCRYPT_ROUNDS")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--manifest", default="load.json")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    manifest = build(args.students, args.teachers, args.categories, args.subcategories, args.questions,
+                     args.quizzes, args.quiz_questions, args.batches, args.bcrypt_rounds, args.seed)
+    with open(args.manifest, "w") as out:
+        json.dump(manifest, out, indent=2)
+    print(f"{args.students} students, {args.questions} questions, quizzes {manifest['quiz_ids']}; manifest in {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
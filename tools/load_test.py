@@ -0,0 +1,270 @@
+# tools/load_test.py
+# Exam-day load test. Each simulated student runs the real lifecycle: POST /login, GET /list, then for every
+# open quiz POST /start_quiz, GET /quiz/{id}/questions, POST /submit_quiz and GET /quiz/{id}/summary, all with
+# the session token. Reports throughput, p50/p95/p99 latency and SQL statements per request for each endpoint;
+# --save keeps the report as a baseline and --compare checks a run against one, exiting 1 on a regression.
+# By default it seeds a throwaway SQLite database (tools/load_seed.py) and drives the app in process over ASGI,
+# counting the statements each request runs. --url drives a running server seeded with load_seed.py instead;
+# statement counts then come from its X-SQL-Stats header when it runs with QUIZ_SQL_DEBUG_HEADER=1:
+#   python tools/load_test.py [--students 500] [--concurrency 500] [--save base.json | --compare base.json]
+#   python tools/load_test.py --url http://127.0.0.1:8000 --manifest load.json --students 500
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import contextvars
+from collections import defaultdict
+
+from load_seed import BLANK_ANSWERS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = ["POST /login", "GET /list", "POST /start_quiz/{quiz_id}", "GET /quiz/{quiz_id}/questions",
+             "POST /submit_quiz", "GET /quiz/{quiz_id}/summary"]
+# A baseline comparison flags latency or throughput that is this much worse, past a small absolute floor,
+# and any endpoint that runs more statements per request
+TOLERANCE = 0.2
+LATENCY_FLOOR_MS = 5
+SQL_FLOOR = 0.5
+
+# Statement counter of the request in flight on this task; requests made in process run in the caller's context
+_statements = contextvars.ContextVar("load_test_statements", default=None)
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    box = _statements.get()
+    if box is not None:
+        box[0] += 1
+
+
+def percentile(values, fraction):
+    # Nearest rank, in milliseconds
+    values = sorted(values)
+    return values[max(0, int(round(len(values) * fraction)) - 1)] * 1000 if values else 0
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class Recorder:
+
+    def __init__(self, count_sql: bool):
+        self.count_sql = count_sql
+        self.latencies = defaultdict(list)
+        self.statements = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, name, method, path, **kwargs):
+        box = [0]
+        token = _statements.set(box)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except Exception as exc:
+            self.errors[name] += 1
+            raise RequestFailed(f"{name}: {exc!r}")
+        finally:
+            _statements.reset(token)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            raise RequestFailed(f"{name}: {response.status_code} {response.text[:200]}")
+        self.latencies[name].append(time.perf_counter() - started)
+        header = response.headers.get("x-sql-stats")
+        if header is not None:
+            # Servers running with QUIZ_SQL_DEBUG_HEADER report their own count, so --url runs get one too
+            self.count_sql = True
+            box[0] = int(header.split(";", 1)[0].split("=", 1)[1])
+        self.statements[name] += box[0]
+        return response.json()
+
+    def report(self, wall_seconds: float) -> dict:
+        endpoints = {}
+        for name in ENDPOINTS:
+            latencies = self.latencies.get(name, [])
+            endpoints[name] = {
+                "requests": len(latencies), "errors": self.errors.get(name, 0),
+                "per_second": round(len(latencies) / wall_seconds, 1),
+                "p50_ms": round(percentile(latencies, 0.5), 1), "p95_ms": round(percentile(latencies, 0.95), 1),
+                "p99_ms": round(percentile(latencies, 0.99), 1),
+                "sql_per_request": round(self.statements[name] / len(latencies), 2)
+                if self.count_sql and latencies else None,
+            }
+        return endpoints
+
+
+def answer_for(question: dict, rng: random.Random) -> str:
+    options = [option["text"] for option in question.get("options") or []]
+    kind = question["question_type"]
+    if kind == "MCQ" and options:
+        return rng.choice(options)
+    if kind == "MULTI_SELECT" and options:
+        return json.dumps(rng.sample(options, min(2, len(options))))
+    if kind == "TRUE_FALSE":
+        return rng.choice(["true", "false"])
+    return rng.choice(BLANK_ANSWERS)
+
+
+async def student(client, recorder, manifest, n, think):
+    rng = random.Random(manifest["seed"] * 100003 + n)
+    login = await recorder.call(client, "POST /login", "POST", "/login",
+                                json={"email": manifest["email_pattern"].format(n=n), "password": manifest["password"]})
+    headers = {"Authorization": f"Bearer {login['token']}"}
+    listing = await recorder.call(client, "GET /list", "GET", "/list", headers=headers)
+    for quiz in listing["active"]:
+        quiz_id = quiz["quiz_id"]
+        await recorder.call(client, "POST /start_quiz/{quiz_id}", "POST", f"/start_quiz/{quiz_id}", headers=headers)
+        paper = await recorder.call(client, "GET /quiz/{quiz_id}/questions", "GET", f"/quiz/{quiz_id}/questions",
+                                    headers=headers)
+        answers = {q["question_id"]: answer_for(q, rng) for q in paper["questions"]}
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+        await recorder.call(client, "POST /submit_quiz", "POST", "/submit_quiz", headers=headers,
+                            json={"quiz_id": quiz_id, "answers": answers})
+        await recorder.call(client, "GET /quiz/{quiz_id}/summary", "GET", f"/quiz/{quiz_id}/summary", headers=headers)
+
+
+async def drive(client, recorder, manifest, args) -> dict:
+    gate = asyncio.Semaphore(args.concurrency)
+    failures = []
+
+    async def one(n):
+        if args.ramp:
+            await asyncio.sleep(args.ramp * n / args.students)
+        async with gate:
+            try:
+                await student(client, recorder, manifest, n, args.think)
+            except RequestFailed as exc:
+                failures.append(str(exc))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(args.students)))
+    wall = time.perf_counter() - started
+    for failure in failures[:5]:
+        print(f"failed: {failure}", file=sys.stderr)
+    return {"wall_seconds": round(wall, 2), "students": args.students, "failed_students": len(failures),
+            "lifecycles_per_second": round((args.students - len(failures)) / wall, 1),
+            "endpoints": recorder.report(wall)}
+
+
+async def run_in_process(args) -> dict:
+    import httpx
+    from sqlalchemy import event
+    from load_seed import build
+
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="quiz-load-"))
+    manifest = build(students=args.students, questions=args.questions, quizzes=args.quizzes,
+                     quiz_questions=args.quiz_questions, bcrypt_rounds=args.bcrypt_rounds)
+    from database import engine, read_engine, async_engine, async_read_engine
+    from main import app
+
+    for watched in {engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+        event.listen(watched, "before_cursor_execute", count_statement)
+    recorder = Recorder(count_sql=True)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+            return await drive(client, recorder, manifest, args)
+
+
+async def run_against(args) -> dict:
+    import httpx
+
+    with open(args.manifest) as source:
+        manifest = json.load(source)
+    if args.students > manifest["students"]:
+        sys.exit(f"the manifest only has {manifest['students']} students")
+    args.questions, args.quizzes, args.quiz_questions = (manifest["questions"], len(manifest["quiz_ids"]),
+                                                         manifest["quiz_questions"])
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=None, limits=limits) as client:
+        return await drive(client, Recorder(count_sql=False), manifest, args)
+
+
+def print_report(report: dict):
+    print(f"{report['students']} students in {report['wall_seconds']}s, {report['lifecycles_per_second']} lifecycles/s"
+          f", {report['failed_students']} failed")
+    print(f"{'endpoint':<32} {'reqs':>6} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL/req':>8}")
+    for name, e in report["endpoints"].items():
+        sql = "-" if e["sql_per_request"] is None else f"{e['sql_per_request']:.2f}"
+        print(f"{name:<32} {e['requests']:>6} {e['errors']:>4} {e['per_second']:>7.1f} {e['p50_ms']:>8.1f} "
+              f"{e['p95_ms']:>8.1f} {e['p99_ms']:>8.1f} {sql:>8}")
+
+
+def compare(report: dict, baseline: dict) -> list:
+    # Prints the change against the baseline per endpoint; returns the regressions
+    if baseline.get("config") != report.get("config"):
+        print(f"warning: baseline ran with {baseline.get('config')}")
+    regressions = []
+    print(f"\n{'against baseline':<32} {'req/s':>9} {'p95':>9} {'p99':>9} {'SQL/req':>9}")
+    for name, now in report["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if not before or not before["requests"] or not now["requests"]:
+            continue
+
+        def change(key):
+            return (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+
+        sql = "-"
+        if now["sql_per_request"] is not None and before.get("sql_per_request") is not None:
+            sql = f"{now['sql_per_request'] - before['sql_per_request']:+.2f}"
+            if now["sql_per_request"] > before["sql_per_request"] + SQL_FLOOR:
+                regressions.append(f"{name}: {before['sql_per_request']} -> {now['sql_per_request']} statements per request")
+        print(f"{name:<32} {change('per_second'):>+8.0f}% {change('p95_ms'):>+8.0f}% {change('p99_ms'):>+8.0f}% {sql:>9}")
+        if now["p95_ms"] > before["p95_ms"] * (1 + TOLERANCE) and now["p95_ms"] - before["p95_ms"] > LATENCY_FLOOR_MS:
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if now["per_second"] < before["per_second"] * (1 - TOLERANCE):
+            regressions.append(f"{name}: {before['per_second']} -> {now['per_second']} requests/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, help="students in flight at once (default: all)")
+    parser.add_argument("--ramp", type=float, default=0, help="seconds over which students arrive")
+    parser.add_argument("--think", type=float, default=0, help="mean seconds between opening and submitting")
+    parser.add_argument("--questions", type=int, default=400, help="question bank size (in process)")
+    parser.add_argument("--quizzes", type=int, default=1, help="open quizzes per student (in process)")
+    parser.add_argument("--quiz-questions", type=int, default=30, help="(in process)")
+    parser.add_argument("--bcrypt-rounds", type=int, help="(in process) defaults to QUIZ_BCRYPT_ROUNDS")
+    parser.add_argument("--url", help="drive a running server instead")
+    parser.add_argument("--manifest", default="load.json", help="written by load_seed.py, with --url")
+    parser.add_argument("--save", help="write the report here as a baseline")
+    parser.add_argument("--compare", help="baseline report to compare against")
+    args = parser.parse_args()
+    args.concurrency = args.concurrency or args.students
+
+    # Paths are taken before the in-process run moves to its scratch directory
+    save = os.path.abspath(args.save) if args.save else None
+    baseline = None
+    if args.compare:
+        with open(args.compare) as source:
+            baseline = json.load(source)
+
+    report = asyncio.run(run_against(args) if args.url else run_in_process(args))
+    report["config"] = {"target": args.url or "in-process", "students": args.students, "concurrency": args.concurrency,
+                        "ramp": args.ramp, "think": args.think, "questions": args.questions, "quizzes": args.quizzes,
+                        "quiz_questions": args.quiz_questions}
+    print_report(report)
+    if save:
+        with open(save, "w") as out:
+            json.dump(report, out, indent=2)
+        print(f"saved to {args.save}")
+    if baseline is not None:
+        regressions = compare(report, baseline)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+    if report["failed_students"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()